@@ -1,13 +1,44 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import io
 import json
-import pandas as pd
-from datetime import datetime, timedelta
+from bisect import bisect_left
 import os
+import sys
+
+from schichtplaner.absences import load_absence_file
+from schichtplaner.cache import PlanCache, plan_key
+from schichtplaner.engine import (
+    DATE_FORMAT, PlanningError, default_config, normalize_config, parse_date, parse_day, plan_dates,
+)
+from schichtplaner.export import render_bytes, write_workbook
+from schichtplaner.incremental import IncrementalPlan
+from schichtplaner.roster import Roster, check_seeds, load_roster, parse_names
+from schichtplaner.rules import RuleSet
+from schichtplaner.solver import optimize_plan
+from schichtplaner.store import DEFAULT_STORE, PlanStore
+from schichtplaner.tasks import BackgroundTask, Cancelled, track
+from schichtplaner.trace import PlanTrace, timed
+
+SOLVER_ROTATION = "Rotation"
+SOLVER_OPTIMIZE = "Optimierung"
+POLL_MS = 50  # Abfrageintervall für laufende Hintergrundaufgaben
+
+# tkinter wird erst beim Start der GUI geladen (siehe _load_tk), damit die
+# Planung auch ohne Display/Tk importiert und genutzt werden kann.
+tk = ttk = messagebox = filedialog = None
+
+
+def _load_tk():
+    """Importiert tkinter bei Bedarf"""
+    global tk, ttk, messagebox, filedialog
+    if tk is None:
+        import tkinter
+        from tkinter import ttk as _ttk, messagebox as _messagebox, filedialog as _filedialog
+        tk, ttk, messagebox, filedialog = tkinter, _ttk, _messagebox, _filedialog
 
 
 class ShiftPlanner:
     def __init__(self, root):
+        _load_tk()
         self.root = root
         self.root.title("Notdienst Schichtplaner v1.1")
         # Größeres Startfenster + sinnvolle Mindestgröße
@@ -16,15 +47,16 @@ class ShiftPlanner:
 
         # Konfigurationsdatei
         self.config_file = "shift_config.json"
+        # Ablage aller Planungszeiträume mit Rotationsstand (SQLite)
+        self.store_file = DEFAULT_STORE
 
         # Standardkonfiguration
-        self.config = {
-            "pool_vm_alle": [],            # Vormittag - können alles
-            "pool_vm_teilweise": [],       # Vormittag - können nicht alles (brauchen Support)
-            "pool_vm_support": [],         # Vormittag - Support für Pool B
-            "pool_nm_alle": [],            # Nachmittag - können alles
-            "pool_freitag_abwesend": []    # Freitags nicht verfügbar
-        }
+        # pool_vm_alle: Vormittag - können alles
+        # pool_vm_teilweise: Vormittag - können nicht alles (brauchen Support)
+        # pool_vm_support: Vormittag - Support für Pool B
+        # pool_nm_alle: Nachmittag - können alles
+        # pool_freitag_abwesend: Freitags nicht verfügbar
+        self.config = default_config()
 
         self.load_config()
         self.create_gui()
@@ -35,11 +67,17 @@ class ShiftPlanner:
         """Lädt Konfiguration aus JSON-Datei"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    if "pool_freitag_abwesend" not in loaded_config:
-                        loaded_config["pool_freitag_abwesend"] = []
-                    self.config = loaded_config
+                try:
+                    roster = load_roster(self.config_file)
+                except PlanningError as e:
+                    # Trotzdem laden, damit die Pools in der Oberfläche korrigiert werden können
+                    messagebox.showerror("Fehler", f"Die Konfiguration ist fehlerhaft, bitte Pools korrigieren:\n{e}")
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        self.config = normalize_config(json.load(f))
+                else:
+                    self.config = roster.config
+                    if roster.warnings:
+                        messagebox.showwarning("Hinweis", "\n".join(roster.warnings))
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Laden der Konfiguration: {e}")
 
@@ -161,10 +199,44 @@ Hinweise zur Pool-Konfiguration:
         self.first_support_entry = tk.Entry(left_frame, width=20)
         self.first_support_entry.grid(row=4, column=1, padx=5, pady=5, sticky="w")
 
+        ttk.Label(left_frame, text="Planungszeitraum (Wochen Mo-Sa):").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        self.weeks_entry = tk.Entry(left_frame, width=20)
+        self.weeks_entry.grid(row=5, column=1, padx=5, pady=5, sticky="w")
+        self.weeks_entry.insert(0, "2")
+
+        ttk.Label(left_frame, text="Verfahren:").grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        self.solver_var = tk.StringVar(value=SOLVER_ROTATION)
+        ttk.Combobox(left_frame, textvariable=self.solver_var, width=17, state="readonly",
+                     values=[SOLVER_ROTATION, SOLVER_OPTIMIZE]).grid(row=6, column=1, padx=5, pady=5, sticky="w")
+
         button_frame = ttk.Frame(left_frame)
-        button_frame.grid(row=5, column=0, columnspan=2, pady=20)
-        ttk.Button(button_frame, text="Planung erstellen", command=self.create_planning).pack(side="left", padx=5)
-        ttk.Button(button_frame, text="Excel exportieren", command=self.export_excel).pack(side="left", padx=5)
+        button_frame.grid(row=7, column=0, columnspan=2, pady=(20, 5))
+        self.plan_button = ttk.Button(button_frame, text="Planung erstellen", command=self.create_planning)
+        self.plan_button.pack(side="left", padx=5)
+        self.export_button = ttk.Button(button_frame, text="Excel exportieren", command=self.export_excel)
+        self.export_button.pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Abbrechen", command=self.cancel_task, state="disabled")
+        self.cancel_button.pack(side="left", padx=5)
+
+        # Fortschritt laufender Planung/Exports (Arbeit läuft im Hintergrund-Thread)
+        self.progress_bar = ttk.Progressbar(left_frame, mode="determinate", maximum=100)
+        self.progress_bar.grid(row=8, column=0, columnspan=2, padx=5, pady=(0, 2), sticky="ew")
+        self.status_var = tk.StringVar()
+        ttk.Label(left_frame, textvariable=self.status_var, font=('TkDefaultFont', 8), foreground='gray').grid(row=9, column=0, columnspan=2, sticky="w", padx=5)
+
+        # Historie: Planung ablegen bzw. am gespeicherten Rotationsstand fortsetzen
+        store_frame = ttk.Frame(left_frame)
+        store_frame.grid(row=10, column=0, columnspan=2, pady=(10, 0))
+        ttk.Button(store_frame, text="Planung speichern", command=self.save_plan).pack(side="left", padx=5)
+        ttk.Button(store_frame, text="Nächsten Zeitraum fortsetzen", command=self.continue_planning).pack(side="left", padx=5)
+        ttk.Button(store_frame, text="Alle Zeiträume exportieren…", command=self.export_history).pack(side="left", padx=5)
+
+        # Messwerte (Kandidatensuche, Ablehnungsgründe, Phasenzeiten) zur Analyse von Lücken und Laufzeit
+        trace_frame = ttk.Frame(left_frame)
+        trace_frame.grid(row=11, column=0, columnspan=2, pady=(10, 0))
+        self.trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(trace_frame, text="Planung protokollieren", variable=self.trace_var).pack(side="left", padx=5)
+        ttk.Button(trace_frame, text="Protokoll speichern…", command=self.save_trace).pack(side="left", padx=5)
 
         # Rechte Seite – Abwesenheiten
         ttk.Label(right_frame, text="Abwesenheiten verwalten", font=('TkDefaultFont', 11, 'bold')).grid(row=0, column=0, columnspan=3, pady=(0, 10), sticky="w")
@@ -175,24 +247,26 @@ Hinweise zur Pool-Konfiguration:
         self.employee_combo.grid(row=1, column=1, padx=5, pady=2, sticky="w")
         ttk.Label(right_frame, text="(Mehrere: IL,AN,RR)", font=('TkDefaultFont', 8), foreground='gray').grid(row=1, column=2, sticky="w", padx=2, pady=2)
 
-        ttk.Label(right_frame, text="Tag:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+        ttk.Label(right_frame, text="Datum:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
         self.day_var = tk.StringVar()
-        # 12 Tage (Mo-Sa, Mo-Sa)
-        self.day_combo = ttk.Combobox(right_frame, textvariable=self.day_var, width=18, values=[f"Tag {i + 1}" for i in range(12)])
+        # Auswahl: alle Planungstage (Mo-Sa) ab Startdatum im Planungszeitraum
+        self.day_combo = ttk.Combobox(right_frame, textvariable=self.day_var, width=18, postcommand=self.update_day_list)
         self.day_combo.grid(row=2, column=1, padx=5, pady=2, sticky="w")
+        ttk.Label(right_frame, text="(TT.MM.YYYY)", font=('TkDefaultFont', 8), foreground='gray').grid(row=2, column=2, sticky="w", padx=2, pady=2)
 
         ttk.Button(right_frame, text="➕ Hinzufügen", command=self.add_absence).grid(row=3, column=0, padx=5, pady=5, sticky="w")
         ttk.Button(right_frame, text="🗑️ Entfernen", command=self.remove_absence).grid(row=3, column=1, padx=5, pady=5, sticky="w")
         ttk.Button(right_frame, text="Pools laden", command=self.update_employee_list).grid(row=3, column=2, padx=5, pady=5, sticky="w")
 
-        ttk.Label(right_frame, text="Eingetragene Abwesenheiten:").grid(row=4, column=0, columnspan=3, sticky="w", padx=5, pady=(15, 5))
+        ttk.Label(right_frame, text="Eingetragene Abwesenheiten:").grid(row=4, column=0, columnspan=2, sticky="w", padx=5, pady=(15, 5))
+        ttk.Button(right_frame, text="📥 Importieren…", command=self.import_absences).grid(row=4, column=2, padx=5, pady=(15, 5), sticky="w")
 
         # Abwesenheitenliste: mindestens 26 Zeilen
-        absence_columns = ("Tag", "Mitarbeiter")
+        absence_columns = ("Datum", "Mitarbeiter")
         self.absence_tree = ttk.Treeview(right_frame, columns=absence_columns, show="headings", height=26)
-        self.absence_tree.heading("Tag", text="Tag")
+        self.absence_tree.heading("Datum", text="Datum")
         self.absence_tree.heading("Mitarbeiter", text="Mitarbeiter")
-        self.absence_tree.column("Tag", width=90, stretch=False)
+        self.absence_tree.column("Datum", width=90, stretch=False)
         self.absence_tree.column("Mitarbeiter", width=140, stretch=True)
         self.absence_tree.grid(row=5, column=0, columnspan=3, padx=5, pady=5, sticky="nsew")
 
@@ -227,7 +301,14 @@ Hinweise zur Pool-Konfiguration:
         self.result_tree.configure(yscrollcommand=scrollbar_y.set)
 
         self.planning_result = []
-        self.absences = {}  # {tag_nr: [mitarbeiter_liste]}
+        self.incremental = None  # IncrementalPlan der letzten Rotationsplanung
+        self.planned_config = None  # Pools, mit denen planning_result erstellt wurde
+        self.task = None  # laufende BackgroundTask (Planung oder Export)
+        self.trace = None  # PlanTrace der letzten Planung (nur mit "Planung protokollieren")
+        # Ergebnisse der lokalen Suche und erzeugte Exportdateien für wiederholte gleiche Anfragen
+        self.plan_cache = PlanCache(maxsize=16)
+        self.absences = {}  # {datum (date): [mitarbeiter_liste]}
+        self.absence_keys = []  # sortierte (datum, mitarbeiter) in Reihenfolge der absence_tree
 
     # -------------------- Abwesenheiten --------------------
 
@@ -239,30 +320,52 @@ Hinweise zur Pool-Konfiguration:
         self.employee_combo['values'] = sorted(list(all_employees))
         messagebox.showinfo("Info", f"Mitarbeiterliste aktualisiert: {len(all_employees)} Mitarbeiter gefunden")
 
+    def get_plan_days(self):
+        """Liest den Planungszeitraum (Wochen) und gibt die Anzahl Planungstage zurück"""
+        try:
+            weeks = int(self.weeks_entry.get().strip())
+        except ValueError:
+            raise PlanningError("Ungültiger Planungszeitraum! Bitte Anzahl Wochen eingeben.") from None
+        if weeks < 1:
+            raise PlanningError("Der Planungszeitraum muss mindestens eine Woche umfassen!")
+        return weeks * RuleSet(self.config).days_per_week
+
+    def update_day_list(self):
+        """Füllt die Datumsauswahl mit den Planungstagen ab Startdatum"""
+        try:
+            start_date = parse_date(self.start_date_entry.get())
+            days = self.get_plan_days()
+        except PlanningError:
+            return
+        rules = RuleSet(self.config)
+        self.day_combo['values'] = [d.strftime(DATE_FORMAT) for d in plan_dates(start_date, days, rules)]
+
     def add_absence(self):
         """Fügt eine Abwesenheit hinzu (unterstützt mehrere, komma-getrennte Kürzel)."""
         employee = self.employee_var.get().strip()
         day_str = self.day_var.get().strip()
         if not employee or not day_str:
-            messagebox.showwarning("Warnung", "Bitte Mitarbeiter und Tag auswählen!")
+            messagebox.showwarning("Warnung", "Bitte Mitarbeiter und Datum auswählen!")
             return
         try:
-            day_nr = int(day_str.split()[1]) - 1  # "Tag 1" -> 0
-        except (ValueError, IndexError):
-            messagebox.showerror("Fehler", "Ungültiger Tag!")
+            day = parse_day(day_str)
+        except PlanningError:
+            messagebox.showerror("Fehler", "Ungültiges Datum! Bitte TT.MM.YYYY verwenden.")
             return
         employees = [e.strip() for e in employee.split(",") if e.strip()]
-        if day_nr not in self.absences:
-            self.absences[day_nr] = []
+        if day not in self.absences:
+            self.absences[day] = []
+        added = []
         for emp in employees:
-            if emp not in self.absences[day_nr]:
-                self.absences[day_nr].append(emp)
-        self.update_absence_display()
+            if emp not in self.absences[day]:
+                self.absences[day].append(emp)
+                added.append((day, emp))
+        self.update_absence_rows(added=added)
+        self.replan_days([day])
 
-        # Optional: direkt zum nächsten Tag springen
-        current_day = day_nr + 1
-        if current_day < 12:
-            self.day_var.set(f"Tag {current_day + 1}")
+        # Optional: direkt zum nächsten Planungstag springen (planungsfreie Wochentage überspringen)
+        next_day = RuleSet(self.config).next_plan_day(day)
+        self.day_var.set(next_day.strftime(DATE_FORMAT))
 
     def remove_absence(self):
         """Entfernt eine Abwesenheit"""
@@ -270,184 +373,303 @@ Hinweise zur Pool-Konfiguration:
         if not selected:
             messagebox.showwarning("Warnung", "Bitte einen Eintrag auswählen!")
             return
+        changed_days = set()
+        removed = []
         for item in selected:
             values = self.absence_tree.item(item, 'values')
             day_str, employee = values[0], values[1]
-            day_nr = int(day_str.split()[1]) - 1
-            if day_nr in self.absences and employee in self.absences[day_nr]:
-                self.absences[day_nr].remove(employee)
-                if not self.absences[day_nr]:
-                    del self.absences[day_nr]
-        self.update_absence_display()
+            day = parse_day(day_str)
+            if day in self.absences and employee in self.absences[day]:
+                self.absences[day].remove(employee)
+                changed_days.add(day)
+                removed.append((day, employee))
+                if not self.absences[day]:
+                    del self.absences[day]
+        self.update_absence_rows(removed=removed)
+        self.replan_days(changed_days)
         messagebox.showinfo("Erfolg", "Abwesenheit(en) entfernt")
 
+    def import_absences(self):
+        """Importiert Abwesenheiten (CSV, iCalendar oder JSON) und plant einmal für alle Tage nach"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Abwesenheiten", "*.csv *.ics *.json"), ("CSV files", "*.csv"), ("iCalendar", "*.ics"),
+                       ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        employees = set()
+        for key in ("pool_vm_alle", "pool_vm_teilweise", "pool_vm_support", "pool_nm_alle"):
+            employees.update(self.config[key])
+        try:
+            imported = load_absence_file(filename, employees=employees)
+        except PlanningError as e:
+            messagebox.showerror("Fehler", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Fehler beim Import: {e}")
+            return
+
+        changed = {}
+        added = 0
+        for day, names in imported.items():
+            current = self.absences.get(day, [])
+            new = sorted(names.difference(current))
+            if new:
+                self.absences[day] = current + new
+                changed[day] = self.absences[day]
+                added += len(new)
+        # Ein Neuaufbau der Tabelle und eine Nachplanung für alle geänderten Tage
+        self.update_absence_display()
+        if self.incremental is not None and changed:
+            changes = self.incremental.set_absences(changed)
+            if changes:
+                self.planning_result = self.incremental.rows
+                self.display_results(changed={tag_nr for tag_nr, _, _, _ in changes})
+        messagebox.showinfo("Erfolg", f"{added} Abwesenheit(en) an {len(changed)} Tag(en) importiert")
+
+    def replan_days(self, days):
+        """Plant eine bestehende Rotationsplanung ab den geänderten Tagen inkrementell neu"""
+        if self.incremental is None:
+            return
+        changes = []
+        for day in sorted(days):
+            changes += self.incremental.set_absence(day, self.absences.get(day, []))
+        if changes:
+            self.planning_result = self.incremental.rows
+            self.display_results(changed={tag_nr for tag_nr, _, _, _ in changes})
+
+    @staticmethod
+    def _absence_iid(key):
+        day, employee = key
+        return f"{day.isoformat()}|{employee}"
+
     def update_absence_display(self):
-        """Aktualisiert die Anzeige der Abwesenheiten"""
-        for item in self.absence_tree.get_children():
-            self.absence_tree.delete(item)
-        for day_nr in sorted(self.absences.keys()):
-            for employee in sorted(self.absences[day_nr]):
-                self.absence_tree.insert("", tk.END, values=(f"Tag {day_nr + 1}", employee))
+        """Baut die Anzeige der Abwesenheiten komplett neu auf"""
+        self.absence_tree.delete(*self.absence_tree.get_children())
+        self.absence_keys = sorted((day, employee) for day, employees in self.absences.items() for employee in employees)
+        for key in self.absence_keys:
+            self.absence_tree.insert("", tk.END, iid=self._absence_iid(key), values=(key[0].strftime(DATE_FORMAT), key[1]))
+
+    def update_absence_rows(self, added=(), removed=()):
+        """Fügt nur die geänderten Einträge ``(datum, mitarbeiter)`` an ihrer sortierten Stelle ein bzw. löscht sie"""
+        keys = self.absence_keys
+        for key in removed:
+            pos = bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+                self.absence_tree.delete(self._absence_iid(key))
+        for key in added:
+            pos = bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                continue
+            keys.insert(pos, key)
+            self.absence_tree.insert("", pos, iid=self._absence_iid(key), values=(key[0].strftime(DATE_FORMAT), key[1]))
 
     def save_pools(self):
         """Speichert die Pool-Konfiguration"""
         try:
-            self.config["pool_vm_alle"] = [x.strip() for x in self.pool_vm_alle_entry.get().split(",") if x.strip()]
-            self.config["pool_vm_teilweise"] = [x.strip() for x in self.pool_vm_teilweise_entry.get().split(",") if x.strip()]
-            self.config["pool_vm_support"] = [x.strip() for x in self.pool_vm_support_entry.get().split(",") if x.strip()]
-            self.config["pool_nm_alle"] = [x.strip() for x in self.pool_nm_alle_entry.get().split(",") if x.strip()]
-            self.config["pool_freitag_abwesend"] = [x.strip() for x in self.pool_freitag_abwesend_entry.get().split(",") if x.strip()]
+            config = dict(self.config)
+            config["pool_vm_alle"] = parse_names(self.pool_vm_alle_entry.get())
+            config["pool_vm_teilweise"] = parse_names(self.pool_vm_teilweise_entry.get())
+            config["pool_vm_support"] = parse_names(self.pool_vm_support_entry.get())
+            config["pool_nm_alle"] = parse_names(self.pool_nm_alle_entry.get())
+            config["pool_freitag_abwesend"] = parse_names(self.pool_freitag_abwesend_entry.get())
+            try:
+                roster = Roster(config)
+            except PlanningError as e:
+                messagebox.showerror("Fehler", str(e))
+                return
+            if roster.warnings:
+                messagebox.showwarning("Hinweis", "\n".join(roster.warnings))
+            self.config = roster.config
             self.save_config()
+            if self.incremental is not None and normalize_config(self.planned_config) != roster.config:
+                # Nachplanung bei Abwesenheiten nur mit den Pools der Planung; mit neuen Pools neu planen
+                self.incremental = None
+                self.status_var.set("Pools geändert – bitte Planung neu erstellen")
         except Exception as e:
             messagebox.showerror("Fehler", f"Fehler beim Speichern der Pools: {e}")
 
-    def parse_absent_employees(self):
-        """Gibt die Abwesenheitsstruktur zurück"""
-        return self.absences
-
     # -------------------- Planung --------------------
 
+    def planning_inputs(self):
+        """Schnappschuss aller Eingaben der Planung (vergleichbar, unabhängig von späteren Änderungen)"""
+        return (
+            json.dumps(self.config, sort_keys=True),
+            self.start_date_entry.get().strip(),
+            self.first_vm_entry.get().strip(),
+            self.first_nm_entry.get().strip(),
+            self.first_support_entry.get().strip(),
+            self.weeks_entry.get().strip(),
+            self.solver_var.get(),
+            tuple(sorted((day, tuple(sorted(employees))) for day, employees in self.absences.items() if employees)),
+        )
+
     def create_planning(self):
-        """Erstellt die Schichtplanung für 2 Wochen Mo-Sa (12 Tage)"""
+        """Startet die Schichtplanung für den gewählten Zeitraum (Wochen Mo-Sa) im Hintergrund"""
+        if self.task is not None:
+            return
         try:
-            start_date_str = self.start_date_entry.get().strip()
-            if not start_date_str:
-                messagebox.showerror("Fehler", "Bitte Startdatum eingeben!")
-                return
-            start_date = datetime.strptime(start_date_str, "%d.%m.%Y")
-            if start_date.weekday() != 0:  # Montag
-                messagebox.showerror("Fehler", "Startdatum muss ein Montag sein!")
-                return
-
-            first_vm = self.first_vm_entry.get().strip()
-            first_nm = self.first_nm_entry.get().strip()
-            first_support = self.first_support_entry.get().strip()
-            if not all([first_vm, first_nm]):
-                messagebox.showerror("Fehler", "Bitte mindestens Vormittag und Nachmittag für den ersten Tag ausfüllen!")
-                return
-
-            absent_by_day = self.parse_absent_employees()
-            self.planning_result = []
-
-            pool_positions = {"vm_alle": 0, "vm_teilweise": 0, "vm_support": 0, "nm_alle": 0}
-
-            if first_vm and first_vm in self.config["pool_vm_alle"]:
-                vm_start_idx = self.config["pool_vm_alle"].index(first_vm)
-                pool_positions["vm_alle"] = (vm_start_idx + 1) % len(self.config["pool_vm_alle"])
-            if first_nm and first_nm in self.config["pool_nm_alle"]:
-                nm_start_idx = self.config["pool_nm_alle"].index(first_nm)
-                pool_positions["nm_alle"] = (nm_start_idx + 1) % len(self.config["pool_nm_alle"])
-            if first_support and first_support in self.config["pool_vm_support"]:
-                support_start_idx = self.config["pool_vm_support"].index(first_support)
-                pool_positions["vm_support"] = (support_start_idx + 1) % len(self.config["pool_vm_support"])
-            if first_vm and first_vm in self.config["pool_vm_teilweise"]:
-                vm_b_idx = self.config["pool_vm_teilweise"].index(first_vm)
-                pool_positions["vm_teilweise"] = (vm_b_idx + 1) % len(self.config["pool_vm_teilweise"])
-
-            # 12 Tage: Mo-Sa, Mo-Sa (2 Wochen ohne Sonntag)
-            for tag_nr in range(12):
-                # Wochentag innerhalb der Woche (0=Mo .. 5=Sa) und Wochenoffset (für Sonntage)
-                weekday_in_week = tag_nr % 6
-                week_number = tag_nr // 6
-                current_date = start_date + timedelta(days=tag_nr + week_number)
-
-                is_friday = weekday_in_week == 4
-                is_saturday = weekday_in_week == 5
-
-                weekday_names = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag"]
-                weekday_german = weekday_names[weekday_in_week]
-
-                absent_today = absent_by_day.get(tag_nr, []).copy()
-                if is_friday:
-                    # Freitags zusätzlich die generellen "Freitag nicht verfügbar"
-                    absent_today = list(set(absent_today + self.config["pool_freitag_abwesend"]))
-
-                # Samstag: keine Schichten
-                if is_saturday:
-                    vm_employee = ""
-                    nm_employee = ""
-                    support_employee = ""
-                elif tag_nr == 0:
-                    vm_employee = first_vm
-                    nm_employee = first_nm
-                    support_employee = first_support if first_support else ""
-                else:
-                    yesterday_nm = self.planning_result[tag_nr - 1]["Nachmittag"] if tag_nr > 0 else None
-                    forbidden_vm = [yesterday_nm] if yesterday_nm else []
-                    used_today = []
-                    vm_employee = None
-                    support_employee = ""
-
-                    # Vormittag aus Pool A
-                    if self.config["pool_vm_alle"]:
-                        start_pos = pool_positions["vm_alle"]
-                        pool_size = len(self.config["pool_vm_alle"])
-                        for i in range(pool_size):
-                            candidate_idx = (start_pos + i) % pool_size
-                            candidate = self.config["pool_vm_alle"][candidate_idx]
-                            if (candidate not in absent_today and candidate not in forbidden_vm):
-                                vm_employee = candidate
-                                used_today.append(vm_employee)
-                                pool_positions["vm_alle"] = (candidate_idx + 1) % pool_size
-
-                                # Support nötig?
-                                if candidate in self.config["pool_vm_teilweise"] and self.config["pool_vm_support"]:
-                                    start_pos_c = pool_positions["vm_support"]
-                                    pool_c_size = len(self.config["pool_vm_support"])
-                                    for j in range(pool_c_size):
-                                        support_idx = (start_pos_c + j) % pool_c_size
-                                        candidate_c = self.config["pool_vm_support"][support_idx]
-                                        if (candidate_c not in absent_today and candidate_c != candidate and candidate_c not in forbidden_vm):
-                                            support_employee = candidate_c
-                                            used_today.append(support_employee)
-                                            pool_positions["vm_support"] = (support_idx + 1) % pool_c_size
-                                            break
-                                break
-
-                    # Nachmittag aus Pool D
-                    nm_employee = None
-                    if self.config["pool_nm_alle"]:
-                        start_pos = pool_positions["nm_alle"]
-                        pool_size = len(self.config["pool_nm_alle"])
-                        for i in range(pool_size):
-                            candidate_idx = (start_pos + i) % pool_size
-                            candidate = self.config["pool_nm_alle"][candidate_idx]
-                            if (candidate not in absent_today and candidate not in used_today):
-                                nm_employee = candidate
-                                pool_positions["nm_alle"] = (candidate_idx + 1) % pool_size
-                                break
-
-                self.planning_result.append({
-                    "Datum": current_date.strftime("%d.%m.%Y"),
-                    "Wochentag": weekday_german,
-                    "Vormittag": vm_employee if not is_saturday else "",
-                    "Nachmittag": nm_employee if not is_saturday else "",
-                    "Support": support_employee if not is_saturday else ""
-                })
-
-            self.display_results()
-        except ValueError:
-            messagebox.showerror("Fehler", "Ungültiges Datumsformat! Bitte TT.MM.YYYY verwenden.")
+            days = self.get_plan_days()
+            checkpoint = self.stored_checkpoint()
+            if checkpoint is None:
+                check_seeds(self.config, self.first_vm_entry.get(), self.first_nm_entry.get(),
+                            self.first_support_entry.get())
+        except PlanningError as e:
+            messagebox.showerror("Fehler", str(e))
+            return
+        # Kopien, damit Änderungen während der Planung den Hintergrund-Thread nicht stören
+        args = (
+            normalize_config(self.config),
+            self.start_date_entry.get().strip(),
+            self.first_vm_entry.get(),
+            self.first_nm_entry.get(),
+            self.first_support_entry.get(),
+            {day: list(employees) for day, employees in self.absences.items()},
+        )
+        optimize = self.solver_var.get() == SOLVER_OPTIMIZE
+        trace = PlanTrace() if self.trace_var.get() else None
+
+        def work(progress, should_stop):
+            with timed(trace, "planung"):
+                if optimize:
+                    # Lokale Suche (weniger Lücken, gleichmäßigere Last); keine inkrementelle Neuplanung.
+                    # Gleiche Eingaben liefern sofort das vorherige Ergebnis.
+                    key = plan_key(*args, days=days, solver="optimierung", checkpoint=checkpoint)
+                    entry = self.plan_cache.get(key)
+                    if entry is None:
+                        entry = {"rows": optimize_plan(*args, days=days, progress=progress, should_stop=should_stop,
+                                                       checkpoint=checkpoint)}
+                        if not should_stop():
+                            self.plan_cache.put(key, entry)
+                    return None, entry["rows"], args[0], trace
+                # Rotation mit gespeicherten Zuständen, damit Abwesenheitsänderungen schnell nachgeplant werden
+                incremental = IncrementalPlan(*args, days=days, progress=progress, should_stop=should_stop,
+                                              checkpoint=checkpoint, trace=trace)
+                return incremental, incremental.rows, args[0], trace
+
+        self.start_task(BackgroundTask(work, token=self.planning_inputs()), self.planning_done, "Planung läuft…")
+
+    def planning_done(self, task):
+        """Übernimmt das Ergebnis einer Hintergrundplanung (im Tk-Thread)"""
+        if isinstance(task.error, Cancelled):
+            self.status_var.set("Planung abgebrochen")
+        elif isinstance(task.error, PlanningError):
+            self.status_var.set("")
+            messagebox.showerror("Fehler", str(task.error))
+        elif task.error is not None:
+            self.status_var.set("")
+            messagebox.showerror("Fehler", f"Fehler bei der Planung: {task.error}")
+        elif task.token != self.planning_inputs():
+            self.status_var.set("Eingaben während der Planung geändert – Ergebnis verworfen")
+        else:
+            self.incremental, self.planning_result, self.planned_config, self.trace = task.result
+            with timed(self.trace, "anzeige"):
+                self.display_results()
+            self.status_var.set(f"Planung erstellt: {len(self.planning_result)} Tage")
+
+    # -------------------- Historie --------------------
+
+    def stored_checkpoint(self):
+        """Gespeicherter Rotationsstand für das Startdatum, falls der 1. Tag nicht vorgegeben ist"""
+        if self.first_vm_entry.get().strip() or self.first_nm_entry.get().strip():
+            return None
+        if not os.path.exists(self.store_file):
+            return None
+        start = self.start_date_entry.get().strip()
+        if not start:
+            return None
+        with PlanStore(self.store_file) as store:
+            return store.checkpoint_for(start)
+
+    def save_plan(self):
+        """Legt die aktuelle Planung mit Abwesenheiten und Rotationsstand im Plan-Store ab"""
+        if not self.planning_result:
+            messagebox.showwarning("Warnung", "Keine Planung vorhanden! Bitte erst Planung erstellen.")
+            return
+        checkpoint = self.incremental.checkpoint if self.incremental is not None else None
+        solver = "rotation" if self.incremental is not None else "optimierung"
+        try:
+            with PlanStore(self.store_file) as store:
+                store.save_period(self.planning_result, self.planned_config or self.config, self.absences,
+                                  checkpoint=checkpoint, solver=solver)
+            self.status_var.set(f"Planung gespeichert in {self.store_file}")
         except Exception as e:
-            messagebox.showerror("Fehler", f"Fehler bei der Planung: {e}")
+            messagebox.showerror("Fehler", f"Fehler beim Speichern der Planung: {e}")
+
+    def continue_planning(self):
+        """Setzt Startdatum auf den Tag nach der letzten gespeicherten Planung (ohne Startbesetzung)"""
+        found = None
+        if os.path.exists(self.store_file):
+            with PlanStore(self.store_file) as store:
+                found = store.latest_checkpoint()
+        if found is None:
+            messagebox.showinfo("Info", "Keine gespeicherte Planung zum Fortsetzen vorhanden.")
+            return
+        next_day, _ = found
+        self.start_date_entry.delete(0, tk.END)
+        self.start_date_entry.insert(0, next_day.strftime(DATE_FORMAT))
+        for entry in (self.first_vm_entry, self.first_nm_entry, self.first_support_entry):
+            entry.delete(0, tk.END)
+        self.status_var.set("Fortsetzung am gespeicherten Rotationsstand – bitte Planung erstellen")
+
+    # -------------------- Hintergrundaufgaben --------------------
+
+    def start_task(self, task, on_done, status):
+        """Startet eine BackgroundTask und fragt sie per ``root.after`` ab, bis sie fertig ist"""
+        self.task = task
+        self.plan_button.configure(state="disabled")
+        self.export_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar["value"] = 0
+        self.status_var.set(status)
+        task.start()
+        self.root.after(POLL_MS, self.poll_task, task, on_done)
+
+    def poll_task(self, task, on_done):
+        self.progress_bar["value"] = task.progress * 100
+        if not task.done:
+            self.root.after(POLL_MS, self.poll_task, task, on_done)
+            return
+        self.task = None
+        self.plan_button.configure(state="normal")
+        self.export_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        on_done(task)
+
+    def cancel_task(self):
+        """Bricht die laufende Planung bzw. den laufenden Export ab"""
+        if self.task is not None and not self.task.cancelled:
+            self.task.cancel()
+            self.status_var.set("Wird abgebrochen…")
 
     # -------------------- Anzeige & Export --------------------
 
-    def display_results(self):
-        """Zeigt die Planungsergebnisse in der Treeview an"""
-        for item in self.result_tree.get_children():
-            self.result_tree.delete(item)
-        for row in self.planning_result:
-            self.result_tree.insert(
-                "", tk.END,
-                values=(row["Datum"], row["Wochentag"], row["Vormittag"], row["Nachmittag"], row["Support"])
-            )
+    def display_results(self, changed=None):
+        """Zeigt die Planungsergebnisse in der Treeview an.
+
+        Mit ``changed`` (Tagesnummern) werden nur diese Zeilen aktualisiert;
+        die Item-ID jeder Zeile ist ihre Tagesnummer.
+        """
+        if changed is not None:
+            for tag_nr in sorted(changed):
+                self.result_tree.item(str(tag_nr), values=self._result_values(self.planning_result[tag_nr]))
+            return
+        self.result_tree.delete(*self.result_tree.get_children())
+        for tag_nr, row in enumerate(self.planning_result):
+            self.result_tree.insert("", tk.END, iid=str(tag_nr), values=self._result_values(row))
+
+    @staticmethod
+    def _result_values(row):
+        return (row["Datum"], row["Wochentag"], row["Vormittag"], row["Nachmittag"], row["Support"])
 
     def export_excel(self):
         """Exportiert die Planung nach Excel im Layout:
         Spalten: Datum | Wochentag | Vormittag (grün) | Nachmittag (grün) | Support (gelb)
-        Samstag wird aufgeführt (ohne Planung), nach jedem Samstag eine graue Trennzeile.
+        Tage ohne Dienste (Standard: Samstag) werden leer aufgeführt, nach jeder Woche eine graue Trennzeile.
         """
+        if self.task is not None:
+            return
         if not self.planning_result:
             messagebox.showwarning("Warnung", "Keine Planung vorhanden! Bitte erst Planung erstellen.")
             return
@@ -459,115 +681,119 @@ Hinweise zur Pool-Konfiguration:
         if not filename:
             return
 
-        # Daten in gewünschter Reihenfolge aufbauen
-        rows = []
-        for r in self.planning_result:
+        rows = list(self.planning_result)  # Schnappschuss; Nachplanungen ersetzen nur Listeneinträge
+        config = normalize_config(self.config)  # für das Blatt "Auswertung"
+        trace = self.trace
+
+        def work(progress, should_stop):
+            with timed(trace, "export"):
+                return write(progress, should_stop)
+
+        def write(progress, should_stop):
+            def render(rows, fmt):
+                return render_bytes(track(rows, len(rows), progress, should_stop), fmt,
+                                    config if fmt == "xlsx" else None)
+
+            # Unveränderter Plan: bereits erzeugte Bytes wiederverwenden. Excel mit Formatierung
+            # (zeilenweise gestreamt, Trennzeilen direkt an ihrer Stelle); bei Abbruch wird keine
+            # Datei geschrieben.
+            fallback = False
+            target = filename
+            fmt = "csv" if filename.lower().endswith(".csv") else "xlsx"
             try:
-                datum_dt = datetime.strptime(r["Datum"], "%d.%m.%Y")
-            except Exception:
-                datum_dt = r["Datum"]
-            rows.append({
-                "Datum": datum_dt,
-                "Wochentag": r["Wochentag"],
-                "Vormittag": r["Vormittag"],
-                "Nachmittag": r["Nachmittag"],
-                "Support": r["Support"]
-            })
-
-        df = pd.DataFrame(rows, columns=["Datum", "Wochentag", "Vormittag", "Nachmittag", "Support"])
-
-        # CSV-Fallback ohne Formatierung
-        if filename.lower().endswith(".csv"):
-            df2 = df.copy()
-            if isinstance(df2.loc[0, "Datum"], datetime):
-                df2["Datum"] = df2["Datum"].dt.strftime("%d.%m.%Y")
-            df2.to_csv(filename, index=False, encoding="utf-8-sig")
-            messagebox.showinfo("Erfolg", f"CSV-Datei erfolgreich gespeichert: {filename}")
+                data = self.plan_cache.export_bytes(rows, fmt, lambda rows: render(rows, fmt),
+                                                    config if fmt == "xlsx" else None)
+            except ImportError:
+                # CSV-Fallback ohne Formatierung
+                fallback = True
+                target = filename.rsplit(".", 1)[0] + ".csv"
+                data = self.plan_cache.export_bytes(rows, "csv", lambda rows: render(rows, "csv"))
+            with open(target, 'wb') as f:
+                f.write(data)
+            return target, fallback
+
+        self.start_task(BackgroundTask(work), self.export_done, "Export läuft…")
+
+    def export_history(self):
+        """Exportiert alle gespeicherten Zeiträume in eine Excel-Datei: je Zeitraum ein Blatt, vorne eine Übersicht"""
+        if self.task is not None:
+            return
+        if not os.path.exists(self.store_file):
+            messagebox.showinfo("Info", "Noch keine Planung gespeichert.")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
+        if not filename:
+            return
+        store_file = self.store_file
+
+        def work(progress, should_stop):
+            with PlanStore(store_file) as store:
+                periods = store.periods()
+                sheets = []
+                for period in track(periods, len(periods), progress, should_stop):
+                    name = f"{period['start'].strftime(DATE_FORMAT)} - {period['end'].strftime(DATE_FORMAT)}"
+                    sheets.append((name, store.rows_between(period["start"], period["end"]),
+                                   store.latest_config(period["start"])))
+            # Eine Mappe in einem Durchgang; bei Abbruch wird keine Datei geschrieben
+            data = io.BytesIO()
+            write_workbook(sheets, data)
+            with open(filename, 'wb') as f:
+                f.write(data.getvalue())
+            return filename, False
+
+        self.start_task(BackgroundTask(work), self.export_done, "Export läuft…")
+
+    def save_trace(self):
+        """Speichert die Messwerte der letzten Planung als JSON oder Trace-Datei (chrome://tracing)"""
+        if self.trace is None:
+            messagebox.showinfo("Info", "Kein Protokoll vorhanden. Bitte \"Planung protokollieren\" "
+                                        "aktivieren und die Planung erstellen.")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("Trace files", "*.trace"), ("All files", "*.*")]
+        )
+        if not filename:
             return
-
-        # Excel mit Formatierung
         try:
-            from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
-            from openpyxl.utils import get_column_letter
-
-            # Farbpalette (an Screenshot angelehnt)
-            GREEN  = PatternFill(start_color="A9D18E", end_color="A9D18E", fill_type="solid")  # grün für Vormittag & Nachmittag
-            YELLOW = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")  # gelb für Support
-            GREY   = PatternFill(start_color="BFBFBF", end_color="BFBFBF", fill_type="solid")  # Trennzeile
-
-            thin = Border(
-                left=Side(style="thin"), right=Side(style="thin"),
-                top=Side(style="thin"), bottom=Side(style="thin")
-            )
-
-            with pd.ExcelWriter(filename, engine="openpyxl", date_format="DD.MM.YYYY") as writer:
-                df.to_excel(writer, sheet_name="Notdienst_Planung", index=False)
-                ws = writer.sheets["Notdienst_Planung"]
-
-                # Spaltenbreiten
-                widths = [12, 14, 14, 14, 14]  # A..E
-                for idx, w in enumerate(widths, start=1):
-                    ws.column_dimensions[get_column_letter(idx)].width = w
-
-                # Header fett & zentriert
-                for c in ws[1]:
-                    c.font = Font(bold=True)
-                    c.alignment = Alignment(horizontal="center")
-                    c.border = thin
-
-                max_row = ws.max_row
-                max_col = ws.max_column
-
-                # Datenzellen: Rahmen + Füllfarben (3&4 grün, 5 gelb; 1&2 weiß)
-                for r in range(2, max_row + 1):
-                    for c in range(1, max_col + 1):
-                        cell = ws.cell(row=r, column=c)
-                        cell.border = thin
-                        cell.alignment = Alignment(horizontal=("left" if c in (1, 2) else "center"))
-                        if c == 3:        # Vormittag
-                            cell.fill = GREEN
-                        elif c == 4:      # Nachmittag
-                            cell.fill = GREEN
-                        elif c == 5:      # Support
-                            cell.fill = YELLOW
-                        # Spalten 1 & 2 bleiben ohne Fill (weiß)
-
-                # Trennzeilen NACH jedem Samstag (von unten nach oben einfügen)
-                saturday_rows = []
-                for i, wd in enumerate(df["Wochentag"].tolist(), start=2):  # +1 Header, +1 weil 1-basiert
-                    if wd == "Samstag":
-                        saturday_rows.append(i)
-
-                for row_idx in sorted(saturday_rows, reverse=True):
-                    ins = row_idx + 1  # Zeile nach Samstag
-                    ws.insert_rows(ins)
-                    for c in range(1, max_col + 1):
-                        cell = ws.cell(row=ins, column=c)
-                        cell.fill = GREY
-                        cell.border = thin
-
-            messagebox.showinfo("Erfolg", f"Excel-Datei erfolgreich gespeichert: {filename}")
-
-        except ImportError:
-            csv_filename = filename.rsplit(".", 1)[0] + ".csv"
-            df2 = df.copy()
-            if isinstance(df2.loc[0, "Datum"], datetime):
-                df2["Datum"] = df2["Datum"].dt.strftime("%d.%m.%Y")
-            df2.to_csv(csv_filename, index=False, encoding="utf-8-sig")
+            self.trace.write(filename)
+            self.status_var.set(f"Protokoll gespeichert: {filename}")
+        except OSError as e:
+            messagebox.showerror("Fehler", f"Fehler beim Speichern des Protokolls: {e}")
+
+    def export_done(self, task):
+        """Meldet das Ergebnis eines Exports (im Tk-Thread)"""
+        if isinstance(task.error, Cancelled):
+            self.status_var.set("Export abgebrochen")
+            return
+        self.status_var.set("")
+        if task.error is not None:
+            messagebox.showerror("Fehler", f"Fehler beim Export: {task.error}")
+            return
+        filename, fallback = task.result
+        if fallback:
             messagebox.showinfo(
                 "Info",
                 "openpyxl ist nicht installiert. CSV gespeichert: "
-                f"{csv_filename}\nFür formatiertes Excel bitte installieren: pip install openpyxl"
+                f"{filename}\nFür formatiertes Excel bitte installieren: pip install openpyxl"
             )
-        except Exception as e:
-            messagebox.showerror("Fehler", f"Fehler beim Export: {e}")
+        elif filename.lower().endswith(".csv"):
+            messagebox.showinfo("Erfolg", f"CSV-Datei erfolgreich gespeichert: {filename}")
+        else:
+            messagebox.showinfo("Erfolg", f"Excel-Datei erfolgreich gespeichert: {filename}")
 
 
-def main():
+def main(argv=None):
+    """Startet die GUI; mit Kommandozeilenargumenten die CLI (siehe schichtplaner.cli)"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from schichtplaner.cli import main as cli_main
+        return cli_main(argv)
+    _load_tk()
     root = tk.Tk()
     app = ShiftPlanner(root)
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Headless-Bausteine des Notdienst Schichtplaners (ohne Tk/pandas).
+
+Nur die Planungs-Engine wird beim Import geladen; alle weiteren Namen aus
+``__all__`` importieren ihr Modul erst beim ersten Zugriff (``__getattr__``),
+damit CLI und GUI nicht sqlite3, csv, asyncio usw. laden, solange sie sie
+nicht brauchen.
+"""
+
+__version__ = "1.1"
+
+from importlib import import_module
+
+from .engine import (
+    COLUMNS, PlanningError, Rotation, count_plan_days, create_plan, default_config, normalize_config, parse_date,
+    plan_dates,
+)
+
+_LAZY = {
+    "load_absence_file": "absences",
+    "analyze": "analytics",
+    "PlanCache": "cache",
+    "plan_key": "cache",
+    "render_bytes": "export",
+    "write_csv": "export",
+    "write_json": "export",
+    "write_workbook": "export",
+    "write_xlsx": "export",
+    "IncrementalPlan": "incremental",
+    "PoolIndex": "index",
+    "Roster": "roster",
+    "check_seeds": "roster",
+    "load_roster": "roster",
+    "RuleSet": "rules",
+    "LocalSearchSolver": "solver",
+    "optimize_plan": "solver",
+    "PlanStore": "store",
+    "BackgroundTask": "tasks",
+    "Cancelled": "tasks",
+    "coupled_groups": "teams",
+    "plan_teams": "teams",
+    "PlanTrace": "trace",
+}
+
+__all__ = [
+    "COLUMNS", "PlanningError", "count_plan_days", "create_plan", "default_config", "normalize_config",
+    "parse_date", "plan_dates", "Rotation", "IncrementalPlan", "PoolIndex", "LocalSearchSolver", "optimize_plan",
+    "write_csv", "write_json", "write_xlsx", "BackgroundTask", "Cancelled",
+    "PlanStore", "load_absence_file", "coupled_groups", "plan_teams", "RuleSet",
+    "PlanTrace", "PlanCache", "plan_key", "render_bytes", "Roster", "load_roster", "check_seeds",
+    "analyze", "write_workbook",
+]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
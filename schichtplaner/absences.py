@@ -0,0 +1,225 @@
+"""Massenimport von Abwesenheiten aus CSV- und iCalendar-Dateien (.ics).
+
+Beide Formate werden zeilenweise gelesen; jeder Eintrag (ein Tag oder ein
+Zeitraum) wird sofort auf die einzelnen Kalendertage aufgeteilt und in
+``{date: set(kürzel)}`` eingetragen. Doppelte Einträge fallen dabei weg.
+
+CSV: Trennzeichen ``;`` oder ``,``, Kopfzeile mit Spalten für Mitarbeiter
+(``Mitarbeiter``/``Kürzel``/``Name``/``employee``), Beginn
+(``Von``/``Beginn``/``Start``/``Datum``/``date``) und optional Ende
+(``Bis``/``Ende``/``end``). Daten als TT.MM.YYYY oder YYYY-MM-DD; das Ende ist
+inklusive. Ohne erkannte Kopfzeile gelten die Spalten Mitarbeiter, Von, Bis.
+
+iCalendar: je ``VEVENT`` ``DTSTART``/``DTEND`` (bei ganztägigen Terminen ist
+``DTEND`` exklusiv, wie im Standard). Der Mitarbeiter wird aus ``SUMMARY``,
+``ATTENDEE;CN=`` oder ``CATEGORIES`` ermittelt: mit ``employees`` das erste
+bekannte Kürzel, sonst das erste Wort der Zusammenfassung. Wiederholungen
+(``RRULE``) werden nicht expandiert.
+
+JSON: ``{"TT.MM.YYYY": ["KÜRZEL", ...]}``, ein einzelnes Kürzel auch als
+String. Bei CSV und JSON lösen mit ``employees`` unbekannte Kürzel einen
+``PlanningError`` aus, statt stillschweigend ignoriert zu werden.
+"""
+
+import csv
+import json
+import os
+import re
+from datetime import date, timedelta
+
+from .engine import PlanningError
+
+
+EMPLOYEE_COLUMNS = ("mitarbeiter", "kürzel", "kuerzel", "name", "employee")
+START_COLUMNS = ("von", "beginn", "start", "datum", "date", "from")
+END_COLUMNS = ("bis", "ende", "end", "to")
+MAX_SPAN_DAYS = 366 * 5  # Schutz vor Tippfehlern wie 2062 statt 2026
+
+_WORD = re.compile(r"[\w-]+")
+
+
+def parse_import_date(value):
+    """'TT.MM.YYYY', 'YYYY-MM-DD' oder iCalendar 'YYYYMMDD[THHMMSS[Z]]' als date"""
+    value = value.strip()
+    try:
+        if len(value) >= 8 and value[:8].isdigit():
+            return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        if "-" in value:
+            return date.fromisoformat(value[:10])
+        day, month, year = value.split(".")
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise PlanningError(f"Ungültiges Datum im Import: {value!r}") from None
+
+
+def add_range(absences, employee, start, end):
+    """Trägt ``employee`` für alle Tage von ``start`` bis ``end`` (inklusive) ein"""
+    if end < start:
+        start, end = end, start
+    if (end - start).days > MAX_SPAN_DAYS:
+        raise PlanningError(f"Abwesenheit von {employee} ist zu lang: {start} bis {end}")
+    one_day = timedelta(days=1)
+    day = start
+    while day <= end:
+        employees = absences.get(day)
+        if employees is None:
+            employees = absences[day] = set()
+        employees.add(employee)
+        day += one_day
+    return absences
+
+
+def _column(header, names):
+    for nr, title in enumerate(header):
+        if title.strip().lower() in names:
+            return nr
+    return None
+
+
+def read_csv(lines, absences=None, employees=None):
+    """Liest Abwesenheiten aus CSV-Zeilen (Datei-Objekt oder Iterable von Strings).
+
+    Mit ``employees`` lösen unbekannte Kürzel einen ``PlanningError`` aus.
+    """
+    absences = {} if absences is None else absences
+    unknown = set()
+    lines = iter(lines)
+    first = next(lines, "")
+    delimiter = ";" if first.count(";") >= first.count(",") and ";" in first else ","
+    header = next(csv.reader([first], delimiter=delimiter), [])
+    emp_col, start_col, end_col = (_column(header, names) for names in (EMPLOYEE_COLUMNS, START_COLUMNS, END_COLUMNS))
+    if emp_col is None or start_col is None:
+        emp_col, start_col, end_col = 0, 1, 2
+        lines = _chain(first, lines)  # keine Kopfzeile: erste Zeile sind schon Daten
+    for record in csv.reader(lines, delimiter=delimiter):
+        if len(record) <= max(emp_col, start_col):
+            continue
+        employee = record[emp_col].strip()
+        start_value = record[start_col].strip()
+        if not employee or not start_value:
+            continue
+        if employees and employee not in employees:
+            unknown.add(employee)
+            continue
+        end_value = record[end_col].strip() if end_col is not None and end_col < len(record) else ""
+        start = parse_import_date(start_value)
+        add_range(absences, employee, start, parse_import_date(end_value) if end_value else start)
+    if unknown:
+        raise PlanningError(f"Unbekannte Kürzel in den Abwesenheiten: {', '.join(sorted(unknown))}")
+    return absences
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _unfold(lines):
+    """iCalendar-Zeilen mit Fortsetzungen (führendes Leerzeichen/Tab) zusammenfügen"""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _event_employee(event, employees):
+    texts = [event.get("SUMMARY", "")] + event.get("ATTENDEE", []) + [event.get("CATEGORIES", "")]
+    if employees:
+        for text in texts:
+            for word in _WORD.findall(text):
+                if word in employees:
+                    return word
+        return None
+    words = _WORD.findall(event.get("SUMMARY", ""))
+    return words[0] if words else None
+
+
+def read_ics(lines, absences=None, employees=None):
+    """Liest Abwesenheiten aus iCalendar-Zeilen; ``employees`` sind die bekannten Kürzel"""
+    absences = {} if absences is None else absences
+    employees = set(employees) if employees else None
+    event = None
+    for line in _unfold(lines):
+        name, _, value = line.partition(":")
+        key, _, params = name.partition(";")
+        key = key.upper()
+        if key == "BEGIN" and value.strip().upper() == "VEVENT":
+            event = {"ATTENDEE": []}
+        elif event is None:
+            continue
+        elif key == "END" and value.strip().upper() == "VEVENT":
+            _add_event(absences, event, employees)
+            event = None
+        elif key in ("DTSTART", "DTEND"):
+            all_day = "VALUE=DATE" in params.upper() or len(value.strip()) == 8
+            event[key] = (parse_import_date(value), all_day, value.strip())
+        elif key == "ATTENDEE":
+            cn = re.search(r"CN=\"?([^\";:]+)", params, re.IGNORECASE)
+            if cn:
+                event["ATTENDEE"].append(cn.group(1))
+        elif key in ("SUMMARY", "CATEGORIES"):
+            event[key] = value
+    return absences
+
+
+def _add_event(absences, event, employees):
+    if "DTSTART" not in event:
+        return
+    employee = _event_employee(event, employees)
+    if not employee:
+        return
+    start, _, _ = event["DTSTART"]
+    end = start
+    if "DTEND" in event:
+        end, all_day, raw = event["DTEND"]
+        # Ganztägig: DTEND ist der Folgetag; mit Uhrzeit 00:00 endet der Termin ebenfalls am Vortag
+        if (all_day or raw[9:15] == "000000") and end > start:
+            end -= timedelta(days=1)
+    add_range(absences, employee, start, end)
+
+
+def read_json(data, absences=None, employees=None):
+    """Trägt ``{"TT.MM.YYYY": ["KÜRZEL", ...]}`` ein; ein einzelnes Kürzel darf auch als String stehen.
+
+    Mit ``employees`` lösen unbekannte Kürzel einen ``PlanningError`` aus.
+    """
+    absences = {} if absences is None else absences
+    unknown = set()
+    for day, names in data.items():
+        if isinstance(names, str):
+            names = [names]
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise PlanningError(f"Abwesenheiten am {day} müssen eine Liste von Kürzeln sein: {names!r}")
+        names = [name.strip() for name in names if name.strip()]
+        if employees:
+            unknown.update(name for name in names if name not in employees)
+        absences.setdefault(parse_import_date(day), set()).update(names)
+    if unknown:
+        raise PlanningError(f"Unbekannte Kürzel in den Abwesenheiten: {', '.join(sorted(unknown))}")
+    return absences
+
+
+def load_absence_file(path, absences=None, employees=None):
+    """Liest eine Abwesenheitsdatei (.csv, .ics oder JSON ``{"TT.MM.YYYY": [...]}``) nach Dateiendung"""
+    absences = {} if absences is None else absences
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise PlanningError(f"{path}: erwartet wird ein Objekt {{\"TT.MM.YYYY\": [\"KÜRZEL\", ...]}}")
+        return read_json(data, absences, employees)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if ext in (".ics", ".ical", ".ifb"):
+            return read_ics(f, absences, employees)
+        if ext in (".csv", ".txt"):
+            return read_csv(f, absences, employees)
+    raise PlanningError(f"Unbekanntes Dateiformat für Abwesenheiten: {path}")
+
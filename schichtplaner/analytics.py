@@ -0,0 +1,149 @@
+"""Auswertung von Planungen über beliebige Zeiträume (auch mehrjährige Historie aus dem Plan-Store).
+
+``analyze(rows, config)`` liefert je Mitarbeiter die Anzahl Vormittags-,
+Nachmittags- und Support-Dienste, die längste Serie aufeinanderfolgender
+Planungstage mit Dienst, Verstöße gegen die Ruhezeiten der Regeln und wie oft
+ein Vormittag aus Pool B ohne Support blieb; dazu die offenen Dienste.
+``metrics.plan_stats`` fasst dieselbe Auswertung für Planungen zusammen.
+
+Die Zeilen werden einmal spaltenweise in Ganzzahl-Arrays übersetzt
+(Mitarbeiter-ID je Tag und Dienst, ``OPEN``/``INACTIVE`` für offene bzw. nicht
+zu besetzende Dienste). Die Dienste je Mitarbeiter und die offenen Dienste
+zählt ``Counter`` über ganze Spalten; Ruhezeiten, Arbeitstage und fehlender
+Support laufen als Generatoren über ``zip`` der Spalten (Vortag/heute) mit
+einer Bedingung je Zeile, ohne Dict-Zugriffe auf die Zeilen. Die Serien
+brauchen eine Python-Schleife über die Tage. Mehrere Jahre (einige tausend
+Zeilen) dauern damit wenige Millisekunden.
+"""
+
+from array import array
+from collections import Counter
+
+from .engine import SHIFT_COLUMNS, SHIFT_SUPPORT, normalize_config, parse_day
+from .rules import RuleSet
+
+
+OPEN, INACTIVE = -1, -2
+VM, NM, SUPPORT = range(3)      # Spaltenindex wie SHIFT_COLUMNS
+REPORT_COLUMNS = (
+    "Mitarbeiter", "Vormittag", "Nachmittag", "Support", "Gesamt", "Serie max", "Ruhezeit-Verstöße", "Ohne Support",
+)
+
+
+def eligible_employees(config):
+    """Alle Mitarbeiter, die eine Schicht übernehmen können (Pool A, C, D)"""
+    config = normalize_config(config)
+    employees = []
+    seen = set()
+    for key in ("pool_vm_alle", "pool_vm_support", "pool_nm_alle"):
+        for name in config[key]:
+            if name not in seen:
+                seen.add(name)
+                employees.append(name)
+    return employees
+
+
+class PlanColumns:
+    """Planungszeilen spaltenweise: ``dates``, ``names`` und je Dienst ein ``array`` von Mitarbeiter-IDs"""
+
+    def __init__(self, rows, names=()):
+        self.names = list(names)
+        ids = {name: nr for nr, name in enumerate(self.names)}
+        self.dates = []
+        self.shifts = [array('i') for _ in SHIFT_COLUMNS]
+
+        def code(value):
+            if value is None:
+                return OPEN
+            if value == "":
+                return INACTIVE
+            nr = ids.get(value)
+            if nr is None:
+                nr = ids[value] = len(self.names)
+                self.names.append(value)
+            return nr
+
+        for row in rows:
+            self.dates.append(parse_day(row["Datum"]))
+            for column, values in zip(SHIFT_COLUMNS, self.shifts):
+                values.append(code(row[column]))
+
+    def __len__(self):
+        return len(self.dates)
+
+
+def analyze(rows, config):
+    """Kennzahlen einer Planung bzw. Historie (``rows`` nach Datum sortiert).
+
+    Als Vortag gilt die vorherige Zeile, wenn sie der vorherige Planungstag
+    laut Regeln ist (Lücken in der Historie unterbrechen Serien und
+    Ruhezeiten). Rückgabe::
+
+        {"von", "bis", "tage", "arbeitstage", "offen": {dienst: n},
+         "ruhezeit_verstoesse", "mitarbeiter": [{spalte aus REPORT_COLUMNS: wert}]}
+    """
+    rules = RuleSet(config)
+    config = normalize_config(config)
+    plan = PlanColumns(rows, eligible_employees(config))
+    names = plan.names
+    vm, nm, support = plan.shifts
+    n = len(plan)
+
+    # Vortag vorhanden (1) bzw. Lücke/erster Tag (0), als Spalte
+    previous_day = array('b', [0]) + array('b', (
+        rules.next_plan_day(before) == day for before, day in zip(plan.dates, plan.dates[1:])))
+
+    counts = [Counter(values) for values in plan.shifts]
+    open_shifts = {"Vormittag": counts[VM][OPEN], "Nachmittag": counts[NM][OPEN]}
+    worked = sum(1 for a, b, c in zip(vm, nm, support) if a != INACTIVE or b != INACTIVE or c != INACTIVE)
+
+    # Ruhezeiten: gleiche ID im sperrenden Dienst des Vortags und im Dienst heute
+    rest = Counter()
+    for today, sources in enumerate(rules.rest):
+        for source in sources:
+            rest.update(a for a, b, linked in zip(plan.shifts[source], plan.shifts[today][1:], previous_day[1:])
+                        if linked and a == b and a >= 0)
+
+    # Vormittag aus Pool B ohne Support an Tagen mit Support-Dienst
+    ids = {name: nr for nr, name in enumerate(names)}
+    pool_b = {ids[name] for name in config["pool_vm_teilweise"] if name in ids}
+    support_days = array('b', (bool(rules.shifts_on(day) & SHIFT_SUPPORT) for day in plan.dates))
+    no_support = Counter(a for a, s, active in zip(vm, support, support_days) if active and s < 0 and a in pool_b)
+    open_shifts["Support"] = sum(no_support.values())
+
+    # Längste Serie aufeinanderfolgender Planungstage mit Dienst
+    run = [0] * len(names)
+    last = [-2] * len(names)
+    longest = [0] * len(names)
+    for i in range(n):
+        linked = previous_day[i]
+        for nr in {vm[i], nm[i], support[i]}:
+            if nr < 0:
+                continue
+            run[nr] = run[nr] + 1 if linked and last[nr] == i - 1 else 1
+            last[nr] = i
+            if run[nr] > longest[nr]:
+                longest[nr] = run[nr]
+
+    employees = []
+    for nr, name in enumerate(names):
+        shifts = [counts[VM][nr], counts[NM][nr], counts[SUPPORT][nr]]
+        employees.append(dict(zip(REPORT_COLUMNS, (
+            name, *shifts, sum(shifts), longest[nr], rest[nr], no_support[nr],
+        ))))
+    return {
+        "von": plan.dates[0].isoformat() if n else None,
+        "bis": plan.dates[-1].isoformat() if n else None,
+        "tage": n,
+        "arbeitstage": worked,
+        "offen": open_shifts,
+        "ruhezeit_verstoesse": sum(rest.values()),
+        "mitarbeiter": employees,
+    }
+
+
+def report_table(report):
+    """Tabelle der Auswertung (Kopfzeile plus eine Zeile je Mitarbeiter)"""
+    yield REPORT_COLUMNS
+    for employee in report["mitarbeiter"]:
+        yield tuple(employee[column] for column in REPORT_COLUMNS)
@@ -0,0 +1,218 @@
+"""Stapelbetrieb: viele Planungsvarianten ("Was-wäre-wenn") parallel berechnen.
+
+Szenariodatei (JSON)::
+
+    {
+      "config": "shift_config.json",          # Pfad (relativ zur Datei) oder Pools als Objekt
+      "start_date": "05.01.2026",
+      "days": 12,
+      "first_vm": "MH", "first_nm": "IL", "first_support": "",
+      "absences": {"07.01.2026": ["RR"]},
+      "solver": "rotation",                   # oder "optimierung" (lokale Suche, siehe solver.py)
+      "time_limit": 2.0,                      # Zeitbudget je Szenario für "optimierung" (Sekunden)
+      "scenarios": [                          # einzelne Varianten, überschreiben die Vorgaben oben
+        {"name": "ohne RR", "absences": {"08.01.2026": ["RR"]}},
+        {"name": "andere Reihenfolge", "pools": {"pool_vm_alle": ["RI", "MH", "TR"]}}
+      ],
+      "grid": {                               # alle Kombinationen (kartesisches Produkt)
+        "first_vm": ["MH", "RI", "TR"],
+        "first_nm": ["IL", "RR"]
+      }
+    }
+
+Jede Variante wird in einem eigenen Prozess geplant; zurück kommt nur eine
+Zusammenfassungszeile (Lücken, Dienste pro Person, Fairness). Mit ``--cache``
+werden die Planungen in einem gemeinsamen Verzeichnis abgelegt, sodass
+wiederholte Läufe (und gleiche Varianten) nicht erneut planen.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from functools import partial
+
+from .cache import PlanCache, plan_key
+from .engine import PlanningError, create_plan
+from .metrics import plan_stats
+from .roster import Roster, check_seeds, load_roster
+from .solver import optimize_plan
+from .teams import default_seeds
+
+
+SCENARIO_KEYS = ("start_date", "days", "first_vm", "first_nm", "first_support", "absences", "solver", "time_limit")
+SUMMARY_COLUMNS = [
+    "Szenario", "Tage", "VM offen", "NM offen", "Support offen", "Lücken",
+    "Dienste min", "Dienste max", "Spannweite", "Std-Abw", "Fehler",
+]
+
+
+def load_scenarios(path):
+    """Liest eine Szenariodatei und gibt die expandierten Einzelszenarien zurück"""
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    return expand_scenarios(spec, base_dir=os.path.dirname(os.path.abspath(path)))
+
+
+def expand_scenarios(spec, base_dir="."):
+    """Expandiert Vorgaben, ``scenarios`` und ``grid`` zu vollständigen Szenarien"""
+    config = spec.get("config", "shift_config.json")
+    if isinstance(config, str):
+        config = load_roster(os.path.join(base_dir, config)).config
+    else:
+        config = Roster(config).config
+
+    defaults = {key: spec[key] for key in SCENARIO_KEYS if key in spec}
+    variants = list(spec.get("scenarios") or [])
+    grid = spec.get("grid") or {}
+    if grid:
+        keys = list(grid)
+        for choice in itertools.product(*(list(enumerate(grid[key], start=1)) for key in keys)):
+            variant = {key: value for key, (_, value) in zip(keys, choice)}
+            variant["name"] = ", ".join(f"{key}={_label(nr, value)}" for key, (nr, value) in zip(keys, choice))
+            variants.append(variant)
+    if not variants:
+        variants = [{}]
+
+    scenarios = []
+    for nr, variant in enumerate(variants, start=1):
+        scenario = dict(defaults)
+        scenario.update({key: variant[key] for key in SCENARIO_KEYS if key in variant})
+        scenario_config = dict(config)
+        scenario_config.update(variant.get("pools") or {})
+        scenario["config"] = scenario_config
+        scenario["name"] = str(variant.get("name") or f"Szenario {nr}")
+        scenarios.append(scenario)
+    return scenarios
+
+
+def _label(nr, value):
+    """Kurzbezeichnung eines Grid-Werts für den Szenarionamen (Objekte über ihre Nummer)"""
+    if isinstance(value, (dict, list)):
+        return f"#{nr}"
+    return str(value)
+
+
+def run_scenario(scenario, cache_dir=None):
+    """Plant ein Szenario und gibt ``(name, plan_stats | None, fehler | None)`` zurück.
+
+    Ohne ``first_vm``/``first_nm`` beginnt der 1. Tag wie in der Kommandozeile mit
+    dem ersten Eintrag aus Pool A bzw. Pool D. Mit ``cache_dir`` werden Planungen
+    dort abgelegt bzw. von dort gelesen (siehe ``cache.py``).
+    """
+    config = scenario["config"]
+    default_vm, default_nm, _ = default_seeds(config)
+    first_vm = scenario.get("first_vm") or default_vm
+    first_nm = scenario.get("first_nm") or default_nm
+    first_support = scenario.get("first_support") or ""
+    args = (config, scenario.get("start_date"), first_vm, first_nm, first_support, scenario.get("absences"))
+    solver = scenario.get("solver", "rotation")
+    days = int(scenario.get("days", 12))
+    time_limit = float(scenario.get("time_limit", 2.0))
+
+    def plan():
+        if solver == "optimierung":
+            return {"rows": optimize_plan(*args, days=days, time_limit=time_limit)}
+        return {"rows": create_plan(*args, days=days)}
+
+    try:
+        check_seeds(config, first_vm, first_nm, first_support)
+        if cache_dir:
+            entry = PlanCache(maxsize=1, directory=cache_dir).plan(
+                plan_key(*args, days=days, solver=solver, time_limit=time_limit), plan)
+        else:
+            entry = plan()
+    except PlanningError as e:
+        return scenario["name"], None, str(e)
+    return scenario["name"], plan_stats(entry["rows"], scenario["config"]), None
+
+
+def run_batch(scenarios, workers=None, cache_dir=None):
+    """Berechnet alle Szenarien parallel (``workers=1``: im aktuellen Prozess)"""
+    run = partial(run_scenario, cache_dir=cache_dir)
+    if workers == 1 or len(scenarios) < 2:
+        return [run(s) for s in scenarios]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(scenarios) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(run, scenarios, chunksize=chunksize))
+
+
+def summary_table(results):
+    """Eine Zeile je Szenario; Dienste pro Person als zusätzliche Spalten"""
+    employees = []
+    seen = set()
+    for _, stats, _ in results:
+        for name in (stats or {}).get("dienste", {}):
+            if name not in seen:
+                seen.add(name)
+                employees.append(name)
+
+    table = []
+    for name, stats, error in results:
+        row = dict.fromkeys(SUMMARY_COLUMNS + employees, "")
+        row["Szenario"] = name
+        if stats is None:
+            row["Fehler"] = error
+        else:
+            row.update({
+                "Tage": stats["tage"],
+                "VM offen": stats["vm_offen"],
+                "NM offen": stats["nm_offen"],
+                "Support offen": stats["support_offen"],
+                "Lücken": stats["luecken"],
+                "Dienste min": stats["dienste_min"],
+                "Dienste max": stats["dienste_max"],
+                "Spannweite": stats["dienste_spannweite"],
+                "Std-Abw": stats["dienste_stdabw"],
+            })
+            for employee, count in stats["dienste"].items():
+                row[employee] = count
+        table.append(row)
+    return table
+
+
+def write_table(table, out, fmt="csv"):
+    """Schreibt die Zusammenfassung als CSV oder JSON in ein Dateiobjekt"""
+    if fmt == "json":
+        json.dump(table, out, indent=2, ensure_ascii=False)
+        out.write("\n")
+        return
+    columns = list(table[0]) if table else SUMMARY_COLUMNS
+    writer = csv.DictWriter(out, fieldnames=columns, delimiter=";")
+    writer.writeheader()
+    writer.writerows(table)
+
+
+def configure_parser(parser):
+    """Argumente des Stapelbetriebs (auch für ``python -m schichtplaner batch``)"""
+    parser.add_argument("scenario_file", help="Szenariodatei (JSON)")
+    parser.add_argument("-o", "--output", help="Ausgabedatei (Standard: stdout)")
+    parser.add_argument("-f", "--format", choices=("csv", "json"), help="Ausgabeformat (Standard: nach Endung, sonst csv)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--cache", help="Zwischenspeicher-Verzeichnis für Planungen (z.B. .plan_cache)")
+    return parser
+
+
+def run_cli(args):
+    """Führt den Stapelbetrieb mit geparsten Argumenten aus"""
+    fmt = args.format or ("json" if (args.output or "").lower().endswith(".json") else "csv")
+    table = summary_table(run_batch(load_scenarios(args.scenario_file), workers=args.workers, cache_dir=args.cache))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8-sig' if fmt == "csv" else 'utf-8', newline='') as f:
+            write_table(table, f, fmt)
+    else:
+        write_table(table, sys.stdout, fmt)
+    return 0
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Viele Planungsszenarien parallel berechnen")
+    return run_cli(configure_parser(parser).parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
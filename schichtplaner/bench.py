@@ -0,0 +1,275 @@
+"""Benchmarks für Planung, Abwesenheitssuche, Ergebnisanzeige und Export.
+
+Erzeugt synthetische Konfigurationen (Poolgröße, Planungszeitraum,
+Abwesenheitsdichte), misst jeweils die beste von ``--repeat`` Laufzeiten und
+schreibt die Ergebnisse als JSON, damit Versionen verglichen werden können::
+
+    python -m schichtplaner.bench -o bench_neu.json
+    python -m schichtplaner.bench --quick --compare bench_alt.json
+
+Messungen, deren Voraussetzungen fehlen (kein Display für die Treeview,
+openpyxl nicht installiert), werden mit ``"skipped"`` und Grund vermerkt.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from . import __version__
+from .engine import DATE_FORMAT, create_plan, parse_day, plan_dates
+from .export import write_csv, write_xlsx
+from .index import PoolIndex
+
+
+START_DATE = "05.01.2026"  # ein Montag
+POOL_SIZES = (10, 100, 1000)
+HORIZONS = (12, 312, 1560)   # 2 Wochen, 1 Jahr, 5 Jahre (Planungstage Mo-Sa)
+DENSITIES = (0.0, 0.05, 0.2)
+QUICK_POOL_SIZES = (10, 100)
+QUICK_HORIZONS = (12, 312)
+QUICK_DENSITIES = (0.0, 0.1)
+
+
+# -------------------- Generatoren --------------------
+
+def synthetic_config(employees, seed=0):
+    """Pool-Konfiguration mit ``employees`` Kürzeln in typischen Anteilen"""
+    rng = random.Random(seed)
+    names = [f"M{i:04d}" for i in range(employees)]
+
+    def pick(share):
+        return rng.sample(names, max(1, round(employees * share)))
+
+    pool_vm_alle = pick(0.6)
+    return {
+        "pool_vm_alle": pool_vm_alle,
+        "pool_vm_teilweise": rng.sample(pool_vm_alle, max(1, len(pool_vm_alle) // 3)),
+        "pool_vm_support": pick(0.4),
+        "pool_nm_alle": pick(0.7),
+        "pool_freitag_abwesend": pick(0.1),
+    }
+
+
+def synthetic_absences(config, days, density, seed=0):
+    """Je Planungstag ein Anteil ``density`` aller Mitarbeiter abwesend"""
+    rng = random.Random(seed)
+    names = sorted({name for pool in config.values() for name in pool})
+    per_day = round(len(names) * density)
+    if not per_day:
+        return {}
+    return {d.strftime(DATE_FORMAT): rng.sample(names, per_day) for d in plan_dates(START_DATE, days)}
+
+
+def seeds(config):
+    """Startbesetzung: erster Eintrag aus Pool A und Pool D"""
+    return config["pool_vm_alle"][0], config["pool_nm_alle"][0], ""
+
+
+# -------------------- Messungen --------------------
+
+def best_of(repeat, func):
+    """Beste Laufzeit (Sekunden) aus ``repeat`` Durchläufen"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_plan(config, absences, days, repeat):
+    first_vm, first_nm, first_support = seeds(config)
+    return best_of(repeat, lambda: create_plan(config, START_DATE, first_vm, first_nm, first_support, absences, days=days))
+
+
+def bench_absence_lookup(config, absences, days, repeat):
+    """Aufbau der Abwesenheits-Bitsets plus eine Abfrage je Planungstag"""
+    dates = [d.date() for d in plan_dates(START_DATE, days)]
+
+    def run():
+        masks = PoolIndex(config).absence_masks(absences, key=parse_day)
+        for day in dates:
+            masks.get(day, 0)
+
+    return best_of(repeat, run)
+
+
+def bench_export_csv(rows, repeat):
+    return best_of(repeat, lambda: write_csv(rows, io.StringIO()))
+
+
+def bench_export_xlsx(rows, repeat):
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return None, "openpyxl nicht installiert"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        return best_of(repeat, lambda: write_xlsx(rows, path)), None
+
+
+class TreeviewBench:
+    """Misst ``ShiftPlanner.display_results`` auf einer echten (versteckten) Treeview"""
+
+    def __init__(self):
+        self.root = None
+        self.reason = None
+        try:
+            import SchichtplanerDG
+            SchichtplanerDG._load_tk()
+            self.gui = SchichtplanerDG
+            self.root = SchichtplanerDG.tk.Tk()
+            self.root.withdraw()
+        except ImportError:
+            self.reason = "SchichtplanerDG.py nicht im Suchpfad"
+        except Exception as e:  # z.B. TclError ohne Display
+            self.reason = f"Tk nicht verfügbar: {e}"
+
+    def run(self, rows, repeat):
+        """Zeiten für kompletten Aufbau und Aktualisierung einer einzelnen Zeile"""
+        if self.root is None:
+            return (None, None), self.reason
+        ttk = self.gui.ttk
+        frame = ttk.Frame(self.root)
+        columns = ("Datum", "Wochentag", "Vormittag", "Nachmittag", "Support")
+        planner = self.gui.ShiftPlanner.__new__(self.gui.ShiftPlanner)
+        planner.root = self.root
+        planner.result_tree = ttk.Treeview(frame, columns=columns, show="headings")
+        planner.planning_result = rows
+
+        def run():
+            planner.display_results()
+            self.root.update_idletasks()
+
+        def run_changed():
+            planner.display_results(changed={len(rows) // 2})
+            self.root.update_idletasks()
+
+        seconds = best_of(repeat, run), best_of(repeat, run_changed)
+        frame.destroy()
+        return seconds, None
+
+    def close(self):
+        if self.root is not None:
+            self.root.destroy()
+
+
+def run_benchmarks(pool_sizes=POOL_SIZES, horizons=HORIZONS, densities=DENSITIES, repeat=3, gui=True, log=None):
+    """Führt alle Messungen aus und gibt die Ergebnisliste zurück"""
+    results = []
+    treeview = TreeviewBench() if gui else None
+
+    def record(metric, case, seconds, skipped=None):
+        entry = {"metric": metric, "case": case}
+        if skipped:
+            entry["skipped"] = skipped
+        else:
+            entry["seconds"] = round(seconds, 6)
+        results.append(entry)
+        if log is not None:
+            shown = skipped or f"{seconds * 1000:.2f} ms"
+            log(f"{metric:16s} {json.dumps(case)}: {shown}")
+
+    try:
+        for employees in pool_sizes:
+            config = synthetic_config(employees)
+            for days in horizons:
+                for density in densities:
+                    case = {"employees": employees, "days": days, "density": density}
+                    absences = synthetic_absences(config, days, density)
+                    record("plan", case, bench_plan(config, absences, days, repeat))
+                    record("absence_lookup", case, bench_absence_lookup(config, absences, days, repeat))
+
+                # Anzeige und Export hängen nicht von der Abwesenheitsdichte ab
+                case = {"employees": employees, "days": days}
+                first_vm, first_nm, first_support = seeds(config)
+                rows = create_plan(config, START_DATE, first_vm, first_nm, first_support, days=days)
+                record("export_csv", case, bench_export_csv(rows, repeat))
+                seconds, skipped = bench_export_xlsx(rows, repeat)
+                record("export_xlsx", case, seconds, skipped)
+                if treeview is not None:
+                    (full, changed), skipped = treeview.run(rows, repeat)
+                    record("display_results", case, full, skipped)
+                    record("display_changed", case, changed, skipped)
+    finally:
+        if treeview is not None:
+            treeview.close()
+    return results
+
+
+def report(results, repeat):
+    """Vollständiger, maschinenlesbarer Bericht"""
+    return {
+        "version": __version__,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=1.2):
+    """Vergleicht zwei Berichte; gibt Zeilen ``(metric, case, alt, neu, faktor)`` und Regressionen zurück"""
+    def key(entry):
+        return entry["metric"], json.dumps(entry["case"], sort_keys=True)
+
+    baseline = {key(e): e for e in old["results"] if "seconds" in e}
+    rows = []
+    regressions = []
+    for entry in new["results"]:
+        before = baseline.get(key(entry))
+        if before is None or "seconds" not in entry or not before["seconds"]:
+            continue
+        factor = entry["seconds"] / before["seconds"]
+        row = (entry["metric"], entry["case"], before["seconds"], entry["seconds"], factor)
+        rows.append(row)
+        if factor > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks für Planung und Export")
+    parser.add_argument("-o", "--output", help="JSON-Bericht (Standard: stdout)")
+    parser.add_argument("--quick", action="store_true", help="kleines Raster für schnelle Läufe")
+    parser.add_argument("--repeat", type=int, default=3, help="Durchläufe je Messung (beste zählt)")
+    parser.add_argument("--no-gui", action="store_true", help="Treeview-Messung auslassen")
+    parser.add_argument("--compare", help="früheren Bericht vergleichen")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Faktor, ab dem eine Messung als Regression gilt")
+    args = parser.parse_args(argv)
+
+    grid = (QUICK_POOL_SIZES, QUICK_HORIZONS, QUICK_DENSITIES) if args.quick else (POOL_SIZES, HORIZONS, DENSITIES)
+    results = run_benchmarks(*grid, repeat=args.repeat, gui=not args.no_gui,
+                             log=lambda line: print(line, file=sys.stderr))
+    data = report(results, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        rows, regressions = compare(old, data, args.threshold)
+        for metric, case, before, after, factor in rows:
+            mark = "  <-- langsamer" if factor > args.threshold else ""
+            print(f"{metric:16s} {json.dumps(case)}: {before * 1000:.2f} -> {after * 1000:.2f} ms "
+                  f"(x{factor:.2f}){mark}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
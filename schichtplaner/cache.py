@@ -0,0 +1,241 @@
+"""Zwischenspeicher für Planungen und Exportdateien (LRU, optional auf der Festplatte).
+
+Der Schlüssel einer Planung (``plan_key``) ist ein SHA-256-Hash über die
+normalisierten Eingaben: Pools und Regeln, Startdatum, Startbesetzung bzw.
+Checkpoint, Abwesenheiten (nach Datum sortiert, ohne leere Tage und
+Doppelte), Anzahl Tage und Verfahren. Gleiche Eingaben in anderer
+Schreibweise ("5.1.2026" statt "05.01.2026", andere Reihenfolge der
+Abwesenden) ergeben denselben Schlüssel.
+
+Exporte werden über den Inhalt der Planungszeilen und das Format
+verschlüsselt (``rows_key``, bei Excel mit Auswertungsblatt zusätzlich über
+Pools und Regeln): ein unveränderter Plan wird nicht erneut formatiert,
+sondern die bereits erzeugten Bytes werden geschrieben.
+
+Mit ``directory`` werden Einträge zusätzlich als Dateien abgelegt
+(``<schlüssel>.json`` bzw. ``<schlüssel>.<format>``) und überleben damit
+Programmende sowie Prozessgrenzen (Stapelbetrieb, cron). Dateien werden
+atomar ersetzt; über ``max_files`` hinaus werden die am längsten nicht
+benutzten gelöscht. Das Verzeichnis wird dafür nicht bei jedem Schreiben
+durchsucht: ``PlanCache`` zählt die eigenen neuen Dateien mit und prüft erst
+beim Überschreiten von ``max_files`` bzw. alle ``PRUNE_EVERY`` Schreibvorgänge
+(wegen anderer Prozesse im selben Verzeichnis). Räumen mehrere Prozesse
+gleichzeitig auf, werden bereits gelöschte Dateien übersprungen.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .engine import POOL_KEYS, SHIFT_COLUMNS, normalize_config, parse_day
+
+
+PRUNE_EVERY = 64
+
+def _digest(data):
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def plan_key(config, start_date, first_vm, first_nm, first_support="", absences=None, days=12,
+             solver="rotation", time_limit=None, checkpoint=None):
+    """Schlüssel einer Planung aus den normalisierten Eingaben"""
+    config = normalize_config(config)
+    absent = {}
+    for day, names in (absences or {}).items():
+        names = {name.strip() for name in names if name and name.strip()}
+        if names:
+            absent.setdefault(parse_day(day).isoformat(), set()).update(names)
+    return _digest({
+        "pools": {key: config[key] for key in POOL_KEYS},
+        "rules": config.get("rules") or {},
+        "start": parse_day(start_date).isoformat(),
+        # Mit Checkpoint wird die Startbesetzung nicht verwendet
+        "seeds": [(value or "").strip() for value in (first_vm, first_nm, first_support)] if checkpoint is None else [],
+        "checkpoint": checkpoint,
+        "absences": {day: sorted(names) for day, names in absent.items()},
+        "days": int(days),
+        "solver": solver,
+        "time_limit": float(time_limit) if solver == "optimierung" and time_limit is not None else None,
+    })
+
+
+def rows_key(rows, fmt, config=None):
+    """Schlüssel eines Exports: Inhalt der Planungszeilen plus Format (und ggf. Konfiguration der Auswertung)"""
+    data = {"format": fmt, "rows": [[row["Datum"]] + [row[c] for c in SHIFT_COLUMNS] for row in rows]}
+    if config is not None:
+        config = normalize_config(config)
+        data["config"] = {"pools": {key: config[key] for key in POOL_KEYS}, "rules": config.get("rules") or {}}
+    return _digest(data)
+
+
+class PlanCache:
+    """LRU-Zwischenspeicher ``{schlüssel: eintrag}`` im Speicher, optional mit Ablage in ``directory``.
+
+    Einträge von Planungen sind JSON-fähige Dicts (z.B. ``{"rows": ..., "checkpoint": ...}``),
+    Exporte sind Bytes. Zugriffe aus mehreren Threads sind erlaubt.
+    """
+
+    def __init__(self, maxsize=32, directory=None, max_files=512):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._file_count = None  # Dateien im Verzeichnis laut letzter Bereinigung plus eigene neue
+        self._writes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # -------------------- Speicher --------------------
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    # -------------------- Festplatte --------------------
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _read_file(self, key, ext):
+        if not self.directory:
+            return None
+        path = self._path(key, ext)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # zuletzt benutzt (für die LRU-Bereinigung)
+        except OSError:
+            return None
+        return data
+
+    def _write_file(self, key, ext, data):
+        if not self.directory:
+            return
+        path = self._path(key, ext)
+        added = not os.path.exists(path)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._writes += 1
+            if self._file_count is not None:
+                self._file_count += added
+            due = (self._file_count is None or self._file_count > self.max_files
+                   or self._writes % PRUNE_EVERY == 0)
+        if due:
+            self._prune()
+
+    def _prune(self):
+        """Löscht die am längsten nicht benutzten Dateien über ``max_files`` hinaus"""
+        stamped = []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        if entry.is_file():
+                            stamped.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        continue  # inzwischen von einem anderen Prozess gelöscht
+        except OSError:
+            return
+        excess = len(stamped) - self.max_files
+        if excess > 0:
+            stamped.sort()
+            for _, path in stamped[:excess]:
+                try:
+                    Path(path).unlink(missing_ok=True)
+                except OSError:
+                    pass
+        with self._lock:
+            self._file_count = min(len(stamped), self.max_files)
+
+    # -------------------- Planungen --------------------
+
+    def get(self, key):
+        """Eintrag zum Schlüssel oder ``None``"""
+        value = self._recall(key)
+        if value is None:
+            data = self._read_file(key, "json")
+            if data is not None:
+                try:
+                    value = json.loads(data.decode("utf-8"))
+                except ValueError:
+                    value = None  # beschädigte Datei: wie nicht vorhanden
+                if value is not None:
+                    self._remember(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Legt einen JSON-fähigen Eintrag ab"""
+        self._remember(key, value)
+        self._write_file(key, "json", json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def plan(self, key, compute):
+        """Eintrag zum Schlüssel; fehlt er, wird ``compute()`` aufgerufen und abgelegt"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    # -------------------- Exporte --------------------
+
+    def get_export(self, rows, fmt, config=None):
+        """Bereits erzeugte Bytes des Exports von ``rows`` im Format ``fmt`` oder ``None``"""
+        key = "export-" + rows_key(rows, fmt, config)
+        data = self._recall(key)
+        if data is None:
+            data = self._read_file(key, fmt)
+            if data is not None:
+                self._remember(key, data)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def put_export(self, rows, fmt, data, config=None):
+        key = "export-" + rows_key(rows, fmt, config)
+        self._remember(key, data)
+        self._write_file(key, fmt, data)
+
+    def export_bytes(self, rows, fmt, render, config=None):
+        """Bytes des Exports von ``rows`` im Format ``fmt``; ``render(rows)`` erzeugt sie bei Bedarf.
+
+        ``config`` gehört zum Schlüssel, wenn der Export davon abhängt (Excel mit Auswertungsblatt).
+        """
+        data = self.get_export(rows, fmt, config)
+        if data is None:
+            data = render(rows)
+            self.put_export(rows, fmt, data, config)
+        return data
@@ -0,0 +1,401 @@
+"""Kommandozeile: Planung und Export ohne GUI (z.B. für cron auf Servern ohne Display).
+
+Beispiele::
+
+    python -m schichtplaner plan -c shift_config.json -s 05.01.2026 --vm MH --nm IL -o plan.xlsx
+    python -m schichtplaner plan -c team_a.json -c team_b.json -s 05.01.2026 -w 13 -a abwesend.json -o ausgabe/
+    python -m schichtplaner plan -c shift_config.json -s 05.01.2026 -f json -o -
+    python -m schichtplaner batch szenarien.json -o zusammenfassung.csv
+    python -m schichtplaner plan -c shift_config.json --store shift_plans.db --continue -o plan.xlsx
+    python -m schichtplaner history --store shift_plans.db --from 01.01.2025 --to 31.12.2025 --employee MH
+    python -m schichtplaner history --store shift_plans.db --report -o auswertung.csv
+    python -m schichtplaner plan -c shift_config.json -s 05.01.2026 --trace planung.trace -o plan.xlsx
+    python -m schichtplaner plan -c shift_config.json -s 05.01.2026 --cache .plan_cache -o plan.xlsx
+    python -m schichtplaner plan -c team_a.json -c team_b.json -s 05.01.2026 -w 52 --split monat -o jahr.xlsx
+    python -m schichtplaner serve --port 8765 --config-dir .
+
+Ohne ``--vm``/``--nm`` beginnt jedes Team mit dem ersten Eintrag aus Pool A bzw.
+Pool D. Mit ``--continue`` setzt die Planung am gespeicherten Rotationsstand der
+letzten Planung in ``--store`` fort (Startdatum: nächster Planungstag).
+Abwesenheiten (``-a``) gelten für alle Teams; Kürzel, die in einem Team nicht
+vorkommen, werden dort ignoriert. Mehrere Teams werden gemeinsam geplant: wer in
+mehreren Teams eingetragen ist, bekommt nie denselben Dienst in zwei Teams
+(siehe ``teams.py``). ``--trace`` schreibt Phasenzeiten und (bei einem Team mit
+Rotation) die Kandidatensuche je Tag als JSON bzw. Trace-Datei (siehe
+``trace.py``). Mit ``--cache`` werden Planungen (ein Team) und Exportdateien
+nach ihren normalisierten Eingaben bzw. ihrem Inhalt abgelegt; gleiche Aufrufe
+planen und formatieren nicht erneut (siehe ``cache.py``). tkinter und pandas
+werden nie importiert, openpyxl nur für xlsx. Konfigurationen werden beim Laden
+geprüft (doppelte Kürzel, Pool B ohne möglichen Support, Startbesetzung eines
+Teams außerhalb der Pools) und als geprüfte Fassung neben der Datei abgelegt
+(``<datei>.cache``, siehe ``roster.py``). Mehrere Teams mit ``-o datei.xlsx``
+bzw. ``--split monat|quartal|jahr`` ergeben eine Arbeitsmappe mit einem Blatt je
+Team und Zeitraum und vorne einer Übersicht (siehe ``export.write_workbook``).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .engine import COLUMNS, DATE_FORMAT, WEEKDAY_NAMES, PlanningError, parse_day
+from .cache import PlanCache, plan_key
+from .export import SPLITS
+from .roster import check_seeds, load_roster
+from .rules import RuleSet
+from .trace import PlanTrace, timed
+
+
+FORMATS = ("xlsx", "csv", "json")
+
+
+def load_config_file(path):
+    """Liest und prüft eine Pool-Konfiguration (shift_config.json); Hinweise gehen auf stderr"""
+    roster = load_roster(path)
+    for warning in roster.warnings:
+        print(f"Hinweis ({team_name(path)}): {warning}", file=sys.stderr)
+    return roster.config
+
+
+def load_absences(paths):
+    """Liest Abwesenheitsdateien (JSON ``{"TT.MM.YYYY": ["KÜRZEL", ...]}``, CSV oder .ics) und vereinigt sie"""
+    from .absences import load_absence_file
+
+    absences = {}
+    for path in paths or ():
+        load_absence_file(path, absences)
+    return absences
+
+
+def team_name(path):
+    """Teamname aus dem Dateinamen der Konfiguration"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def plan_team(config, args, absences, checkpoint=None, trace=None, cache=None):
+    """Plant ein Team mit den Kommandozeilenvorgaben (mit ``checkpoint`` ohne Startbesetzung).
+
+    Gibt ``(zeilen, checkpoint)`` zurück; mit ``cache`` (``PlanCache``) aus dem
+    Zwischenspeicher, falls dieselben Eingaben schon geplant wurden.
+    """
+    if checkpoint is None:
+        first_vm = args.vm or (config["pool_vm_alle"][0] if config["pool_vm_alle"] else "")
+        first_nm = args.nm or (config["pool_nm_alle"][0] if config["pool_nm_alle"] else "")
+        check_seeds(config, first_vm, first_nm, args.support)
+    else:
+        first_vm = first_nm = ""
+    days = args.weeks * RuleSet(config).days_per_week
+    if cache is not None:
+        key = plan_key(config, args.start, first_vm, first_nm, args.support, absences, days=days,
+                       solver=args.solver, time_limit=args.time_limit, checkpoint=checkpoint)
+        entry = cache.get(key)
+        if entry is None:
+            rows, final = plan_team(config, args, absences, checkpoint, trace)
+            entry = {"rows": rows, "checkpoint": final}
+            cache.put(key, entry)
+        return entry["rows"], entry["checkpoint"]
+    if args.solver == "optimierung":
+        from .solver import optimize_plan
+
+        return optimize_plan(config, args.start, first_vm, first_nm, args.support, absences, days=days,
+                             time_limit=args.time_limit, checkpoint=checkpoint), None
+    from .incremental import IncrementalPlan
+
+    plan = IncrementalPlan(config, args.start, first_vm, first_nm, args.support, absences, days=days,
+                           checkpoint=checkpoint, trace=trace)
+    return plan.rows, plan.checkpoint
+
+
+def output_format(args, path):
+    """Ausgabeformat aus ``--format`` oder der Dateiendung (Standard: xlsx, auf stdout json)"""
+    if args.format:
+        return args.format
+    ext = os.path.splitext(path or "")[1].lower().lstrip(".")
+    if ext in FORMATS:
+        return ext
+    return "json" if path in (None, "-") else "xlsx"
+
+
+def write_plan(rows, target, fmt, cache=None, config=None):
+    """Schreibt eine Planung in eine Datei oder auf stdout (``target`` = '-').
+
+    Mit ``cache`` werden die Bytes eines unveränderten Plans wiederverwendet;
+    mit ``config`` enthält eine Excel-Datei zusätzlich das Blatt "Auswertung".
+    """
+    from . import export
+
+    if fmt != "xlsx":
+        config = None
+    if cache is not None:
+        data = cache.export_bytes(rows, fmt, lambda rows: export.render_bytes(rows, fmt, config), config)
+        if target == "-":
+            sys.stdout.flush()
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        else:
+            with open(target, 'wb') as f:
+                f.write(data)
+        return
+    if fmt == "xlsx":
+        export.write_xlsx(rows, sys.stdout.buffer if target == "-" else target, config=config)
+    elif target == "-":
+        getattr(export, f"write_{fmt}")(rows, sys.stdout)
+    else:
+        getattr(export, f"write_{fmt}")(rows, target)
+
+
+def run_plan(args):
+    """Unterbefehl ``plan``: ein oder mehrere Teams planen und exportieren"""
+    absences = load_absences(args.absences)
+    teams = [(team_name(path), load_config_file(path)) for path in args.config]
+    multi = len(teams) > 1
+    target = args.output or "-"
+
+    store = checkpoint = None
+    if args.store:
+        if multi:
+            raise PlanningError("--store ist nur mit einer Konfiguration möglich.")
+        from .store import PlanStore
+
+        store = PlanStore(args.store)
+    if args.resume:
+        if store is None:
+            raise PlanningError("--continue benötigt --store.")
+        found = store.latest_checkpoint(before=args.start)
+        if found is None:
+            raise PlanningError("Keine gespeicherte Planung zum Fortsetzen gefunden.")
+        if args.start is None:
+            args.start = found[0].strftime(DATE_FORMAT)
+        elif parse_day(args.start) != found[0]:
+            raise PlanningError(f"Die gespeicherte Planung endet vor dem {found[0].strftime(DATE_FORMAT)}; "
+                                "Startdatum passt nicht.")
+        checkpoint = found[1]
+    elif args.start is None:
+        raise PlanningError("Bitte Startdatum angeben (-s) oder mit --continue fortsetzen.")
+
+    # Eine Arbeitsmappe mit einem Blatt je Team bzw. Zeitraum
+    workbook = (multi or args.split) and target.lower().endswith(".xlsx")
+    if args.split and not workbook:
+        raise PlanningError("--split benötigt eine Excel-Datei als Ausgabe (-o DATEI.xlsx).")
+    if multi and target != "-" and not workbook:
+        os.makedirs(target, exist_ok=True)
+    fmt = "xlsx" if workbook else output_format(args, None if multi else target)
+    if multi and target == "-" and fmt == "xlsx":
+        raise PlanningError("Mehrere Teams als xlsx bitte in ein Verzeichnis oder eine .xlsx-Datei schreiben.")
+
+    trace = PlanTrace() if args.trace else None
+    cache = PlanCache(directory=args.cache) if args.cache else None
+
+    if not multi:
+        name, config = teams[0]
+        with timed(trace, "planung"):
+            rows, final = plan_team(config, args, absences, checkpoint, trace, cache)
+        if store is not None:
+            with timed(trace, "speichern"):
+                store.save_period(rows, config, absences, checkpoint=final, solver=args.solver)
+            store.close()
+        with timed(trace, "export"):
+            if workbook:
+                write_workbook({name: rows}, {name: config}, target, args.split)
+            else:
+                write_plan(rows, target, fmt, cache, config)
+        if trace is not None:
+            trace.write(args.trace)
+        return 0
+
+    # Mehrere Teams: gemeinsam genutzte Mitarbeiter werden nicht doppelt eingeteilt
+    from .teams import assign_seeds, double_bookings, plan_teams
+
+    if len(dict(teams)) < len(teams):
+        raise PlanningError("Mehrere Konfigurationen mit gleichem Dateinamen; Teamnamen müssen eindeutig sein.")
+    seeds = assign_seeds(dict(teams), args.vm, args.nm, args.support)
+    errors = []
+    for name, config in teams:
+        try:
+            check_seeds(config, *seeds[name])
+        except PlanningError as e:
+            errors.append(f"{name}:\n{e}")
+    if errors:
+        raise PlanningError("\n".join(errors))
+    with timed(trace, "planung"):
+        planned = plan_teams(dict(teams), args.start, absences, weeks=args.weeks, seeds=seeds, solver=args.solver,
+                             time_limit=args.time_limit)
+    overlaps = double_bookings(planned)
+    if overlaps:
+        shown = "\n".join(f"- {day} {shift}: {employee} in {', '.join(names)}"
+                          for day, shift, employee, names in overlaps[:20])
+        raise PlanningError(f"Mitarbeiter in mehreren Teams gleichzeitig eingeteilt:\n{shown}")
+    with timed(trace, "export"):
+        if workbook:
+            write_workbook(planned, dict(teams), target, args.split)
+        elif target != "-":
+            configs = dict(teams)
+            for name, rows in planned.items():
+                write_plan(rows, os.path.join(target, f"{name}.{fmt}"), fmt, cache, configs[name])
+        elif fmt == "json":
+            # Mehrere Teams auf stdout: JSON-Objekt je Team bzw. CSV mit Team-Spalte
+            json.dump(planned, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.write("\n")
+        else:
+            import csv
+
+            writer = csv.writer(sys.stdout)
+            writer.writerow(("Team",) + COLUMNS)
+            for name, rows in planned.items():
+                for row in rows:
+                    writer.writerow([name] + [row[c] for c in COLUMNS])
+    if trace is not None:
+        trace.write(args.trace)
+    return 0
+
+
+def run_history(args):
+    """Unterbefehl ``history``: Planungszeilen oder Dienste eines Mitarbeiters aus dem Plan-Store"""
+    from .store import PlanStore
+
+    if not os.path.exists(args.store):
+        raise PlanningError(f"Plan-Store nicht gefunden: {args.store}")
+    target = args.output or "-"
+    with PlanStore(args.store) as store:
+        config = store.latest_config(args.end)
+        if args.report:
+            return write_report(store.rows_between(args.start, args.end), config, target, args, args.employee)
+        if args.split:
+            if not target.lower().endswith(".xlsx"):
+                raise PlanningError("--split benötigt eine Excel-Datei als Ausgabe (-o DATEI.xlsx).")
+            write_workbook({"": store.rows_between(args.start, args.end)}, {"": config}, target, args.split)
+            return 0
+        if not args.employee:
+            rows = store.rows_between(args.start, args.end)
+        else:
+            # Nur Tage mit Diensten des Mitarbeiters; andere Dienste des Tages bleiben leer
+            by_day = {}
+            for day, shift in store.assignments(args.employee, args.start, args.end):
+                row = by_day.setdefault(day, {
+                    "Datum": day.strftime(DATE_FORMAT), "Wochentag": WEEKDAY_NAMES[day.weekday()],
+                    "Vormittag": "", "Nachmittag": "", "Support": "",
+                })
+                row[shift] = args.employee
+            rows = list(by_day.values())
+            config = None  # Auswertung nur über vollständige Zeilen
+    write_plan(rows, target, output_format(args, target), config=config)
+    return 0
+
+
+def workbook_sheets(planned, configs, split=None):
+    """Blätter ``(name, zeilen, config)`` für ``export.write_workbook``: je Team, mit ``split`` je Team und Zeitraum"""
+    from .export import split_rows
+
+    for name, rows in planned.items():
+        if not split:
+            yield name, rows, configs.get(name)
+            continue
+        for label, part in split_rows(rows, split):
+            yield (f"{name} {label}" if len(planned) > 1 else label), part, configs.get(name)
+
+
+def write_workbook(planned, configs, target, split=None):
+    """Schreibt ``{team: zeilen}`` als eine Arbeitsmappe mit Übersicht (Datei oder '-' für stdout)"""
+    from .export import write_workbook as write
+
+    write(workbook_sheets(planned, configs, split), sys.stdout.buffer if target == "-" else target)
+
+
+def write_report(rows, config, target, args, employee=None):
+    """Schreibt die Auswertung (``analytics.analyze``) als JSON, CSV oder Excel (Plan plus Blatt "Auswertung")"""
+    from .analytics import analyze, report_table
+
+    if config is None:
+        raise PlanningError("Keine gespeicherte Planung im Zeitraum.")
+    fmt = output_format(args, target)
+    if fmt == "xlsx":
+        write_plan(rows, target, fmt, config=config)
+        return 0
+    report = analyze(rows, config)
+    if employee:
+        report["mitarbeiter"] = [entry for entry in report["mitarbeiter"] if entry["Mitarbeiter"] == employee]
+    f = sys.stdout if target == "-" else open(target, 'w', encoding='utf-8' if fmt == "json" else 'utf-8-sig',
+                                                newline='')
+    try:
+        if fmt == "json":
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        else:
+            import csv
+
+            csv.writer(f).writerows(report_table(report))
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="schichtplaner", description="Notdienst Schichtplaner ohne GUI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    plan = sub.add_parser("plan", help="Planung erstellen und exportieren")
+    plan.add_argument("-c", "--config", action="append", required=True,
+                      help="Pool-Konfiguration (mehrfach angeben für mehrere Teams)")
+    plan.add_argument("-s", "--start", help="Startdatum (Montag, TT.MM.YYYY)")
+    plan.add_argument("-w", "--weeks", type=int, default=2, help="Planungszeitraum in Wochen (Standard: 2)")
+    plan.add_argument("--vm", help="1. Tag Vormittag (Standard: erster freier Eintrag Pool A)")
+    plan.add_argument("--nm", help="1. Tag Nachmittag (Standard: erster freier Eintrag Pool D)")
+    plan.add_argument("--support", default="", help="1. Tag Support")
+    plan.add_argument("-a", "--absences", action="append", help="Abwesenheitsdatei (JSON, CSV oder .ics, mehrfach möglich)")
+    plan.add_argument("--solver", choices=("rotation", "optimierung"), default="rotation", help="Planungsverfahren")
+    plan.add_argument("--time-limit", type=float, default=2.0, help="Zeitbudget für 'optimierung' in Sekunden")
+    plan.add_argument("-o", "--output", help="Datei, Verzeichnis (mehrere Teams) oder '-' für stdout")
+    plan.add_argument("-f", "--format", choices=FORMATS, help="Ausgabeformat (Standard: nach Dateiendung)")
+    plan.add_argument("--store", help="Planung in dieser SQLite-Datei ablegen (z.B. shift_plans.db)")
+    plan.add_argument("--continue", dest="resume", action="store_true",
+                      help="am gespeicherten Rotationsstand aus --store fortsetzen (ohne --vm/--nm)")
+    plan.add_argument("--cache", help="Zwischenspeicher-Verzeichnis für Planungen und Exporte (z.B. .plan_cache)")
+    plan.add_argument("--trace", help="Messwerte der Planung schreiben (.json oder .trace für chrome://tracing)")
+    plan.add_argument("--split", choices=SPLITS,
+                      help="ein Blatt je Monat/Quartal/Jahr (und Team) in einer Excel-Datei mit Übersicht")
+    plan.set_defaults(func=run_plan)
+
+    history = sub.add_parser("history", help="Gespeicherte Planungen abfragen")
+    history.add_argument("--store", default="shift_plans.db", help="SQLite-Datei (Standard: shift_plans.db)")
+    history.add_argument("--from", dest="start", help="erster Tag (TT.MM.YYYY)")
+    history.add_argument("--to", dest="end", help="letzter Tag (TT.MM.YYYY)")
+    history.add_argument("--employee", help="nur die Dienste dieses Mitarbeiters")
+    history.add_argument("--split", choices=SPLITS, help="ein Blatt je Monat/Quartal/Jahr in einer Excel-Datei")
+    history.add_argument("--report", action="store_true",
+                         help="Auswertung je Mitarbeiter (Dienste, Serien, Ruhezeiten, fehlender Support) statt Zeilen")
+    history.add_argument("-o", "--output", help="Datei oder '-' für stdout (Standard)")
+    history.add_argument("-f", "--format", choices=FORMATS, help="Ausgabeformat (Standard: nach Dateiendung)")
+    history.set_defaults(func=run_history)
+
+    # batch und serve laden ihre Module (Prozess-Pool, asyncio) erst beim Aufruf; Argumente und Hilfe kommen von dort
+    batch = sub.add_parser("batch", help="Viele Szenarien parallel berechnen", add_help=False)
+    batch.set_defaults(func=run_batch, delegate=True)
+    serve = sub.add_parser("serve", help="Lokalen HTTP/JSON-Dienst starten", add_help=False)
+    serve.set_defaults(func=run_serve, delegate=True)
+    return parser
+
+
+def run_batch(args):
+    from . import batch
+
+    return batch.main(args.argv, prog="schichtplaner batch")
+
+
+def run_serve(args):
+    from . import server
+
+    return server.main(args.argv, prog="schichtplaner serve")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, "delegate", False):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.argv = extra
+    try:
+        return args.func(args)
+    except (PlanningError, OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,389 @@
+"""Planungskern ohne GUI-Abhängigkeiten.
+
+Die Rotationslogik aus ``ShiftPlanner.create_planning`` als reine Funktion,
+damit Planungen auch ohne Tk (z.B. auf Servern) erstellt werden können.
+"""
+
+from datetime import datetime, timedelta
+
+from .index import PoolIndex
+
+
+POOL_KEYS = ("pool_vm_alle", "pool_vm_teilweise", "pool_vm_support", "pool_nm_alle", "pool_freitag_abwesend")
+COLUMNS = ("Datum", "Wochentag", "Vormittag", "Nachmittag", "Support")
+SHIFT_COLUMNS = ("Vormittag", "Nachmittag", "Support")
+SHIFT_VM, SHIFT_NM, SHIFT_SUPPORT = 1, 2, 4  # Bits der aktiven Dienste eines Tages (siehe rules.py)
+WEEKDAY_NAMES = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"]
+DATE_FORMAT = "%d.%m.%Y"
+
+
+class PlanningError(ValueError):
+    """Ungültige Eingaben für die Planung (Meldung ist für Anwender gedacht)"""
+
+
+def default_config():
+    """Gibt eine leere Pool-Konfiguration zurück"""
+    return {key: [] for key in POOL_KEYS}
+
+
+def normalize_config(config):
+    """Ergänzt fehlende Pools, damit ältere Konfigurationsdateien weiter funktionieren"""
+    normalized = dict(config)
+    for key in POOL_KEYS:
+        normalized[key] = list(config.get(key) or [])
+    return normalized
+
+
+def parse_date(value):
+    """Wandelt 'TT.MM.YYYY' (oder date/datetime) in ein datetime um"""
+    if isinstance(value, datetime):
+        return value
+    if hasattr(value, "year") and hasattr(value, "month"):
+        return datetime(value.year, value.month, value.day)
+    try:
+        return datetime.strptime(str(value).strip(), DATE_FORMAT)
+    except ValueError:
+        raise PlanningError("Ungültiges Datumsformat! Bitte TT.MM.YYYY verwenden.") from None
+
+
+def parse_day(value):
+    """Wandelt 'TT.MM.YYYY' (oder date/datetime) in ein date um"""
+    return parse_date(value).date()
+
+
+def normalize_absences(absences):
+    """Bringt Abwesenheiten in die Form ``{date: frozenset(mitarbeiter)}``.
+
+    Schlüssel dürfen date/datetime oder 'TT.MM.YYYY' sein; leere Tage entfallen.
+    """
+    normalized = {}
+    for day, employees in (absences or {}).items():
+        employees = frozenset(employees)
+        if employees:
+            day = parse_day(day)
+            normalized[day] = normalized.get(day, frozenset()) | employees
+    return normalized
+
+
+def plan_dates(start_date, days, rules=None):
+    """Liefert die Planungstage ab ``start_date``: Mo-Sa oder die ``weekdays`` eines ``RuleSet``"""
+    current_date = parse_date(start_date)
+    if rules is not None:
+        yield from rules.plan_dates(current_date, days)
+        return
+    one_day = timedelta(days=1)
+    for _ in range(days):
+        if current_date.weekday() == 6:  # Sonntag überspringen
+            current_date += one_day
+        yield current_date
+        current_date += one_day
+
+
+def count_plan_days(start_date, end_date, rules=None):
+    """Anzahl der Planungstage (Mo-Sa bzw. ``rules.weekdays``) von ``start_date`` bis einschließlich ``end_date``"""
+    weekdays = rules.weekday_set if rules is not None else range(6)
+    start_date = parse_date(start_date)
+    span = (parse_date(end_date) - start_date).days + 1
+    if span <= 0:
+        return 0
+    full_weeks, rest = divmod(span, 7)
+    rest_days = sum(1 for i in range(rest) if (start_date.weekday() + i) % 7 in weekdays)
+    return full_weeks * len(weekdays) + rest_days
+
+
+def _rotate_after(pool, employee):
+    """Position hinter ``employee`` im Pool (0, falls nicht enthalten)"""
+    if employee and employee in pool:
+        return (pool.index(employee) + 1) % len(pool)
+    return 0
+
+
+def check_inputs(start_date, first_vm, first_nm, first_support, days, checkpoint=None):
+    """Prüft Startdatum, Zeitraum und Startbesetzung; gibt die bereinigten Werte zurück.
+
+    Mit ``checkpoint`` (Fortsetzung einer gespeicherten Planung) ist keine Startbesetzung nötig.
+    """
+    if start_date is None or start_date == "":
+        raise PlanningError("Bitte Startdatum eingeben!")
+    start_date = parse_date(start_date)
+    if start_date.weekday() != 0:  # Montag
+        raise PlanningError("Startdatum muss ein Montag sein!")
+    if days < 1:
+        raise PlanningError("Der Planungszeitraum muss mindestens einen Tag umfassen!")
+
+    first_vm = (first_vm or "").strip()
+    first_nm = (first_nm or "").strip()
+    first_support = (first_support or "").strip()
+    if checkpoint is None and not all([first_vm, first_nm]):
+        raise PlanningError("Bitte mindestens Vormittag und Nachmittag für den ersten Tag ausfüllen!")
+    return start_date, first_vm, first_nm, first_support
+
+
+class Rotation:
+    """Vorbereitete Rotationsplanung: geprüfte Eingaben, Pool-Index und Abwesenheiten als Bitsets.
+
+    ``run`` liefert je Planungstag die Zeile und den Rotationszustand danach
+    (``pool_positions`` plus die gestrigen Dienste). Mit einem gespeicherten
+    Zustand kann die Planung an jedem Tag fortgesetzt werden.
+
+    Tagesmuster, Feiertage, Wochentagssperren und Ruhezeiten kommen aus den
+    Regeln der Konfiguration (siehe ``rules.py``) und werden hier einmal in
+    Tabellen je Planungstag übersetzt.
+
+    Statt der Startbesetzung des 1. Tages kann ``checkpoint`` (siehe
+    ``Rotation.checkpoint``) übergeben werden: dann wird auch der 1. Tag
+    rotiert, ausgehend vom Stand am Ende der vorherigen Planung.
+
+    ``trace`` (ein ``trace.PlanTrace``) zeichnet die Kandidatensuche je Tag auf.
+    """
+
+    def __init__(self, config, start_date, first_vm, first_nm, first_support="", absences=None, days=12, index=None,
+                 checkpoint=None, trace=None):
+        from .rules import RuleSet
+
+        config = normalize_config(config)
+        start_date, first_vm, first_nm, first_support = check_inputs(
+            start_date, first_vm, first_nm, first_support, days, checkpoint)
+        self.index = index if index is not None else PoolIndex(config)
+        self.rules = RuleSet(config)
+        self.first_vm = first_vm
+        self.first_nm = first_nm
+        self.first_support = first_support
+        self.dates = list(plan_dates(start_date, days, self.rules))
+        self.day_keys = [d.date() for d in self.dates]
+        self.day_index = {day: tag_nr for tag_nr, day in enumerate(self.day_keys)}
+        # Regeltabellen je Tag: aktive Dienste (Bitmaske) und durch Regeln gesperrte Mitarbeiter (Bitset)
+        self.day_shifts, self.rule_blocked = self.rules.compile(config, self.index, self.day_keys)
+        self.absent = self.index.absence_masks(absences or {}, key=parse_day)
+        # Nur für einzelne Dienste gesperrt (z.B. in einem anderen Team eingeteilt): {date: bitset}
+        self.busy_am = {}
+        self.busy_pm = {}
+        # Ruhezeiten wegen Diensten am Vortag in einem anderen Team: {date: (vm, nm, support) als Bitsets}
+        self.busy_rest = {}
+        self.seeded = checkpoint is None  # 1. Tag fest vorgegeben
+        self.trace = trace
+        if checkpoint is None:
+            self.initial_state = (
+                _rotate_after(config["pool_vm_alle"], first_vm),
+                _rotate_after(config["pool_vm_teilweise"], first_vm),
+                _rotate_after(config["pool_vm_support"], first_support),
+                _rotate_after(config["pool_nm_alle"], first_nm),
+                None, None, None,
+            )
+        else:
+            self.initial_state = positions_state(config, checkpoint, self.index)
+
+    def checkpoint(self, state):
+        """Rotationsstand ``{"pool_positions": {...}, "yesterday_nm": kürzel, ...}`` zum Speichern (JSON-fähig)"""
+        names = self.index.employees
+        result = {"pool_positions": state_positions(state)}
+        for key, cid in zip(YESTERDAY_KEYS, state[4:]):
+            result[key] = names[cid] if cid is not None else None
+        return result
+
+    def set_absent(self, day, employees):
+        """Ersetzt die Abwesenheiten eines Tages"""
+        mask = self.index.mask(employees)
+        if mask:
+            self.absent[day] = mask
+        else:
+            self.absent.pop(day, None)
+
+    def run(self, start=0, state=None):
+        """Plant ab Tag ``start``; ``state`` ist der Zustand nach Tag ``start - 1``.
+
+        Liefert ``(zeile, zustand)`` je Tag. Der Zustand ist das Tupel
+        ``(vm_alle, vm_teilweise, vm_support, nm_alle, gestern_nm, gestern_vm, gestern_support)``
+        mit Mitarbeiter-IDs für die gestrigen Dienste.
+        """
+        index = self.index
+        ids = index.ids
+        names = index.employees
+        bit = index.bit
+        pool_a = index.vm_alle
+        pool_c = index.vm_support
+        pool_d = index.nm_alle
+        teilweise_mask = index.teilweise_mask
+        absent_by_day = self.absent
+        busy_am = self.busy_am
+        busy_pm = self.busy_pm
+        busy_rest = self.busy_rest
+        day_keys = self.day_keys
+        day_shifts = self.day_shifts
+        rule_blocked = self.rule_blocked
+        rest_vm, rest_nm, rest_support = self.rules.rest  # Indizes in (gestern_vm, gestern_nm, gestern_support)
+        trace = self.trace
+
+        if state is None:
+            state = self.initial_state
+        vm_pos, teilweise_pos, support_pos, nm_pos, yesterday_nm, yesterday_vm, yesterday_support = state
+
+        for tag_nr in range(start, len(self.dates)):
+            current_date = self.dates[tag_nr]
+            day = day_keys[tag_nr]
+            shifts = day_shifts[tag_nr]
+            if trace is not None:
+                trace.begin_day(day)
+
+            # Tag ohne Dienste (z.B. Samstag, Feiertag)
+            if not shifts:
+                vm_employee = ""
+                nm_employee = ""
+                support_employee = ""
+                yesterday_vm = yesterday_nm = yesterday_support = None
+            elif tag_nr == 0 and self.seeded:
+                vm_employee = self.first_vm
+                nm_employee = self.first_nm
+                support_employee = self.first_support
+                yesterday_vm = ids.get(self.first_vm)
+                yesterday_nm = ids.get(self.first_nm)
+                yesterday_support = ids.get(self.first_support)
+            else:
+                blocked = absent_by_day.get(day, 0) | rule_blocked[tag_nr]
+                blocked_am = blocked | busy_am.get(day, 0) if busy_am else blocked
+                blocked_pm = blocked | busy_pm.get(day, 0) if busy_pm else blocked
+
+                # Ruhezeiten: gestrige Dienste, die heutige Dienste sperren
+                yesterday = (yesterday_vm, yesterday_nm, yesterday_support)
+                rest_block_vm = rest_block_nm = rest_block_support = 0
+                for i in rest_vm:
+                    rest_block_vm |= bit(yesterday[i])
+                for i in rest_nm:
+                    rest_block_nm |= bit(yesterday[i])
+                for i in rest_support:
+                    rest_block_support |= bit(yesterday[i])
+                if busy_rest and day in busy_rest:
+                    other_vm, other_nm, other_support = busy_rest[day]
+                    rest_block_vm |= other_vm
+                    rest_block_nm |= other_nm
+                    rest_block_support |= other_support
+
+                vm_id = None
+                support_id = None
+                nm_id = None
+                vm_employee = ""
+                support_employee = ""
+                nm_employee = ""
+
+                # Vormittag aus Pool A
+                if shifts & SHIFT_VM:
+                    if pool_a.size:
+                        pos = pool_a.first_free(vm_pos, blocked_am | rest_block_vm)
+                        if trace is not None:
+                            trace.scan("Vormittag", pool_a, vm_pos, pos,
+                                       _reasons(self, tag_nr, day, busy_am, rest_block_vm, 0))
+                        if pos >= 0:
+                            vm_id = pool_a.ids[pos]
+                            vm_pos = (pos + 1) % pool_a.size
+
+                            # Support nötig?
+                            if (teilweise_mask >> vm_id) & 1 and shifts & SHIFT_SUPPORT and pool_c.size:
+                                pos = pool_c.first_free(support_pos, blocked_am | bit(vm_id) | rest_block_support)
+                                if trace is not None:
+                                    trace.scan("Support", pool_c, support_pos, pos,
+                                               _reasons(self, tag_nr, day, busy_am, rest_block_support, bit(vm_id)))
+                                if pos >= 0:
+                                    support_id = pool_c.ids[pos]
+                                    support_pos = (pos + 1) % pool_c.size
+                    vm_employee = names[vm_id] if vm_id is not None else None
+                    support_employee = names[support_id] if support_id is not None else ""
+
+                # Nachmittag aus Pool D
+                if shifts & SHIFT_NM:
+                    if pool_d.size:
+                        pos = pool_d.first_free(nm_pos, blocked_pm | bit(vm_id) | bit(support_id) | rest_block_nm)
+                        if trace is not None:
+                            trace.scan("Nachmittag", pool_d, nm_pos, pos,
+                                       _reasons(self, tag_nr, day, busy_pm, rest_block_nm,
+                                                bit(vm_id) | bit(support_id)))
+                        if pos >= 0:
+                            nm_id = pool_d.ids[pos]
+                            nm_pos = (pos + 1) % pool_d.size
+                    nm_employee = names[nm_id] if nm_id is not None else None
+
+                yesterday_vm, yesterday_nm, yesterday_support = vm_id, nm_id, support_id
+
+            row = {
+                "Datum": current_date.strftime(DATE_FORMAT),
+                "Wochentag": WEEKDAY_NAMES[current_date.weekday()],
+                "Vormittag": vm_employee,
+                "Nachmittag": nm_employee,
+                "Support": support_employee,
+            }
+            yield row, (vm_pos, teilweise_pos, support_pos, nm_pos, yesterday_nm, yesterday_vm, yesterday_support)
+
+
+def _reasons(rotation, tag_nr, day, busy, rest_block, used_today):
+    """Sperr-Bitsets eines Dienstes nach Grund (Reihenfolge wie ``trace.REASONS``), nur für ``trace``"""
+    return (
+        ("abwesend", rotation.absent.get(day, 0)),
+        ("wochentag_regel", rotation.rule_blocked[tag_nr]),
+        ("ruhezeit", rest_block),
+        ("heute_eingeteilt", used_today),
+        ("anderes_team", busy.get(day, 0)),
+    )
+
+
+POSITION_KEYS = ("vm_alle", "vm_teilweise", "vm_support", "nm_alle")
+YESTERDAY_KEYS = ("yesterday_nm", "yesterday_vm", "yesterday_support")
+
+
+def state_positions(state):
+    """Wandelt einen Rotationszustand in das ``pool_positions``-Dict um"""
+    return dict(zip(POSITION_KEYS, state[:4]))
+
+
+def positions_state(config, checkpoint, index):
+    """Rotationszustand aus einem gespeicherten ``checkpoint`` (Umkehrung von ``Rotation.checkpoint``).
+
+    Positionen werden auf die aktuelle Poolgröße begrenzt, falls die Pools
+    seit dem Speichern verkleinert wurden.
+    """
+    positions = checkpoint.get("pool_positions") or {}
+    state = []
+    for key in POSITION_KEYS:
+        size = len(config["pool_" + key])
+        state.append(int(positions.get(key, 0)) % size if size else 0)
+    for key in YESTERDAY_KEYS:
+        state.append(index.ids.get(checkpoint.get(key)))
+    return tuple(state)
+
+
+def checkpoint_from_rows(config, rows):
+    """Rotationsstand nach einer fertigen Planung (z.B. aus der lokalen Suche) ohne gespeicherte Zustände.
+
+    Jeder Pool steht hinter dem zuletzt eingeteilten Mitarbeiter, wie bei der Rotation.
+    """
+    config = normalize_config(config)
+    last = {"Vormittag": None, "Nachmittag": None, "Support": None}
+    for row in rows:
+        for column in SHIFT_COLUMNS:
+            if row[column]:
+                last[column] = row[column]
+    vm = last["Vormittag"]
+    positions = dict(zip(POSITION_KEYS, (
+        _rotate_after(config["pool_vm_alle"], vm),
+        _rotate_after(config["pool_vm_teilweise"], vm),
+        _rotate_after(config["pool_vm_support"], last["Support"]),
+        _rotate_after(config["pool_nm_alle"], last["Nachmittag"]),
+    )))
+    final = rows[-1] if rows else {}
+    result = {"pool_positions": positions}
+    for key, column in zip(YESTERDAY_KEYS, ("Nachmittag", "Vormittag", "Support")):
+        result[key] = final.get(column) or None
+    return result
+
+
+def create_plan(config, start_date, first_vm, first_nm, first_support="", absences=None, days=12, index=None,
+                checkpoint=None, trace=None):
+    """Erstellt die Schichtplanung für ``days`` Planungstage Mo-Sa (Standard: 2 Wochen = 12 Tage).
+
+    ``absences`` ist ``{datum: [mitarbeiter]}`` mit echten Kalenderdaten als Schlüssel.
+    ``index`` kann ein bereits aufgebauter ``PoolIndex`` derselben Konfiguration sein.
+    ``checkpoint`` setzt eine gespeicherte Planung fort (statt der Startbesetzung).
+    ``trace`` (``trace.PlanTrace``) zeichnet Kandidatensuche und Ablehnungsgründe auf.
+    Gibt die Planungszeilen als Liste von Dicts mit den Schlüsseln aus ``COLUMNS`` zurück.
+    """
+    rotation = Rotation(config, start_date, first_vm, first_nm, first_support, absences, days=days, index=index,
+                        checkpoint=checkpoint, trace=trace)
+    return [row for row, _ in rotation.run()]
@@ -0,0 +1,384 @@
+"""Streamender Export der Planung nach Excel (.xlsx) und CSV.
+
+Zeilen werden einzeln geschrieben, ohne DataFrame und ohne nachträgliches
+Formatieren oder ``insert_rows``: die graue Trennzeile nach jeder Woche (nach
+dem letzten Planungstag der Woche laut Regeln, ohne ``config`` Samstag) wird
+direkt an ihrer Stelle ausgegeben. Excel nutzt den write-only-Modus von
+openpyxl mit benannten Zellformaten (``NamedStyle``), die einmal je
+Arbeitsmappe registriert werden. Speicherbedarf bleibt damit
+konstant und die Laufzeit linear in der Zeilenzahl; ``rows`` darf auch ein
+Generator sein (z.B. ``Rotation.run``).
+
+Mit ``config`` enthält die Excel-Datei zusätzlich das Blatt "Auswertung"
+(Dienste je Mitarbeiter, Serien, Ruhezeiten, fehlender Support; siehe
+``analytics.py``).
+
+``write_workbook`` schreibt viele Planungen (Zeiträume, Teams) in einem
+Durchgang in eine Datei: je Planung ein Blatt, vorne eine Übersicht. Alle
+Blätter nutzen dieselben Style-Vorlagen, Spaltenbreiten werden je Spalte
+gesetzt; ``split_rows`` teilt einen langen Plan nach Monat, Quartal oder Jahr.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from .engine import COLUMNS, DATE_FORMAT, WEEKDAY_NAMES
+from .rules import RuleSet
+
+
+SHEET_NAME = "Notdienst_Planung"
+REPORT_SHEET_NAME = "Auswertung"
+COLUMN_WIDTHS = [12, 14, 14, 14, 14]  # A..E
+REPORT_WIDTHS = [14, 12, 12, 12, 10, 10, 18, 14]
+SUMMARY_SHEET_NAME = "Übersicht"
+SUMMARY_COLUMNS = (
+    "Blatt", "Von", "Bis", "Tage", "Arbeitstage", "VM offen", "NM offen", "Support offen", "Ruhezeit-Verstöße",
+)
+SUMMARY_WIDTHS = [24, 12, 12, 8, 12, 10, 10, 14, 18]
+TOTAL_COLUMNS = ("Mitarbeiter", "Vormittag", "Nachmittag", "Support", "Gesamt")
+SPLITS = ("monat", "quartal", "jahr")
+MONTH_NAMES = ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli", "August", "September", "Oktober",
+               "November", "Dezember"]
+
+
+def _open_text(target, encoding='utf-8-sig'):
+    """Öffnet einen Pfad zum Schreiben (Dateiobjekte werden unverändert genutzt)"""
+    if hasattr(target, "write"):
+        return target, False
+    return open(target, 'w', encoding=encoding, newline=''), True
+
+
+def write_csv(rows, target):
+    """Schreibt die Planung als CSV (ohne Formatierung und ohne Trennzeilen)"""
+    f, close = _open_text(target)
+    try:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow([row[c] for c in COLUMNS])  # None wird zu ""
+    finally:
+        if close:
+            f.close()
+
+
+def write_json(rows, target):
+    """Schreibt die Planungszeilen als JSON-Liste (eine Zeile je Objekt, gestreamt)"""
+    f, close = _open_text(target, encoding='utf-8')
+    try:
+        f.write("[")
+        for nr, row in enumerate(rows):
+            f.write(",\n  " if nr else "\n  ")
+            f.write(json.dumps({c: row[c] for c in COLUMNS}, ensure_ascii=False))
+        f.write("\n]\n")
+    finally:
+        if close:
+            f.close()
+
+
+class XlsxStyles:
+    """Gemeinsame Zellformate für alle Blätter (Style-Objekte nur einmal erzeugt).
+
+    Jedes Format wird als ``NamedStyle`` einmal je Arbeitsmappe registriert;
+    Zellen verweisen nur über den Namen darauf. So wird nicht für jede Zelle
+    erneut Font/Border/Fill im Workbook nachgeschlagen (das Hashen der
+    Style-Objekte ist in openpyxl der teuerste Teil des Schreibens).
+    """
+
+    HEADER = "Plan Kopf"
+    DATE = "Plan Datum"
+    TEXT = "Plan Text"
+    SHIFT = "Plan Dienst"
+    SUPPORT = "Plan Support"
+    SEPARATOR = "Plan Trennzeile"
+    NUMBER = "Plan Zahl"
+
+    def __init__(self):
+        from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+        # Farbpalette (an Screenshot angelehnt)
+        self.green = PatternFill(start_color="A9D18E", end_color="A9D18E", fill_type="solid")   # Vormittag & Nachmittag
+        self.yellow = PatternFill(start_color="FFD966", end_color="FFD966", fill_type="solid")  # Support
+        self.grey = PatternFill(start_color="BFBFBF", end_color="BFBFBF", fill_type="solid")    # Trennzeile
+        side = Side(style="thin")
+        self.thin = Border(left=side, right=side, top=side, bottom=side)
+        self.bold = Font(bold=True)
+        self.left = Alignment(horizontal="left")
+        self.center = Alignment(horizontal="center")
+        self._workbooks = set()
+
+    def templates(self, ws):
+        """Formatnamen (Kopf, Datenspalten, Trennzeile) für Planungsblätter"""
+        self._register(ws.parent)
+        # Spalten 1 & 2 ohne Füllung (weiß), 3 & 4 grün, 5 gelb
+        return self.HEADER, (self.DATE, self.TEXT, self.SHIFT, self.SHIFT, self.SUPPORT), self.SEPARATOR
+
+    def report_templates(self, ws):
+        """Formatnamen für Auswertungstabellen (Kopf, Text, Zahl)"""
+        self._register(ws.parent)
+        return self.HEADER, self.TEXT, self.NUMBER
+
+    def _register(self, wb):
+        """Registriert die benannten Formate einmal je Arbeitsmappe"""
+        if id(wb) in self._workbooks:
+            return
+        from openpyxl.styles import NamedStyle
+
+        for name, options in (
+            (self.HEADER, dict(font=self.bold, alignment=self.center, border=self.thin)),
+            (self.DATE, dict(border=self.thin, alignment=self.left, number_format="DD.MM.YYYY")),
+            (self.TEXT, dict(border=self.thin, alignment=self.left)),
+            (self.SHIFT, dict(border=self.thin, alignment=self.center, fill=self.green)),
+            (self.SUPPORT, dict(border=self.thin, alignment=self.center, fill=self.yellow)),
+            (self.SEPARATOR, dict(border=self.thin, fill=self.grey)),
+            (self.NUMBER, dict(border=self.thin, alignment=self.center)),
+        ):
+            wb.add_named_style(NamedStyle(name, **options))
+        self._workbooks.add(id(wb))
+
+
+class XlsxSheetWriter:
+    """Schreibt Planungszeilen in ein write-only Arbeitsblatt (am Ende ``finish`` aufrufen).
+
+    Die Trennzeile folgt auf den letzten Planungstag der Woche aus ``rules``
+    (``RuleSet``, ohne Regeln die Standardregeln). Je Spalte gibt es eine
+    formatierte Zelle, die für jede Zeile neu befüllt wird: der write-only-Modus
+    schreibt eine angehängte Zeile sofort, das Format wird also nur einmal je
+    Blatt zugewiesen.
+    """
+
+    def __init__(self, ws, styles, rules=None):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        self.ws = ws
+        rules = rules if rules is not None else RuleSet()
+        self._week_end = WEEKDAY_NAMES[rules.weekdays[-1]]
+        self._cell = WriteOnlyCell
+        self._header_style, data_styles, separator_style = styles.templates(ws)
+        self._data_cells = [self._styled(None, style) for style in data_styles]
+        self._separator_cells = [self._styled(None, separator_style) for _ in COLUMNS]
+        for idx, width in enumerate(COLUMN_WIDTHS, start=1):
+            ws.column_dimensions[get_column_letter(idx)].width = width
+
+    def _styled(self, value, style):
+        cell = self._cell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def header(self, columns=COLUMNS):
+        self.ws.append([self._styled(name, self._header_style) for name in columns])
+
+    def row(self, row):
+        datum = row["Datum"]
+        try:
+            datum = datetime.strptime(datum, DATE_FORMAT)
+        except (TypeError, ValueError):
+            pass
+        cells = self._data_cells
+        for cell, value in zip(cells, (datum, row["Wochentag"], row["Vormittag"], row["Nachmittag"], row["Support"])):
+            cell.value = value
+        self.ws.append(cells)
+
+        # Trennzeile nach jeder Woche
+        if row["Wochentag"] == self._week_end:
+            self.separator()
+
+    def finish(self):
+        """Schließt das Blatt ab (die Trennzeile der letzten vollständigen Woche steht schon)"""
+
+    def separator(self):
+        self.ws.append(self._separator_cells)
+
+
+class XlsxTableWriter:
+    """Schreibt Tabellen (Kopf, erste Spalte als Text, übrige zentriert) in ein write-only Arbeitsblatt.
+
+    Wie bei ``XlsxSheetWriter`` werden die formatierten Zellen je Spalte wiederverwendet.
+    """
+
+    def __init__(self, ws, styles, widths=()):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        self.ws = ws
+        self._cell = WriteOnlyCell
+        self._header_style, text_style, self._number_style = styles.report_templates(ws)
+        self._row_cells = [self._styled(None, text_style)]
+        self._label_cells = [self._styled(None, self._header_style), self._styled(None, self._number_style)]
+        for idx, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(idx)].width = width
+
+    def _styled(self, value, style):
+        cell = self._cell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def _append(self, cells, values):
+        for cell, value in zip(cells, values):
+            cell.value = value
+        self.ws.append(cells[:len(values)])
+
+    def header(self, columns):
+        self.ws.append([self._styled(name, self._header_style) for name in columns])
+
+    def row(self, values):
+        cells = self._row_cells
+        while len(cells) < len(values):
+            cells.append(self._styled(None, self._number_style))
+        self._append(cells, values)
+
+    def label(self, label, value):
+        self._append(self._label_cells, (label, value))
+
+    def blank(self):
+        self.ws.append([])
+
+
+def write_report_sheet(ws, report, styles):
+    """Schreibt eine Auswertung (``analytics.analyze``) als Tabelle in ein write-only Arbeitsblatt"""
+    from .analytics import report_table
+
+    writer = XlsxTableWriter(ws, styles, REPORT_WIDTHS)
+    table = report_table(report)
+    writer.header(next(table))
+    for values in table:
+        writer.row(values)
+    writer.blank()
+    for label, value in (("Zeitraum", f"{report['von']} bis {report['bis']}"), ("Tage", report["tage"]),
+                         ("Arbeitstage", report["arbeitstage"]),
+                         *((f"{shift} offen", n) for shift, n in report["offen"].items()),
+                         ("Ruhezeit-Verstöße", report["ruhezeit_verstoesse"])):
+        writer.label(label, value)
+
+
+def write_xlsx(rows, target, sheet_name=SHEET_NAME, config=None):
+    """Schreibt die Planung formatiert nach Excel (benötigt openpyxl).
+
+    Mit ``config`` folgt das Blatt "Auswertung" (``rows`` wird dafür einmal als Liste gehalten).
+    """
+    from openpyxl import Workbook
+
+    if config is not None:
+        rows = list(rows)
+    wb = Workbook(write_only=True)
+    styles = XlsxStyles()
+    writer = XlsxSheetWriter(wb.create_sheet(sheet_name), styles, RuleSet(config) if config is not None else None)
+    writer.header()
+    for row in rows:
+        writer.row(row)
+    writer.finish()
+    if config is not None:
+        from .analytics import analyze
+
+        write_report_sheet(wb.create_sheet(REPORT_SHEET_NAME), analyze(rows, config), styles)
+    wb.save(target)
+
+
+def sheet_title(name, used):
+    """Gültiger, eindeutiger Blattname (höchstens 31 Zeichen, ohne ``[]:*?/\\``); ``used`` wird ergänzt"""
+    title = "".join("_" if ch in "[]:*?/\\" else ch for ch in str(name)).strip("'")[:31] or "Blatt"
+    base, nr = title, 2
+    while title.casefold() in used:
+        suffix = f" ({nr})"
+        title = base[:31 - len(suffix)] + suffix
+        nr += 1
+    used.add(title.casefold())
+    return title
+
+
+def split_rows(rows, by="monat"):
+    """Teilt Planungszeilen nach ``by`` (monat, quartal, jahr): Liste ``(bezeichnung, zeilen)``"""
+    if by not in SPLITS:
+        raise ValueError(f"Unbekannte Aufteilung: {by}")
+    groups = {}
+    for row in rows:
+        day = datetime.strptime(row["Datum"], DATE_FORMAT)
+        if by == "monat":
+            label = f"{MONTH_NAMES[day.month - 1]} {day.year}"
+        elif by == "quartal":
+            label = f"Q{(day.month - 1) // 3 + 1} {day.year}"
+        else:
+            label = str(day.year)
+        groups.setdefault(label, []).append(row)
+    return list(groups.items())
+
+
+def _summary_line(title, rows, config, totals):
+    """Zeile der Übersicht für ein Blatt; ergänzt ``totals`` ({mitarbeiter: [vm, nm, support]})"""
+    span = (rows[0]["Datum"], rows[-1]["Datum"]) if rows else ("", "")
+    if config is None:
+        worked = sum(1 for row in rows if any(row[c] != "" for c in COLUMNS[2:]))
+        vm_open = sum(1 for row in rows if row["Vormittag"] is None)
+        nm_open = sum(1 for row in rows if row["Nachmittag"] is None)
+        return (title, *span, len(rows), worked, vm_open, nm_open, "", "")
+
+    from .analytics import analyze
+
+    report = analyze(rows, config)
+    for entry in report["mitarbeiter"]:
+        counts = totals.setdefault(entry["Mitarbeiter"], [0, 0, 0])
+        for i, column in enumerate(COLUMNS[2:]):
+            counts[i] += entry[column]
+    open_shifts = report["offen"]
+    return (title, *span, report["tage"], report["arbeitstage"], open_shifts["Vormittag"],
+            open_shifts["Nachmittag"], open_shifts["Support"], report["ruhezeit_verstoesse"])
+
+
+def write_workbook(sheets, target, summary=True):
+    """Schreibt mehrere Planungen in eine Excel-Datei (benötigt openpyxl), je Planung ein Blatt.
+
+    ``sheets`` ist eine Folge ``(name, zeilen, config)``; ``config`` darf ``None``
+    sein (dann ohne Support-Lücken und Ruhezeiten in der Übersicht). Mit
+    ``summary`` steht vorne das Blatt "Übersicht": eine Zeile je Blatt und die
+    Dienste je Mitarbeiter über alle Blätter. Jede Planung wird genau einmal
+    durchlaufen; Blattnamen werden gekürzt und eindeutig gemacht.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    styles = XlsxStyles()
+    used = set()
+    overview = wb.create_sheet(sheet_title(SUMMARY_SHEET_NAME, used)) if summary else None
+    lines = []
+    totals = {}
+    for name, rows, config in sheets:
+        title = sheet_title(name, used)
+        writer = XlsxSheetWriter(wb.create_sheet(title), styles, RuleSet(config) if config is not None else None)
+        writer.header()
+        kept = []
+        for row in rows:
+            writer.row(row)
+            kept.append(row)
+        writer.finish()
+        if overview is not None:
+            lines.append(_summary_line(title, kept, config, totals))
+
+    if overview is not None:
+        table = XlsxTableWriter(overview, styles, SUMMARY_WIDTHS)
+        table.header(SUMMARY_COLUMNS)
+        for line in lines:
+            table.row(line)
+        if totals:
+            table.blank()
+            table.header(TOTAL_COLUMNS)
+            for employee, counts in totals.items():
+                table.row((employee, *counts, sum(counts)))
+    wb.save(target)
+
+
+def render_bytes(rows, fmt, config=None):
+    """Erzeugt den Export im Format ``fmt`` (xlsx, csv, json) als Bytes, wie ihn die Datei enthielte.
+
+    ``config`` ergänzt bei xlsx das Blatt "Auswertung".
+    """
+    buffer = io.BytesIO()
+    if fmt == "xlsx":
+        write_xlsx(rows, buffer, config=config)
+        return buffer.getvalue()
+    text = io.TextIOWrapper(buffer, encoding='utf-8-sig' if fmt == "csv" else 'utf-8', newline='')
+    (write_csv if fmt == "csv" else write_json)(rows, text)
+    text.flush()
+    text.detach()
+    return buffer.getvalue()
@@ -0,0 +1,114 @@
+"""Inkrementelle Neuplanung bei geänderten Abwesenheiten.
+
+Die Rotation merkt sich nach jedem Tag ihren Zustand (``pool_positions`` und
+gestrigen Nachmittagsdienst). Ändert sich eine Abwesenheit, wird erst ab dem
+betroffenen Tag neu geplant, ausgehend vom gespeicherten Zustand des Vortags.
+Sobald der neue Zustand nach einem Tag wieder dem alten entspricht, sind alle
+folgenden Tage unverändert und die Neuplanung endet.
+"""
+
+from .engine import SHIFT_COLUMNS, Rotation, parse_day
+from .tasks import track
+
+
+class IncrementalPlan:
+    """Planung mit gespeicherten Rotationszuständen für schnelle Änderungen"""
+
+    def __init__(self, config, start_date, first_vm, first_nm, first_support="", absences=None, days=12, index=None,
+                 progress=None, should_stop=None, checkpoint=None, trace=None):
+        """Plant den ganzen Zeitraum; ``progress``/``should_stop`` wie bei ``tasks.BackgroundTask``.
+
+        ``trace`` (``trace.PlanTrace``) zeichnet nur die erste, vollständige Planung auf.
+        """
+        self.rotation = Rotation(config, start_date, first_vm, first_nm, first_support, absences, days=days, index=index,
+                                 checkpoint=checkpoint, trace=trace)
+        self.absences = {}  # {datum (date): set(mitarbeiter)}
+        for day, employees in (absences or {}).items():
+            self.absences.setdefault(parse_day(day), set()).update(employees)
+        self.rows = []
+        self.states = []
+        steps = self.rotation.run()
+        if progress is not None or should_stop is not None:
+            steps = track(steps, days, progress or (lambda fraction: None), should_stop or (lambda: False))
+        for row, state in steps:
+            self.rows.append(row)
+            self.states.append(state)
+        self.rotation.trace = None
+
+    @property
+    def checkpoint(self):
+        """Rotationsstand nach dem letzten Planungstag (zum Fortsetzen der nächsten Planung)"""
+        return self.rotation.checkpoint(self.states[-1])
+
+    def add_absence(self, day, employees):
+        """Trägt Abwesenheiten ein und plant nach; gibt die Änderungen zurück"""
+        day = parse_day(day)
+        return self.set_absence(day, self.absences.get(day, set()) | set(employees))
+
+    def remove_absence(self, day, employees):
+        """Entfernt Abwesenheiten und plant nach; gibt die Änderungen zurück"""
+        day = parse_day(day)
+        return self.set_absence(day, self.absences.get(day, set()) - set(employees))
+
+    def set_absence(self, day, employees):
+        """Setzt die Abwesenden eines Tages und plant ab diesem Tag neu.
+
+        Gibt die geänderten Dienste als Liste ``(tag_nr, spalte, alt, neu)`` zurück.
+        """
+        day = parse_day(day)
+        employees = set(employees)
+        if employees == self.absences.get(day, set()):
+            return []
+        if employees:
+            self.absences[day] = employees
+        else:
+            self.absences.pop(day, None)
+        self.rotation.set_absent(day, employees)
+        tag_nr = self.rotation.day_index.get(day)
+        if tag_nr is None:
+            return []  # Tag liegt nicht im Planungszeitraum (oder ist kein Planungstag)
+        return self.replan_from(tag_nr)
+
+    def set_absences(self, absences):
+        """Setzt die Abwesenden mehrerer Tage ``{datum: mitarbeiter}`` und plant nur einmal neu.
+
+        Neu geplant wird ab dem ersten geänderten Tag bis mindestens zum letzten;
+        Rückgabe wie bei ``set_absence``.
+        """
+        changed = []
+        for day, employees in absences.items():
+            day = parse_day(day)
+            employees = set(employees)
+            if employees == self.absences.get(day, set()):
+                continue
+            if employees:
+                self.absences[day] = employees
+            else:
+                self.absences.pop(day, None)
+            self.rotation.set_absent(day, employees)
+            tag_nr = self.rotation.day_index.get(day)
+            if tag_nr is not None:
+                changed.append(tag_nr)
+        if not changed:
+            return []
+        return self.replan_from(min(changed), until=max(changed))
+
+    def replan_from(self, tag_nr, until=None):
+        """Plant ab ``tag_nr`` neu, bis der Rotationszustand wieder mit dem alten übereinstimmt.
+
+        Vor Tag ``until`` wird dabei nicht abgebrochen (für mehrere geänderte Tage).
+        """
+        changes = []
+        state = self.states[tag_nr - 1] if tag_nr > 0 else None
+        until = tag_nr if until is None else until
+        for k, (row, new_state) in enumerate(self.rotation.run(tag_nr, state), start=tag_nr):
+            old_row = self.rows[k]
+            for column in SHIFT_COLUMNS:
+                if row[column] != old_row[column]:
+                    changes.append((k, column, old_row[column], row[column]))
+            self.rows[k] = row
+            converged = new_state == self.states[k]
+            self.states[k] = new_state
+            if converged and k >= until:
+                break
+        return changes
@@ -0,0 +1,102 @@
+"""Indizierte Pools: Mitarbeiter als Integer-IDs, Verfügbarkeit als Bitsets.
+
+Mitarbeiter werden beim Aufbau des Index auf fortlaufende IDs abgebildet.
+Mengen von Mitarbeitern (Abwesende eines Tages, Pool B, Freitags-Pool) sind
+Python-Integer, in denen Bit ``id`` gesetzt ist. Eine Kandidatenprüfung ist
+damit ein einzelnes ``&`` statt einer linearen Suche über ``in``-Vergleiche.
+"""
+
+
+def iter_bits(mask):
+    """Liefert die Indizes der gesetzten Bits (aufsteigend)"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class IndexedPool:
+    """Ein geordneter Pool als Liste von Mitarbeiter-IDs"""
+
+    def __init__(self, name, ids):
+        self.name = name
+        self.ids = list(ids)
+        self.size = len(self.ids)
+        self.bits = [1 << cid for cid in self.ids]   # Bit je Position
+        self.members = 0                              # Bitset aller Mitglieder
+        for bit in self.bits:
+            self.members |= bit
+
+    def first_free(self, start, blocked):
+        """Erste Position ab ``start`` (zyklisch), deren Mitarbeiter nicht in ``blocked`` ist, sonst -1"""
+        if not blocked & self.members:
+            return start if self.size else -1
+        bits = self.bits
+        size = self.size
+        for i in range(size):
+            pos = start + i
+            if pos >= size:
+                pos -= size
+            if not blocked & bits[pos]:
+                return pos
+        return -1
+
+
+class PoolIndex:
+    """Vorberechneter Index einer Pool-Konfiguration"""
+
+    def __init__(self, config):
+        self.employees = []   # id -> Kürzel
+        self.ids = {}         # Kürzel -> id
+        for key in ("pool_vm_alle", "pool_vm_teilweise", "pool_vm_support", "pool_nm_alle", "pool_freitag_abwesend"):
+            for name in config.get(key, ()):
+                self.intern(name)
+
+        self.vm_alle = IndexedPool("vm_alle", (self.ids[n] for n in config.get("pool_vm_alle", ())))
+        self.vm_teilweise = IndexedPool("vm_teilweise", (self.ids[n] for n in config.get("pool_vm_teilweise", ())))
+        self.vm_support = IndexedPool("vm_support", (self.ids[n] for n in config.get("pool_vm_support", ())))
+        self.nm_alle = IndexedPool("nm_alle", (self.ids[n] for n in config.get("pool_nm_alle", ())))
+
+        # Mitgliedschaften als Mitarbeiter-Bitsets
+        self.teilweise_mask = self.mask(config.get("pool_vm_teilweise", ()))
+        self.freitag_mask = self.mask(config.get("pool_freitag_abwesend", ()))
+
+    def intern(self, name):
+        """Gibt die ID eines Kürzels zurück (legt sie bei Bedarf an)"""
+        cid = self.ids.get(name)
+        if cid is None:
+            cid = self.ids[name] = len(self.employees)
+            self.employees.append(name)
+        return cid
+
+    def mask(self, names):
+        """Mitarbeiter-Bitset aus Kürzeln; unbekannte Kürzel werden ignoriert"""
+        ids = self.ids
+        result = 0
+        for name in names:
+            cid = ids.get(name)
+            if cid is not None:
+                result |= 1 << cid
+        return result
+
+    def bit(self, cid):
+        """Bitset eines einzelnen Mitarbeiters (0 für None)"""
+        return 1 << cid if cid is not None else 0
+
+    def names(self, mask):
+        """Kürzel der gesetzten Bits eines Mitarbeiter-Bitsets"""
+        return [self.employees[cid] for cid in iter_bits(mask)]
+
+    def absence_masks(self, absences, key=None):
+        """Wandelt ``{datum: kürzel}`` in ``{datum: bitset}`` um (leere Tage entfallen).
+
+        ``key`` normalisiert optional die Schlüssel; gleiche Tage werden vereinigt.
+        """
+        result = {}
+        for day, names in absences.items():
+            mask = self.mask(names)
+            if mask:
+                if key is not None:
+                    day = key(day)
+                result[day] = result.get(day, 0) | mask
+        return result
@@ -0,0 +1,38 @@
+"""Kennzahlen einer Planung: Abdeckungslücken, Dienste pro Person, Fairness.
+
+Zusammenfassung der Auswertung aus ``analytics.analyze`` (eine Zählung für
+beide); hier kommen nur Streuungsmaße der Dienste pro Person hinzu.
+"""
+
+from math import sqrt
+
+from .analytics import analyze, eligible_employees  # noqa: F401 (eligible_employees: bisheriger Importort)
+
+
+def plan_stats(rows, config):
+    """Wertet Planungszeilen aus.
+
+    Nur offene Dienste (``None``) zählen als Lücke, nicht besetzte Dienste an
+    Tagen ohne diese Schicht (``""``, z.B. Samstag) nicht. Eine Support-Lücke ist
+    ein Vormittag aus Pool B ohne Support an einem Tag mit Support-Dienst.
+    """
+    report = analyze(rows, config)
+    vm_open, nm_open, support_open = (report["offen"][column] for column in ("Vormittag", "Nachmittag", "Support"))
+    load = {employee["Mitarbeiter"]: employee["Gesamt"] for employee in report["mitarbeiter"]}
+
+    values = list(load.values())
+    mean = sum(values) / len(values) if values else 0.0
+    std = sqrt(sum((v - mean) ** 2 for v in values) / len(values)) if values else 0.0
+    return {
+        "tage": report["tage"],
+        "arbeitstage": report["arbeitstage"],
+        "vm_offen": vm_open,
+        "nm_offen": nm_open,
+        "support_offen": support_open,
+        "luecken": vm_open + nm_open + support_open,
+        "dienste": load,
+        "dienste_min": min(values) if values else 0,
+        "dienste_max": max(values) if values else 0,
+        "dienste_spannweite": (max(values) - min(values)) if values else 0,
+        "dienste_stdabw": round(std, 3),
+    }
@@ -0,0 +1,223 @@
+"""Geprüftes Laden von Pool-Konfigurationen (auch für große Dienstpläne und viele Teamdateien).
+
+``load_roster(path)`` liest eine Konfiguration, prüft sie und gibt ein
+``Roster`` zurück. Die geprüfte Fassung wird zusätzlich als Pickle-Datei neben
+der JSON-Datei abgelegt (``<datei>.cache``); solange Programmversion,
+Änderungszeit, Größe und SHA-256 der JSON-Datei gleich bleiben, entfällt die
+Prüfung. Die Cache-Datei enthält nur einfache Daten (Dicts, Listen, Strings,
+Zahlen) und wird mit einem Unpickler gelesen, der keine Klassen oder Funktionen
+lädt; eine manipulierte Datei kann also keinen Code ausführen. Sie ist ein
+reines Hilfsmittel: fehlt sie, ist sie veraltet, beschädigt oder nicht
+schreibbar, wird die JSON-Datei geprüft.
+
+Fehler (die Planung wäre falsch oder unmöglich) lösen sofort einen
+``PlanningError`` mit allen gefundenen Problemen aus:
+
+* Pools, die keine Liste von Kürzeln sind, leere Kürzel
+* doppelte Kürzel innerhalb eines Pools
+* Pool B (braucht Support) ohne möglichen Support aus Pool C
+* ungültige Regeln (siehe ``rules.py``)
+
+Hinweise (``Roster.warnings``) verhindern die Planung nicht, z.B. Kürzel in
+Pool B, die nicht in Pool A stehen, oder Pool-B-Mitarbeiter, deren Support an
+manchen Wochentagen gesperrt ist. ``check_seeds`` prüft die Startbesetzung
+des 1. Tages gegen die Pools.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+
+from . import __version__
+from .engine import POOL_KEYS, SHIFT_SUPPORT, WEEKDAY_NAMES, PlanningError
+from .rules import RuleSet
+
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+POOL_TITLES = {
+    "pool_vm_alle": "Pool A (Vormittag)",
+    "pool_vm_teilweise": "Pool B (Vormittag mit Support)",
+    "pool_vm_support": "Pool C (Support)",
+    "pool_nm_alle": "Pool D (Nachmittag)",
+    "pool_freitag_abwesend": "Pool E (freitags abwesend)",
+}
+
+
+def parse_names(text):
+    """Kürzel aus einer komma-getrennten Eingabe (Leerzeichen und leere Einträge entfallen)"""
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+class Roster:
+    """Geprüfte Konfiguration: ``config`` (normalisiertes Dict wie bisher), ``warnings``, ``employees``"""
+
+    def __init__(self, config):
+        if not isinstance(config, dict):
+            raise PlanningError("Die Konfiguration muss ein JSON-Objekt sein.")
+        errors = []
+        self.warnings = []
+        self.config = dict(config)
+        for key in POOL_KEYS:
+            self.config[key] = self._pool(key, config.get(key), errors)
+        try:
+            self.rules = RuleSet(self.config)
+        except PlanningError as e:
+            errors.append(str(e))
+            self.rules = None
+        if self.rules is not None:
+            self._check_support(errors)
+        if errors:
+            raise PlanningError("Ungültige Konfiguration:\n" + "\n".join(f"- {error}" for error in errors))
+
+        self.employees = self._employees()
+        folded = {}
+        for name in self.employees:
+            other = folded.setdefault(name.casefold(), name)
+            if other != name:
+                self.warnings.append(f"Kürzel unterscheiden sich nur in Groß-/Kleinschreibung: {other}, {name}")
+
+    @classmethod
+    def _from_cache(cls, config, warnings):
+        """Bereits geprüfte Fassung aus der Cache-Datei: nur Regeln und Mitarbeiterliste neu aufbauen"""
+        roster = cls.__new__(cls)
+        roster.config = config
+        roster.warnings = list(warnings)
+        roster.rules = RuleSet(config)
+        roster.employees = roster._employees()
+        return roster
+
+    def _employees(self):
+        employees = []
+        seen = set()
+        for key in POOL_KEYS:
+            for name in self.config[key]:
+                if name not in seen:
+                    seen.add(name)
+                    employees.append(name)
+        return employees
+
+    def _pool(self, key, value, errors):
+        title = POOL_TITLES[key]
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            errors.append(f"{title} muss eine Liste von Kürzeln sein.")
+            return []
+        names = []
+        seen = set()
+        duplicates = []
+        for name in value:
+            if not isinstance(name, str) or not name.strip():
+                errors.append(f"{title} enthält ein leeres oder ungültiges Kürzel: {name!r}")
+                continue
+            name = name.strip()
+            if name in seen:
+                duplicates.append(name)
+                continue
+            seen.add(name)
+            names.append(name)
+        if duplicates:
+            errors.append(f"{title} enthält doppelte Kürzel: {', '.join(sorted(set(duplicates)))}")
+        return names
+
+    def _check_support(self, errors):
+        config = self.config
+        pool_a = set(config["pool_vm_alle"])
+        pool_c = config["pool_vm_support"]
+        needs_support = []
+        for name in config["pool_vm_teilweise"]:
+            if name not in pool_a:
+                self.warnings.append(f"{name} steht in Pool B, aber nicht in Pool A (wird nie eingeteilt).")
+            elif not pool_c or pool_c == [name]:
+                errors.append(f"{name} (Pool B) braucht Support, aber Pool C enthält niemand anderen.")
+            else:
+                needs_support.append(name)
+        if not needs_support:
+            return
+
+        # Wochentage mit Support, an denen höchstens ein Supporter übrig bleibt (Sperren aus den Regeln)
+        for day in self.rules.weekdays:
+            if not self.rules.weekday_shifts[day] & SHIFT_SUPPORT or not self.rules.exclusions[day]:
+                continue
+            blocked = set()
+            for entry in self.rules.exclusions[day]:
+                if str(entry).startswith("pool_"):
+                    blocked.update(config.get(entry) or ())
+                else:
+                    blocked.add(entry)
+            available = [name for name in pool_c if name not in blocked]
+            if len(available) > 1:
+                continue
+            # Pool-B-Mitarbeiter, die an diesem Tag selbst gesperrt sind, brauchen keinen Support
+            without = [name for name in needs_support if name not in blocked and available in ([], [name])]
+            if without:
+                shown = ", ".join(without[:10]) + (f" (+{len(without) - 10} weitere)" if len(without) > 10 else "")
+                self.warnings.append(f"{WEEKDAY_NAMES[day]}s kein möglicher Support für Pool B: {shown}")
+
+
+def check_seeds(config, first_vm, first_nm, first_support=""):
+    """Prüft die Startbesetzung gegen die Pools (Vormittag: A, Nachmittag: D, Support: C)"""
+    errors = []
+    for value, key, label in ((first_vm, "pool_vm_alle", "Vormittag"), (first_nm, "pool_nm_alle", "Nachmittag"),
+                              (first_support, "pool_vm_support", "Support")):
+        value = (value or "").strip()
+        if value and value not in config.get(key, ()):
+            errors.append(f"1. Tag {label}: {value} steht nicht in {POOL_TITLES[key]}.")
+    if errors:
+        raise PlanningError("\n".join(errors))
+
+
+def _cache_path(path):
+    return path + CACHE_SUFFIX
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Lädt nur einfache Daten; jede Klasse oder Funktion in der Datei ist ein Fehler"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"nicht erlaubt in der Cache-Datei: {module}.{name}")
+
+
+def _read_cache(cache_path, stamp):
+    """``(config, warnings)`` aus der Cache-Datei, wenn sie zu ``stamp`` passt, sonst ``None``"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = _PlainUnpickler(io.BytesIO(f.read())).load()
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, IndexError, KeyError):
+        return None  # fehlt oder beschädigt: JSON prüfen
+    if not (isinstance(cached, tuple) and len(cached) == 3 and cached[0] == stamp):
+        return None
+    _, config, warnings = cached
+    if not isinstance(config, dict) or not isinstance(warnings, list):
+        return None
+    return config, warnings
+
+
+def load_roster(path, use_cache=True):
+    """Liest und prüft eine Konfigurationsdatei; nutzt bzw. erneuert die Cache-Datei daneben"""
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        source = f.read()
+    stamp = (CACHE_VERSION, __version__, stat.st_mtime_ns, stat.st_size, hashlib.sha256(source).hexdigest())
+    cache_path = _cache_path(path)
+    if use_cache:
+        cached = _read_cache(cache_path, stamp)
+        if cached is not None:
+            return Roster._from_cache(*cached)
+    try:
+        data = json.loads(source.decode('utf-8'))
+    except ValueError as e:
+        raise PlanningError(f"{path} ist kein gültiges JSON: {e}") from None
+    roster = Roster(data)
+    if use_cache:
+        try:
+            tmp = cache_path + ".tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump((stamp, roster.config, roster.warnings), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except (OSError, pickle.PicklingError):
+            pass  # z.B. schreibgeschütztes Verzeichnis: ohne Cache weiter
+    return roster
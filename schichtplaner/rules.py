@@ -0,0 +1,178 @@
+"""Konfigurierbare Planungsregeln (Tagesmuster, Feiertage, Sperren, Ruhezeiten).
+
+Die Regeln stehen optional unter ``"rules"`` in der Pool-Konfiguration;
+fehlende Einträge haben die bisherigen Standardwerte, ``day_shifts`` wird je
+Wochentag mit dem Standard zusammengeführt (Samstag bleibt ohne Dienste, solange
+er nicht selbst angegeben ist)::
+
+    "rules": {
+      "weekdays": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag"],
+      "day_shifts": {"Samstag": []},                       # Dienste je Wochentag (Standard: alle)
+      "holidays": ["01.05.2026", "25.12.2026"],             # oder {"24.12.2026": ["Vormittag"]}
+      "weekday_exclusions": {"Freitag": ["pool_freitag_abwesend"]},   # Pools oder Kürzel
+      "rest": {"Nachmittag": ["Vormittag", "Support"]}      # nach Dienst X am Vortag kein Dienst Y
+    }
+
+``weekdays`` sind die Tage, die als Zeile im Plan erscheinen (z.B. mit
+"Sonntag"); Tage ohne Dienste (Standard: Samstag) erscheinen leer. Die
+Dienstarten selbst bleiben Vormittag, Nachmittag und Support (Support nur
+für Vormittage aus Pool B), da Export, Ablage und Auswertung diese Spalten
+verwenden; je Tag ist aber frei wählbar, welche davon besetzt werden.
+
+``RuleSet.compile`` übersetzt die Regeln einmal je Planung in Tabellen je
+Planungstag (aktive Dienste als Bitmaske, gesperrte Mitarbeiter als Bitset);
+die Planungsschleife liest nur noch diese Tabellen.
+"""
+
+from datetime import date, datetime, timedelta
+
+from .engine import (
+    DATE_FORMAT, POOL_KEYS, SHIFT_COLUMNS, SHIFT_NM, SHIFT_SUPPORT, SHIFT_VM, WEEKDAY_NAMES, PlanningError,
+)
+
+
+SHIFT_NAMES = SHIFT_COLUMNS                 # Reihenfolge der Dienste in Regeltabellen: VM, NM, Support
+SHIFT_BITS = {"Vormittag": SHIFT_VM, "Nachmittag": SHIFT_NM, "Support": SHIFT_SUPPORT}
+ALL_SHIFTS = SHIFT_VM | SHIFT_NM | SHIFT_SUPPORT
+
+DEFAULT_RULES = {
+    "weekdays": WEEKDAY_NAMES[:6],
+    "day_shifts": {"Samstag": []},
+    "holidays": [],
+    "weekday_exclusions": {"Freitag": ["pool_freitag_abwesend"]},
+    "rest": {"Nachmittag": ["Vormittag", "Support"]},
+}
+
+
+def _weekday(name):
+    if isinstance(name, int) and 0 <= name <= 6:
+        return name
+    try:
+        return WEEKDAY_NAMES.index(str(name).strip().capitalize())
+    except ValueError:
+        raise PlanningError(f"Unbekannter Wochentag in den Regeln: {name!r}") from None
+
+
+def _shift_mask(shifts):
+    mask = 0
+    for name in shifts:
+        if name not in SHIFT_BITS:
+            raise PlanningError(f"Unbekannter Dienst in den Regeln: {name!r}")
+        mask |= SHIFT_BITS[name]
+    return mask
+
+
+def _date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), DATE_FORMAT).date()
+    except ValueError:
+        raise PlanningError(f"Ungültiges Feiertagsdatum in den Regeln: {value!r}") from None
+
+
+class RuleSet:
+    """Geprüfte, vorberechnete Regeln einer Konfiguration"""
+
+    def __init__(self, config=None):
+        user_rules = (config or {}).get("rules") or {}
+        rules = dict(DEFAULT_RULES)
+        rules.update(user_rules)
+        if user_rules.get("day_shifts"):
+            rules["day_shifts"] = dict(DEFAULT_RULES["day_shifts"])
+            rules["day_shifts"].update(user_rules["day_shifts"])
+
+        self.weekdays = sorted({_weekday(day) for day in rules["weekdays"]})
+        if not self.weekdays:
+            raise PlanningError("Die Regeln enthalten keine Planungstage (weekdays).")
+        self.weekday_set = frozenset(self.weekdays)
+
+        # Aktive Dienste je Wochentag (0=Mo .. 6=So)
+        self.weekday_shifts = [ALL_SHIFTS] * 7
+        by_weekday = {}
+        for day, shifts in (rules["day_shifts"] or {}).items():
+            by_weekday[_weekday(day)] = _shift_mask(shifts)   # spätere Einträge (Konfiguration) gewinnen
+        for day, shifts in by_weekday.items():
+            self.weekday_shifts[day] = shifts
+
+        holidays = rules["holidays"] or []
+        if isinstance(holidays, dict):
+            self.holidays = {_date(day): _shift_mask(shifts) for day, shifts in holidays.items()}
+        else:
+            self.holidays = {_date(day): 0 for day in holidays}
+
+        # Gesperrte Pools/Kürzel je Wochentag (Auflösung der Pools erst in compile)
+        self.exclusions = [[] for _ in range(7)]
+        for day, names in (rules["weekday_exclusions"] or {}).items():
+            unknown = [name for name in names if str(name).startswith("pool_") and name not in POOL_KEYS]
+            if unknown:
+                raise PlanningError(f"Unbekannter Pool in den Regeln: {', '.join(map(str, unknown))}")
+            self.exclusions[_weekday(day)].extend(names)
+
+        # Ruhezeiten: je heutigem Dienst die Dienste vom Vortag, die ihn sperren
+        rest = [[] for _ in SHIFT_NAMES]
+        for before, blocked in (rules["rest"] or {}).items():
+            _shift_mask([before] + list(blocked))
+            for shift in blocked:
+                rest[SHIFT_NAMES.index(shift)].append(SHIFT_NAMES.index(before))
+        self.rest = tuple(tuple(sources) for sources in rest)
+
+    @property
+    def days_per_week(self):
+        return len(self.weekdays)
+
+    def shifts_on(self, day):
+        """Bitmaske der an ``day`` (date) zu besetzenden Dienste"""
+        shifts = self.holidays.get(day)
+        if shifts is None:
+            shifts = self.weekday_shifts[day.weekday()]
+        return shifts
+
+    def plan_dates(self, start_date, days):
+        """Die ersten ``days`` Planungstage ab ``start_date`` (nur ``weekdays``)"""
+        current = start_date
+        one_day = timedelta(days=1)
+        weekdays = self.weekday_set
+        for _ in range(days):
+            while current.weekday() not in weekdays:
+                current += one_day
+            yield current
+            current += one_day
+
+    def next_plan_day(self, day):
+        """Erster Planungstag nach ``day``"""
+        day += timedelta(days=1)
+        while day.weekday() not in self.weekday_set:
+            day += timedelta(days=1)
+        return day
+
+    def exclusion_masks(self, config, index):
+        """Gesperrte Mitarbeiter je Wochentag als Bitsets (Pool-Schlüssel werden aufgelöst)"""
+        masks = []
+        for names in self.exclusions:
+            employees = []
+            for name in names:
+                if str(name).startswith("pool_"):
+                    employees.extend(config.get(name) or ())
+                else:
+                    employees.append(name)
+            masks.append(index.mask(employees))
+        return masks
+
+    def compile(self, config, index, dates):
+        """Tabellen je Planungstag: ``(aktive_dienste, gesperrt)``.
+
+        ``dates`` sind die Planungstage (date oder datetime); ``gesperrt`` enthält
+        die Wochentagssperren als Bitset (Abwesenheiten kommen beim Planen dazu).
+        """
+        exclusion = self.exclusion_masks(config, index)
+        shifts = []
+        blocked = []
+        for day in dates:
+            if isinstance(day, datetime):
+                day = day.date()
+            shifts.append(self.shifts_on(day))
+            blocked.append(exclusion[day.weekday()])
+        return shifts, blocked
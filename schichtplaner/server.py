@@ -0,0 +1,400 @@
+"""Lokaler HTTP/JSON-Dienst für Planung und Export (nur Standardbibliothek, asyncio).
+
+Andere Werkzeuge können damit Planungen anfordern, ohne die GUI zu bedienen::
+
+    python -m schichtplaner serve --port 8765 --config-dir .
+
+Endpunkte:
+
+``GET /health``
+    ``{"status": "ok", "version": ...}``
+``GET /configs``
+    Namen der Konfigurationen in ``--config-dir`` (``<name>.json``)
+``POST /plan``
+    Body (JSON)::
+
+        {"config": "shift_config" | {...Pools...}, "start_date": "05.01.2026",
+         "weeks": 2 | "days": 12, "first_vm": "MH", "first_nm": "IL", "first_support": "",
+         "absences": {"07.01.2026": ["RR"]}, "checkpoint": {...},
+         "solver": "rotation" | "optimierung", "time_limit": 2.0, "format": "json" | "csv" | "xlsx"}
+
+    Antwort mit ``format`` json: ``{"rows": [...], "checkpoint": {...}, "stats": {...}}``;
+    csv/xlsx wie der Export der GUI.
+``POST /export``
+    Body ``{"rows": [...], "format": "csv" | "xlsx" | "json"}``: Export fertiger Zeilen.
+
+Jede Verbindung wird in einer eigenen Coroutine bedient, Anfragen laufen also
+nebenläufig. Die Rotation (Millisekunden) läuft in einem Thread, die lokale
+Suche und große Exporte in einem Prozess-Pool, damit die Ereignisschleife
+nicht blockiert. Konfigurationsdateien werden einmal geladen und erst bei
+geänderter Änderungszeit neu gelesen; Planungen und Exporte teilen sich einen
+``PlanCache``. CSV wird mit ``Transfer-Encoding: chunked`` zeilenblockweise
+gestreamt, xlsx (ein ZIP-Archiv, erst am Ende vollständig) in Blöcken gesendet.
+
+Fehler in den Eingaben ergeben Status 400 mit ``{"fehler": "..."}``. Der Dienst
+bindet standardmäßig nur an ``127.0.0.1`` und hat keine Authentifizierung.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from . import __version__
+from .absences import read_json
+from .cache import PlanCache, plan_key
+from .engine import COLUMNS, POSITION_KEYS, YESTERDAY_KEYS, PlanningError, checkpoint_from_rows
+from .export import render_bytes
+from .metrics import plan_stats
+from .roster import Roster, check_seeds, load_roster
+from .rules import RuleSet
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 16 * 1024 * 1024
+CHUNK_ROWS = 512            # Zeilen je CSV-Block
+CHUNK_BYTES = 64 * 1024     # Blockgröße für xlsx
+FORMATS = ("json", "csv", "xlsx")
+CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 501: "Not Implemented"}
+
+
+class RequestError(Exception):
+    """Fehlerhafte Anfrage; ``status`` wird als HTTP-Status gesendet"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_checkpoint(checkpoint):
+    """Prüft Typ und Aufbau eines übergebenen ``checkpoint`` (siehe ``Rotation.checkpoint``)"""
+    if not isinstance(checkpoint, dict):
+        raise RequestError(400, "'checkpoint' muss ein Objekt sein")
+    positions = checkpoint.get("pool_positions")
+    if positions is None:
+        positions = {}
+    elif not isinstance(positions, dict):
+        raise RequestError(400, "'checkpoint.pool_positions' muss ein Objekt sein")
+    for key in POSITION_KEYS:
+        value = positions.get(key, 0)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise RequestError(400, f"'checkpoint.pool_positions.{key}' muss eine ganze Zahl sein: {value!r}")
+    for key in YESTERDAY_KEYS:
+        value = checkpoint.get(key)
+        if value is not None and not isinstance(value, str):
+            raise RequestError(400, f"'checkpoint.{key}' muss ein Kürzel oder null sein: {value!r}")
+
+
+def plan_job(config, start_date, first_vm, first_nm, first_support, absences, days, solver, time_limit, checkpoint):
+    """Plant im Worker (Thread oder Prozess) und gibt ``{"rows": ..., "checkpoint": ...}`` zurück"""
+    if solver == "optimierung":
+        from .solver import optimize_plan
+
+        rows = optimize_plan(config, start_date, first_vm, first_nm, first_support, absences, days=days,
+                             time_limit=time_limit, checkpoint=checkpoint)
+        return {"rows": rows, "checkpoint": checkpoint_from_rows(config, rows)}
+    from .incremental import IncrementalPlan
+
+    plan = IncrementalPlan(config, start_date, first_vm, first_nm, first_support, absences, days=days,
+                           checkpoint=checkpoint)
+    return {"rows": plan.rows, "checkpoint": plan.checkpoint}
+
+
+class PlanningService:
+    """Anfragelogik unabhängig vom HTTP-Transport (Konfigurationen, Cache, Worker)"""
+
+    def __init__(self, config_dir=None, workers=None, cache=None):
+        self.config_dir = config_dir
+        self.cache = cache if cache is not None else PlanCache(maxsize=64)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self._configs = {}  # name -> (mtime, config)
+        self._running = {}  # Schlüssel -> Future laufender Planungen (gleiche Anfragen warten darauf)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    # -------------------- Konfigurationen --------------------
+
+    def config_names(self):
+        if not self.config_dir:
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(self.config_dir) if name.endswith(".json"))
+
+    def load_config(self, value):
+        """Pools als Objekt oder Name einer Datei in ``config_dir`` (einmal geladen, bei Änderung neu)"""
+        if isinstance(value, dict):
+            return Roster(value).config
+        if not isinstance(value, str) or not self.config_dir:
+            raise RequestError(400, "Bitte 'config' als Objekt oder Name einer Konfiguration angeben.")
+        name = os.path.basename(value)
+        if name.endswith(".json"):
+            name = name[:-5]
+        path = os.path.join(self.config_dir, name + ".json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            raise RequestError(404, f"Konfiguration nicht gefunden: {value}") from None
+        cached = self._configs.get(name)
+        if cached is None or cached[0] != mtime:
+            cached = self._configs[name] = (mtime, load_roster(path).config)
+        return cached[1]
+
+    # -------------------- Planung --------------------
+
+    def plan_arguments(self, body):
+        """Prüft eine Planungsanfrage und gibt die Argumente für ``plan_job`` zurück"""
+        config = self.load_config(body.get("config"))
+        checkpoint = body.get("checkpoint")
+        if checkpoint is not None:
+            _check_checkpoint(checkpoint)
+        first_support = body.get("first_support") or ""
+        if checkpoint is None:
+            first_vm = body.get("first_vm") or (config["pool_vm_alle"][0] if config["pool_vm_alle"] else "")
+            first_nm = body.get("first_nm") or (config["pool_nm_alle"][0] if config["pool_nm_alle"] else "")
+            try:
+                check_seeds(config, first_vm, first_nm, first_support)
+            except PlanningError as e:
+                raise RequestError(400, str(e)) from None
+        else:
+            first_vm = first_nm = ""
+        if "days" in body:
+            days = int(body["days"])
+        else:
+            days = int(body.get("weeks", 2)) * RuleSet(config).days_per_week
+        data = body.get("absences") or {}
+        if not isinstance(data, dict):
+            raise RequestError(400, "'absences' muss ein Objekt {\"TT.MM.YYYY\": [\"KÜRZEL\", ...]} sein")
+        try:
+            absences = read_json(data)
+        except PlanningError as e:
+            raise RequestError(400, str(e)) from None
+        solver = body.get("solver", "rotation")
+        if solver not in ("rotation", "optimierung"):
+            raise RequestError(400, f"Unbekanntes Verfahren: {solver}")
+        return (config, body.get("start_date"), first_vm, first_nm, first_support, absences,
+                days, solver, float(body.get("time_limit", 2.0)), checkpoint)
+
+    async def plan(self, body):
+        args = self.plan_arguments(body)
+        config, start_date, first_vm, first_nm, first_support, absences, days, solver, time_limit, checkpoint = args
+        key = plan_key(config, start_date, first_vm, first_nm, first_support, absences, days=days, solver=solver,
+                       time_limit=time_limit, checkpoint=checkpoint)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return config, entry
+        running = self._running.get(key)
+        if running is None:
+            # Lokale Suche im Prozess-Pool (CPU-lastig), Rotation im Thread (schnell, kein Pickling)
+            executor = self.pool if solver == "optimierung" else None
+            loop = asyncio.get_running_loop()
+            running = self._running[key] = loop.run_in_executor(executor, partial(plan_job, *args))
+            running.add_done_callback(partial(self._finished, key))
+        # shield: bricht ein Client ab, laufen Planung und die übrigen Wartenden weiter
+        entry = await asyncio.shield(running)
+        return config, entry
+
+    def _finished(self, key, running):
+        """Legt das Ergebnis einer beendeten Planung im Cache ab (auch ohne wartenden Client)"""
+        del self._running[key]
+        if not running.cancelled() and running.exception() is None:
+            self.cache.put(key, running.result())
+
+    async def export_bytes(self, rows, fmt, config=None):
+        """Exportdatei als Bytes (große Pläne im Prozess-Pool, unveränderte aus dem Cache).
+
+        Mit ``config`` enthält Excel zusätzlich das Blatt "Auswertung".
+        """
+        data = self.cache.get_export(rows, fmt, config)
+        if data is None:
+            executor = self.pool if len(rows) > CHUNK_ROWS else None
+            data = await asyncio.get_running_loop().run_in_executor(executor, render_bytes, rows, fmt, config)
+            self.cache.put_export(rows, fmt, data, config)
+        return data
+
+
+# -------------------- HTTP --------------------
+
+async def read_request(reader):
+    """Liest eine HTTP/1.1-Anfrage: ``(methode, pfad, body)``; ``None`` bei geschlossener Verbindung"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "Ungültige Anfragezeile") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise RequestError(413, "Anfrage zu groß")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _head(status, content_type, extra=()):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Type: {content_type}",
+             "Connection: close"]
+    lines.extend(extra)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer, status, data):
+    payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    writer.write(_head(status, CONTENT_TYPES["json"], (f"Content-Length: {len(payload)}",)) + payload)
+    await writer.drain()
+
+
+async def send_bytes(writer, data, fmt, filename):
+    """Sendet eine fertige Datei in Blöcken (Gegendruck über ``drain``)"""
+    writer.write(_head(200, CONTENT_TYPES[fmt], (
+        f"Content-Length: {len(data)}", f'Content-Disposition: attachment; filename="{filename}"')))
+    view = memoryview(data)
+    for start in range(0, len(data), CHUNK_BYTES):
+        writer.write(view[start:start + CHUNK_BYTES])
+        await writer.drain()
+
+
+async def send_csv(writer, rows, filename):
+    """Streamt CSV (wie ``export.write_csv``) blockweise mit ``Transfer-Encoding: chunked``"""
+    writer.write(_head(200, CONTENT_TYPES["csv"], (
+        "Transfer-Encoding: chunked", f'Content-Disposition: attachment; filename="{filename}"')))
+    buffer = io.StringIO()
+    out = csv.writer(buffer)
+    buffer.write("\ufeff")
+    out.writerow(COLUMNS)
+    for start in range(0, len(rows) + 1, CHUNK_ROWS):
+        for row in rows[start:start + CHUNK_ROWS]:
+            out.writerow([row[c] for c in COLUMNS])
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        if chunk:
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _parse_json(body):
+    try:
+        data = json.loads(body.decode("utf-8") or "{}")
+    except (UnicodeDecodeError, ValueError):
+        raise RequestError(400, "Body ist kein gültiges JSON") from None
+    if not isinstance(data, dict):
+        raise RequestError(400, "Body muss ein JSON-Objekt sein")
+    return data
+
+
+def _format(body):
+    fmt = body.get("format", "json")
+    if fmt not in FORMATS:
+        raise RequestError(400, f"Unbekanntes Format: {fmt}")
+    return fmt
+
+
+async def respond_rows(service, writer, rows, fmt, name="planung", config=None):
+    if fmt == "csv":
+        await send_csv(writer, rows, f"{name}.csv")
+    else:
+        await send_bytes(writer, await service.export_bytes(rows, fmt, config if fmt == "xlsx" else None), fmt,
+                         f"{name}.{fmt}")
+
+
+async def handle(service, reader, writer):
+    """Bedient eine Verbindung (eine Anfrage, danach wird geschlossen)"""
+    try:
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            method, path, body = request
+            if path == "/health":
+                await send_json(writer, 200, {"status": "ok", "version": __version__})
+            elif path == "/configs":
+                await send_json(writer, 200, {"configs": service.config_names()})
+            elif path in ("/plan", "/export"):
+                if method != "POST":
+                    raise RequestError(405, "Bitte POST verwenden")
+                data = _parse_json(body)
+                fmt = _format(data)
+                if path == "/plan":
+                    config, entry = await service.plan(data)
+                    if fmt == "json":
+                        await send_json(writer, 200, dict(entry, stats=plan_stats(entry["rows"], config)))
+                    else:
+                        await respond_rows(service, writer, entry["rows"], fmt, config=config)
+                else:
+                    rows = data.get("rows")
+                    if not isinstance(rows, list):
+                        raise RequestError(400, "Bitte 'rows' als Liste angeben")
+                    await respond_rows(service, writer, rows, fmt)
+            else:
+                raise RequestError(404, f"Unbekannter Pfad: {path}")
+        except RequestError as e:
+            await send_json(writer, e.status, {"fehler": str(e)})
+        except (PlanningError, ValueError, KeyError, TypeError) as e:
+            await send_json(writer, 400, {"fehler": str(e)})
+        except ImportError as e:
+            await send_json(writer, 501, {"fehler": f"Format nicht verfügbar: {e}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await send_json(writer, 500, {"fehler": f"Interner Fehler: {e}"})
+    finally:
+        writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, config_dir=None, workers=None, ready=None):
+    """Startet den Dienst und läuft bis zum Abbruch; ``ready(port)`` wird nach dem Binden aufgerufen"""
+    service = PlanningService(config_dir, workers)
+    server = await asyncio.start_server(partial(handle, service), host, port)
+    try:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def configure_parser(parser):
+    """Argumente des Dienstes (für ``python -m schichtplaner serve``)"""
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Adresse (Standard: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (Standard: {DEFAULT_PORT}, 0 = frei)")
+    parser.add_argument("--config-dir", default=".", help="Verzeichnis mit Konfigurationen <name>.json")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Prozesse für Optimierung und Export (Standard: alle Kerne)")
+    return parser
+
+
+def run_cli(args):
+    def ready(port):
+        print(f"Schichtplaner-Dienst läuft auf http://{args.host}:{port}/", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.config_dir, args.workers, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Lokaler HTTP/JSON-Dienst für Planung und Export")
+    return run_cli(configure_parser(parser).parse_args(argv))
@@ -0,0 +1,374 @@
+"""Optimierender Planer (lokale Suche) als Alternative zur Rotation.
+
+Startet mit der Rotationsplanung aus ``create_plan`` und verbessert sie durch
+Umbesetzen einzelner Dienste (Simulated Annealing). Ziel ist zuerst, möglichst
+wenige Dienste offen zu lassen, danach eine möglichst gleichmäßige Anzahl
+Dienste pro Person (Summe der quadrierten Dienstzahlen, d.h. die Varianz bei
+fester Gesamtzahl). Es gelten dieselben Regeln wie in der Rotation:
+
+* Vormittag aus Pool A, Support aus Pool C, Nachmittag aus Pool D
+* Vormittag aus Pool B braucht Support aus Pool C, sonst kein Support
+* niemand hat zwei Dienste am selben Tag, der 1. Tag bleibt wie vorgegeben
+* Tagesmuster, Feiertage, Wochentagssperren und Ruhezeiten aus den Regeln
+  der Konfiguration (Standard: Samstag ohne Schichten, Pool E freitags
+  gesperrt, kein Vormittag/Support nach einem Nachmittagsdienst am Vortag)
+
+Die Suche ist jederzeit abbrechbar: zurückgegeben wird immer das beste bisher
+gefundene Ergebnis, auch wenn das Zeitbudget abläuft oder ``should_stop()``
+True liefert.
+"""
+
+import math
+import random
+import time
+
+from .engine import DATE_FORMAT, WEEKDAY_NAMES, check_inputs, create_plan, normalize_config, parse_day, plan_dates
+from .index import PoolIndex
+from .rules import SHIFT_BITS, SHIFT_NAMES, RuleSet
+
+
+VM, SUPPORT, NM = 0, 1, 2
+SLOT_KEYS = ("Vormittag", "Support", "Nachmittag")
+UNCOVERED_WEIGHT = 1_000_000   # ein offener Dienst wiegt schwerer als jede Lastverteilung
+
+
+class _IndexedSet:
+    """Menge mit O(1)-Zufallsauswahl"""
+
+    def __init__(self):
+        self.items = []
+        self.pos = {}
+
+    def add(self, item):
+        if item not in self.pos:
+            self.pos[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        i = self.pos.pop(item, None)
+        if i is not None:
+            last = self.items.pop()
+            if last != item:
+                self.items[i] = last
+                self.pos[last] = i
+
+    def __len__(self):
+        return len(self.items)
+
+
+class LocalSearchSolver:
+    """Lokale Suche über die Dienstbesetzung eines Planungszeitraums"""
+
+    def __init__(self, config, start_date, first_vm, first_nm, first_support="", absences=None, days=12, seed=0,
+                 checkpoint=None):
+        config = normalize_config(config)
+        start_date, first_vm, first_nm, first_support = check_inputs(
+            start_date, first_vm, first_nm, first_support, days, checkpoint)
+        index = PoolIndex(config)
+        for name in (first_vm, first_nm, first_support):
+            if name:
+                index.intern(name)
+        self.index = index
+        rules = RuleSet(config)
+        self.dates = list(plan_dates(start_date, days, rules))
+        self.rng = random.Random(seed)
+
+        absent = index.absence_masks(absences or {}, key=parse_day)
+        day_keys = [d.date() for d in self.dates]
+        day_shifts, rule_blocked = rules.compile(config, index, day_keys)
+        # active[s][t]: Dienst s ist am Tag t zu besetzen
+        self.active = [[bool(shifts & SHIFT_BITS[key]) for shifts in day_shifts] for key in SLOT_KEYS]
+        self.work = [bool(shifts) for shifts in day_shifts]
+        self.blocked = [absent.get(day, 0) | mask for day, mask in zip(day_keys, rule_blocked)]
+        # Ruhezeiten in Slot-Nummern: rest_before[s] sperrt s nach diesen Diensten am Vortag,
+        # rest_after[s] sind die Dienste am Folgetag, die nach s gesperrt sind
+        slot_of = [SLOT_KEYS.index(name) for name in SHIFT_NAMES]
+        self.rest_before = [()] * len(SLOT_KEYS)
+        for shift, sources in enumerate(rules.rest):
+            self.rest_before[slot_of[shift]] = tuple(slot_of[p] for p in sources)
+        self.rest_after = [tuple(s for s in range(len(SLOT_KEYS)) if p in self.rest_before[s])
+                           for p in range(len(SLOT_KEYS))]
+        self.members = (index.vm_alle.members, index.vm_support.members, index.nm_alle.members)
+        self.pool_ids = tuple(list(dict.fromkeys(p.ids)) for p in (index.vm_alle, index.vm_support, index.nm_alle))
+        self.needs_support = index.teilweise_mask
+        # Der 1. Tag ist fest vorgegeben, außer beim Fortsetzen aus einem Checkpoint
+        first_movable = 0 if checkpoint is not None else 1
+        # Dienste am letzten Tag der vorherigen Planung (Ruhezeiten am 1. Tag)
+        previous = checkpoint or {}
+        self.previous = [index.ids.get(previous.get(f"yesterday_{key}")) for key in ("vm", "support", "nm")]
+        self.movable = [t for t in range(first_movable, len(self.dates)) if self.work[t]]
+
+        # Startlösung: Rotation
+        greedy = create_plan(config, start_date, first_vm, first_nm, first_support, absences, days=days, index=index,
+                             checkpoint=checkpoint)
+        self.slots = [[None] * len(greedy) for _ in SLOT_KEYS]
+        for t, row in enumerate(greedy):
+            for s, key in enumerate(SLOT_KEYS):
+                if row[key]:
+                    self.slots[s][t] = index.ids[row[key]]
+
+        self.load = [0] * len(index.employees)
+        for column in self.slots:
+            for c in column:
+                if c is not None:
+                    self.load[c] += 1
+        self.sumsq = sum(value * value for value in self.load)
+        self.day_uncovered = [0] * len(self.dates)
+        self.open_days = _IndexedSet()
+        self.uncovered = 0
+        for t in self.movable:
+            u = self._count_uncovered(t)
+            self.day_uncovered[t] = u
+            self.uncovered += u
+            if u:
+                self.open_days.add(t)
+        self._journal = []
+        self.iterations = 0
+        self._save_best()
+
+    # -------------------- Zustand --------------------
+
+    @property
+    def objective(self):
+        return self.uncovered * UNCOVERED_WEIGHT + self.sumsq
+
+    def _count_uncovered(self, t):
+        vm = self.slots[VM][t]
+        active = self.active
+        u = (active[VM][t] and vm is None) + (active[NM][t] and self.slots[NM][t] is None)
+        if vm is not None and (self.needs_support >> vm) & 1 and active[SUPPORT][t] and self.slots[SUPPORT][t] is None:
+            u += 1
+        return u
+
+    def _set(self, t, s, c, log=True):
+        """Besetzt einen Dienst neu und führt Last, Lücken und Journal nach"""
+        old = self.slots[s][t]
+        if old == c:
+            return
+        load = self.load
+        if old is not None:
+            self.sumsq -= 2 * load[old] - 1
+            load[old] -= 1
+        if c is not None:
+            self.sumsq += 2 * load[c] + 1
+            load[c] += 1
+        self.slots[s][t] = c
+        if log:
+            self._journal.append((t, s, old))
+        u = self._count_uncovered(t)
+        diff = u - self.day_uncovered[t]
+        if diff:
+            self.uncovered += diff
+            self.day_uncovered[t] = u
+            if u:
+                self.open_days.add(t)
+            else:
+                self.open_days.discard(t)
+
+    def _rollback(self, mark):
+        journal = self._journal
+        while len(journal) > mark:
+            t, s, old = journal.pop()
+            self._set(t, s, old, log=False)
+
+    def _save_best(self):
+        self.best_objective = self.objective
+        self.best_uncovered = self.uncovered
+        self.best_slots = [column[:] for column in self.slots]
+
+    # -------------------- Regeln --------------------
+
+    def _feasible(self, t, s, c):
+        """Darf ``c`` den Dienst ``s`` am Tag ``t`` übernehmen (bei sonst unverändertem Plan)?"""
+        if not self.active[s][t] or (self.blocked[t] >> c) & 1 or not (self.members[s] >> c) & 1:
+            return False
+        slots = self.slots
+        for other in (VM, SUPPORT, NM):
+            if other != s and slots[other][t] == c:
+                return False
+        if t + 1 < len(self.dates) and self.work[t + 1]:
+            for other in self.rest_after[s]:
+                if slots[other][t + 1] == c:
+                    return False
+        for other in self.rest_before[s]:
+            if (slots[other][t - 1] if t > 0 else self.previous[other]) == c:
+                return False
+        if s == SUPPORT:
+            vm = slots[VM][t]
+            if vm is None or not (self.needs_support >> vm) & 1:
+                return False
+        return True
+
+    def _best_candidate(self, t, s):
+        """Zulässiger Kandidat mit der geringsten Last (ohne den aktuellen Inhaber)"""
+        ids = self.pool_ids[s]
+        if not ids:
+            return None
+        current = self.slots[s][t]
+        load = self.load
+        best = None
+        best_load = None
+        offset = self.rng.randrange(len(ids))
+        for i in range(len(ids)):
+            c = ids[(offset + i) % len(ids)]
+            if c == current or (best_load is not None and load[c] >= best_load):
+                continue
+            if self._feasible(t, s, c):
+                best, best_load = c, load[c]
+        return best
+
+    def _place(self, t, s, c):
+        """Setzt einen Dienst; beim Vormittag wird der Support passend nachgezogen"""
+        self._set(t, s, c)
+        if s != VM:
+            return
+        if c is None or not (self.needs_support >> c) & 1:
+            self._set(t, SUPPORT, None)
+            return
+        support = self.slots[SUPPORT][t]
+        if support is None or not self._feasible(t, SUPPORT, support):
+            self._set(t, SUPPORT, None)
+            self._set(t, SUPPORT, self._best_candidate(t, SUPPORT))
+
+    def _conflicts(self, t, s, c):
+        """Dienste von ``c``, die verhindern, dass ``c`` den Dienst ``s`` am Tag ``t`` übernimmt"""
+        slots = self.slots
+        found = [(t, other) for other in (VM, SUPPORT, NM) if other != s and slots[other][t] == c]
+        if t + 1 < len(self.dates) and self.work[t + 1]:
+            found += [(t + 1, other) for other in self.rest_after[s] if slots[other][t + 1] == c]
+        if t > 0:
+            found += [(t - 1, other) for other in self.rest_before[s] if slots[other][t - 1] == c]
+        return found
+
+    # -------------------- Züge --------------------
+
+    def _pick_slot(self):
+        if len(self.open_days) and self.rng.random() < 0.5:
+            t = self.rng.choice(self.open_days.items)
+            if self.active[VM][t] and self.slots[VM][t] is None:
+                return t, VM
+            if self.active[NM][t] and self.slots[NM][t] is None:
+                return t, NM
+            return t, SUPPORT
+        t = self.rng.choice(self.movable)
+        vm = self.slots[VM][t]
+        if vm is not None and (self.needs_support >> vm) & 1 and self.rng.random() < 0.3:
+            return t, SUPPORT
+        s = VM if self.rng.random() < 0.5 else NM
+        return t, (s if self.active[s][t] else NM - s)
+
+    def _accept(self, before, temperature):
+        delta = self.objective - before
+        if delta < 0:
+            return True
+        if delta == 0:
+            return self.rng.random() < 0.5
+        if delta >= UNCOVERED_WEIGHT:
+            return False
+        return self.rng.random() < math.exp(-delta / temperature)
+
+    def _move_reassign(self, t, s, temperature):
+        c = self._best_candidate(t, s)
+        if c is None:
+            if self.slots[s][t] is None:
+                self._move_eject(t, s)
+            return
+        before = self.objective
+        mark = len(self._journal)
+        self._place(t, s, c)
+        if not self._accept(before, temperature):
+            self._rollback(mark)
+
+    def _move_eject(self, t, s, tries=8):
+        """Offenen Dienst mit jemandem besetzen, der dafür einen anderen Dienst abgibt"""
+        ids = self.pool_ids[s]
+        if not ids:
+            return False
+        for c in self.rng.sample(ids, min(tries, len(ids))):
+            if (self.blocked[t] >> c) & 1:
+                continue
+            conflicts = self._conflicts(t, s, c)
+            if len(conflicts) != 1:
+                continue
+            t2, s2 = conflicts[0]
+            before = self.objective
+            mark = len(self._journal)
+            self._place(t2, s2, None)
+            if self._feasible(t, s, c):
+                self._place(t, s, c)
+                if self.slots[s2][t2] is None:
+                    self._place(t2, s2, self._best_candidate(t2, s2))
+                if self.objective < before:
+                    return True
+            self._rollback(mark)
+        return False
+
+    # -------------------- Suche --------------------
+
+    def run(self, time_limit=2.0, max_iterations=None, should_stop=None, patience=None, progress=None):
+        """Sucht bis Zeitbudget, Iterationslimit, Abbruch oder Stillstand (``patience``).
+
+        ``progress(anteil)`` erhält den verbrauchten Anteil des Zeitbudgets.
+        """
+        if not self.movable:
+            return self
+        if patience is None:
+            patience = max(20000, 60 * len(self.movable))
+        started = time.perf_counter()
+        last_improvement = self.iterations
+        temperature = 2.0
+        while True:
+            if (self.iterations & 255) == 0:
+                used = (time.perf_counter() - started) / time_limit if time_limit else 0.0
+                if used >= 1.0 or (should_stop is not None and should_stop()):
+                    break
+                if progress is not None:
+                    progress(used)
+                temperature = 2.0 * (1.0 - used) + 0.05
+            if max_iterations is not None and self.iterations >= max_iterations:
+                break
+            if self.iterations - last_improvement > patience:
+                break
+            self.iterations += 1
+
+            t, s = self._pick_slot()
+            self._move_reassign(t, s, temperature)
+            self._journal.clear()
+            if self.objective < self.best_objective:
+                self._save_best()
+                last_improvement = self.iterations
+        return self
+
+    def best_rows(self):
+        """Beste gefundene Planung im Zeilenformat von ``create_plan``"""
+        names = self.index.employees
+        vm_col, support_col, nm_col = self.best_slots
+        rows = []
+        for t, current_date in enumerate(self.dates):
+            weekday = current_date.weekday()
+            if self.work[t]:
+                vm, support, nm = vm_col[t], support_col[t], nm_col[t]
+                row = (
+                    names[vm] if vm is not None else (None if self.active[VM][t] else ""),
+                    names[nm] if nm is not None else (None if self.active[NM][t] else ""),
+                    names[support] if support is not None else "",
+                )
+            else:
+                row = ("", "", "")
+            rows.append({
+                "Datum": current_date.strftime(DATE_FORMAT),
+                "Wochentag": WEEKDAY_NAMES[weekday],
+                "Vormittag": row[0],
+                "Nachmittag": row[1],
+                "Support": row[2],
+            })
+        return rows
+
+
+def optimize_plan(config, start_date, first_vm, first_nm, first_support="", absences=None, days=12,
+                  time_limit=2.0, seed=0, should_stop=None, progress=None, checkpoint=None):
+    """Wie ``create_plan``, aber mit lokaler Suche für wenige Lücken und faire Lastverteilung"""
+    solver = LocalSearchSolver(config, start_date, first_vm, first_nm, first_support, absences, days=days, seed=seed,
+                               checkpoint=checkpoint)
+    solver.run(time_limit=time_limit, should_stop=should_stop, progress=progress)
+    return solver.best_rows()
@@ -0,0 +1,230 @@
+"""Dauerhafte Ablage aller Planungszeiträume in SQLite.
+
+Gespeichert werden je Zeitraum die Planungszeilen, die Abwesenheiten, die
+verwendeten Pools und ein Checkpoint des Rotationsstands am Ende
+(``pool_positions`` plus Dienste des letzten Tages, siehe
+``Rotation.checkpoint``). Der nächste Zeitraum kann damit direkt am
+gespeicherten Stand weiterplanen, ohne Startbesetzung und ohne die
+Vorgeschichte neu zu berechnen.
+
+Daten liegen als ISO-Text (``YYYY-MM-DD``) vor; Abfragen nach Zeitraum oder
+Mitarbeiter laufen über Indizes auf ``(day)`` bzw. ``(employee, day)``.
+Wird ein Zeitraum mit gleichem Startdatum erneut gespeichert, ersetzt er den
+alten; bei sonstigen Überschneidungen gilt je Tag der zuletzt gespeicherte.
+"""
+
+import json
+import sqlite3
+from datetime import date
+
+from .engine import DATE_FORMAT, SHIFT_COLUMNS, WEEKDAY_NAMES, checkpoint_from_rows, normalize_config, parse_day
+from .rules import RuleSet
+
+
+DEFAULT_STORE = "shift_plans.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS periods (
+    id INTEGER PRIMARY KEY,
+    start_day TEXT NOT NULL,
+    end_day TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    solver TEXT NOT NULL,
+    config TEXT NOT NULL,
+    checkpoint TEXT NOT NULL,
+    created TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS periods_start ON periods (start_day);
+CREATE INDEX IF NOT EXISTS periods_end ON periods (end_day);
+
+CREATE TABLE IF NOT EXISTS plan_rows (
+    period_id INTEGER NOT NULL REFERENCES periods (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    vormittag TEXT,
+    nachmittag TEXT,
+    support TEXT,
+    PRIMARY KEY (day, period_id)
+);
+
+CREATE TABLE IF NOT EXISTS assignments (
+    period_id INTEGER NOT NULL REFERENCES periods (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    shift TEXT NOT NULL,
+    employee TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assignments_employee ON assignments (employee, day);
+CREATE INDEX IF NOT EXISTS assignments_period ON assignments (period_id);
+
+CREATE TABLE IF NOT EXISTS absences (
+    period_id INTEGER NOT NULL REFERENCES periods (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    employee TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS absences_day ON absences (day);
+CREATE INDEX IF NOT EXISTS absences_employee ON absences (employee, day);
+CREATE INDEX IF NOT EXISTS absences_period ON absences (period_id);
+"""
+
+# Je Tag nur die Zeile des zuletzt gespeicherten Zeitraums
+LATEST_ROW = "period_id = (SELECT MAX(r.period_id) FROM plan_rows r WHERE r.day = plan_rows.day)"
+
+
+def _iso(value):
+    return parse_day(value).isoformat()
+
+
+def _day(text):
+    return date.fromisoformat(text)
+
+
+def _day_range(start, end):
+    return ("0000-00-00" if start is None else _iso(start)), ("9999-99-99" if end is None else _iso(end))
+
+
+class PlanStore:
+    """SQLite-Ablage für Planungszeiträume, Abwesenheiten und Rotations-Checkpoints"""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        # check_same_thread=False: Speichern kann auch aus einer BackgroundTask erfolgen
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------- Speichern --------------------
+
+    def save_period(self, rows, config, absences=None, checkpoint=None, solver="rotation"):
+        """Speichert einen Planungszeitraum und gibt seine ID zurück.
+
+        ``checkpoint`` ist der Rotationsstand nach dem letzten Tag (z.B.
+        ``IncrementalPlan.checkpoint``); fehlt er, wird er aus den Zeilen bestimmt.
+        """
+        rows = list(rows)
+        if not rows:
+            raise ValueError("Leere Planung kann nicht gespeichert werden")
+        config = normalize_config(config)
+        if checkpoint is None:
+            checkpoint = checkpoint_from_rows(config, rows)
+        days = [_iso(row["Datum"]) for row in rows]
+        with self.db:
+            self.db.execute("DELETE FROM periods WHERE start_day = ?", (days[0],))
+            cursor = self.db.execute(
+                "INSERT INTO periods (start_day, end_day, days, solver, config, checkpoint) VALUES (?, ?, ?, ?, ?, ?)",
+                (days[0], days[-1], len(rows), solver, json.dumps(config, ensure_ascii=False), json.dumps(checkpoint)),
+            )
+            period_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO plan_rows (period_id, day, vormittag, nachmittag, support) VALUES (?, ?, ?, ?, ?)",
+                ((period_id, day, row["Vormittag"], row["Nachmittag"], row["Support"]) for day, row in zip(days, rows)),
+            )
+            self.db.executemany(
+                "INSERT INTO assignments (period_id, day, shift, employee) VALUES (?, ?, ?, ?)",
+                ((period_id, day, column, row[column])
+                 for day, row in zip(days, rows) for column in SHIFT_COLUMNS if row[column]),
+            )
+            first, last = days[0], days[-1]
+            self.db.executemany(
+                "INSERT INTO absences (period_id, day, employee) VALUES (?, ?, ?)",
+                ((period_id, day, employee)
+                 for day, employees in ((_iso(d), e) for d, e in (absences or {}).items())
+                 if first <= day <= last for employee in sorted(set(employees))),
+            )
+        return period_id
+
+    # -------------------- Fortsetzen --------------------
+
+    def periods(self):
+        """Alle gespeicherten Zeiträume (ohne Zeilen), nach Startdatum sortiert"""
+        cursor = self.db.execute(
+            "SELECT id, start_day, end_day, days, solver, created FROM periods ORDER BY start_day, id")
+        return [
+            {"id": pid, "start": _day(start), "end": _day(end), "days": days, "solver": solver,
+             "created": created}
+            for pid, start, end, days, solver, created in cursor
+        ]
+
+    def latest_checkpoint(self, before=None):
+        """``(nächster Planungstag, checkpoint)`` des letzten Zeitraums, der vor ``before`` endet.
+
+        Ohne ``before`` der zuletzt endende Zeitraum; ``None``, wenn keiner gespeichert ist.
+        """
+        query = "SELECT end_day, config, checkpoint FROM periods"
+        params = ()
+        if before is not None:
+            query += " WHERE end_day < ?"
+            params = (_iso(before),)
+        found = self.db.execute(query + " ORDER BY end_day DESC, id DESC LIMIT 1", params).fetchone()
+        if found is None:
+            return None
+        end_day, config, checkpoint = found
+        return RuleSet(json.loads(config)).next_plan_day(_day(end_day)), json.loads(checkpoint)
+
+    def checkpoint_for(self, start_date):
+        """Checkpoint, mit dem eine Planung ab ``start_date`` nahtlos anschließt (sonst ``None``)"""
+        found = self.latest_checkpoint(before=start_date)
+        if found is None or found[0] != parse_day(start_date):
+            return None
+        return found[1]
+
+    # -------------------- Abfragen --------------------
+
+    def latest_config(self, end=None):
+        """Konfiguration des letzten Zeitraums, der bis ``end`` beginnt (``None``, wenn keiner gespeichert ist)"""
+        query = "SELECT config FROM periods"
+        params = ()
+        if end is not None:
+            query += " WHERE start_day <= ?"
+            params = (_iso(end),)
+        found = self.db.execute(query + " ORDER BY start_day DESC, id DESC LIMIT 1", params).fetchone()
+        return None if found is None else json.loads(found[0])
+
+    def rows_between(self, start=None, end=None):
+        """Planungszeilen von ``start`` bis ``end`` (jeweils einschließlich, ``None`` = offen)"""
+        cursor = self.db.execute(
+            "SELECT day, vormittag, nachmittag, support FROM plan_rows "
+            f"WHERE day BETWEEN ? AND ? AND {LATEST_ROW} ORDER BY day",
+            _day_range(start, end),
+        )
+        rows = []
+        for day, vm, nm, support in cursor:
+            day = _day(day)
+            rows.append({
+                "Datum": day.strftime(DATE_FORMAT),
+                "Wochentag": WEEKDAY_NAMES[day.weekday()],
+                "Vormittag": vm,
+                "Nachmittag": nm,
+                "Support": support,
+            })
+        return rows
+
+    def assignments(self, employee, start=None, end=None):
+        """Dienste eines Mitarbeiters als Liste ``(datum, spalte)``, nach Datum sortiert"""
+        cursor = self.db.execute(
+            "SELECT a.day, a.shift FROM assignments a "
+            "WHERE a.employee = ? AND a.day BETWEEN ? AND ? "
+            "AND a.period_id = (SELECT MAX(r.period_id) FROM plan_rows r WHERE r.day = a.day) "
+            "ORDER BY a.day",
+            (employee,) + _day_range(start, end),
+        )
+        return [(_day(day), shift) for day, shift in cursor]
+
+    def absences_between(self, start=None, end=None, employee=None):
+        """Gespeicherte Abwesenheiten als ``{datum: [mitarbeiter]}``"""
+        query = "SELECT DISTINCT day, employee FROM absences WHERE day BETWEEN ? AND ?"
+        params = _day_range(start, end)
+        if employee is not None:
+            query += " AND employee = ?"
+            params += (employee,)
+        result = {}
+        for day, name in self.db.execute(query + " ORDER BY day, employee", params):
+            result.setdefault(_day(day), []).append(name)
+        return result
@@ -0,0 +1,425 @@
+"""Zufallstests der Planungsregeln mit Verkleinerung fehlschlagender Fälle.
+
+Erzeugt zufällige Konfigurationen (Pools, Regeln mit Tagesmustern, Feiertagen,
+Sperren und Ruhezeiten), Abwesenheiten und Zeiträume, plant sie und prüft je
+Planungstag alle Regeln (``check_plan``):
+
+* ``datum``: Zeilen entsprechen genau den Planungstagen der Regeln
+* ``dienste``: nicht zu besetzende Dienste bleiben leer, zu besetzende sind
+  besetzt oder offen (``None``)
+* ``pool``: Vormittag aus Pool A, Nachmittag aus Pool D, Support aus Pool C
+* ``support``: Support nur für einen Vormittag aus Pool B
+* ``abwesend`` / ``wochentag``: keine Abwesenden, keine gesperrten Mitarbeiter
+  (z.B. Pool E am Freitag)
+* ``doppelt``: niemand hat am selben Tag zwei Dienste
+* ``ruhezeit``: Ruhezeiten der Regeln zum Vortag (z.B. kein Vormittag nach
+  Nachmittag)
+* ``luecke`` (nur Rotation): ein Dienst bleibt nur offen, wenn niemand aus dem
+  Pool verfügbar ist
+
+Der 1. Tag mit Startbesetzung ist eine Vorgabe und wird nur als Vortag
+geprüft. Geprüfte Eigenschaften je Fall (``PROPERTIES``):
+
+* ``rotation``: ``create_plan`` hält alle Regeln ein
+* ``inkrementell``: Nachtragen der Abwesenheiten per ``IncrementalPlan``
+  ergibt dieselben Zeilen wie die Planung mit allen Abwesenheiten
+* ``fortsetzung``: Planung bis zu einem Montag plus Fortsetzung aus dem
+  Checkpoint ergibt dieselben Zeilen wie die Planung am Stück
+* ``optimierung``: die lokale Suche (feste Iterationszahl, damit
+  reproduzierbar) hält alle Regeln ein
+
+Fälle laufen parallel in Prozessen; ein fehlschlagender Fall wird dort
+schrittweise verkleinert (weniger Tage, Abwesenheiten, Pool-Einträge und
+Regeln), solange dieselbe Eigenschaft fehlschlägt. Der verkleinerte Fall hat
+das Format eines Batch-Szenarios (siehe ``batch.py``)::
+
+    python -m schichtplaner.stress -n 2000 -j 8 -o fehler.json
+    python -m schichtplaner.stress --replay fehler.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+from functools import partial
+
+from .engine import DATE_FORMAT, POOL_KEYS, SHIFT_COLUMNS, WEEKDAY_NAMES, create_plan, normalize_config, parse_day
+from .incremental import IncrementalPlan
+from .rules import SHIFT_BITS, RuleSet
+from .solver import LocalSearchSolver
+
+
+PROPERTIES = ("rotation", "inkrementell", "fortsetzung", "optimierung")
+SHRINK_ATTEMPTS = 2000
+FIRST_MONDAY = date(2026, 1, 5)
+
+
+# -------------------- Zufallsfälle --------------------
+
+def random_case(seed, max_employees=30, max_days=120):
+    """Zufälliger Fall (Konfiguration, Startbesetzung, Abwesenheiten) aus ``seed``"""
+    rng = random.Random(seed)
+    names = [f"M{i:03d}" for i in range(rng.randint(2, max_employees))]
+
+    def sample(share, minimum=0):
+        k = min(len(names), max(minimum, round(len(names) * rng.uniform(0, share))))
+        return rng.sample(names, k)
+
+    pool_a = sample(0.8, 1)
+    config = {
+        "pool_vm_alle": pool_a,
+        "pool_vm_teilweise": rng.sample(pool_a, rng.randint(0, len(pool_a))),
+        "pool_vm_support": sample(0.6),
+        "pool_nm_alle": sample(0.8, 1),
+        "pool_freitag_abwesend": sample(0.3),
+    }
+    if rng.random() < 0.5:
+        config["rules"] = random_rules(rng, names)
+
+    start = FIRST_MONDAY + timedelta(weeks=rng.randint(0, 52))
+    days = rng.randint(1, max_days)
+    rules = RuleSet(config)
+    dates = list(rules.plan_dates(start, days))
+    density = rng.choice((0.0, 0.05, 0.2, 0.5))
+    absences = {}
+    for day in dates:
+        if rng.random() < density * 2:
+            absences[day.strftime(DATE_FORMAT)] = rng.sample(names, rng.randint(1, max(1, round(len(names) * density))))
+
+    first_vm = rng.choice(pool_a)
+    first_nm = rng.choice([name for name in config["pool_nm_alle"] if name != first_vm] or config["pool_nm_alle"])
+    first_support = ""
+    if first_vm in config["pool_vm_teilweise"] and config["pool_vm_support"] and rng.random() < 0.5:
+        first_support = rng.choice(config["pool_vm_support"])
+    return {
+        "config": config,
+        "start_date": start.strftime(DATE_FORMAT),
+        "days": days,
+        "first_vm": first_vm,
+        "first_nm": first_nm,
+        "first_support": first_support,
+        "absences": absences,
+    }
+
+
+def random_rules(rng, names):
+    """Zufällige Regeln: Planungstage (immer mit Montag), Dienste je Tag, Feiertage, Sperren, Ruhezeiten"""
+    weekdays = ["Montag"] + [day for day in WEEKDAY_NAMES[1:] if rng.random() < 0.8]
+    day_shifts = {day: [shift for shift in SHIFT_COLUMNS if rng.random() < 0.7]
+                  for day in weekdays if rng.random() < 0.3}
+    holidays = {}
+    for _ in range(rng.randint(0, 6)):
+        day = FIRST_MONDAY + timedelta(days=rng.randint(0, 500))
+        holidays[day.strftime(DATE_FORMAT)] = [shift for shift in SHIFT_COLUMNS if rng.random() < 0.3]
+    exclusions = {}
+    for day in weekdays:
+        if rng.random() < 0.3:
+            exclusions[day] = rng.sample(list(POOL_KEYS) + names, rng.randint(1, 3))
+    rest = {}
+    for before in SHIFT_COLUMNS:
+        blocked = [shift for shift in SHIFT_COLUMNS if rng.random() < 0.4]
+        if blocked:
+            rest[before] = blocked
+    return {
+        "weekdays": weekdays,
+        "day_shifts": day_shifts,
+        "holidays": holidays,
+        "weekday_exclusions": exclusions,
+        "rest": rest,
+    }
+
+
+# -------------------- Prüfung --------------------
+
+def check_plan(case, rows, complete=False):
+    """Regelverstöße einer Planung als Liste ``(regel, tag_nr, meldung)``; leer, wenn alles stimmt.
+
+    ``complete``: zusätzlich prüfen, dass offene Dienste unvermeidbar waren (Rotation).
+    """
+    config = normalize_config(case["config"])
+    rules = RuleSet(config)
+    pools = {column: set(config[key]) for column, key in
+             (("Vormittag", "pool_vm_alle"), ("Nachmittag", "pool_nm_alle"), ("Support", "pool_vm_support"))}
+    pool_b = set(config["pool_vm_teilweise"])
+    absent = {}
+    for day, names in (case.get("absences") or {}).items():
+        absent.setdefault(parse_day(day), set()).update(names)
+    excluded = []
+    for entries in rules.exclusions:
+        names = set()
+        for entry in entries:
+            names.update(config.get(entry) or () if str(entry).startswith("pool_") else (entry,))
+        excluded.append(names)
+    violations = []
+    dates = list(rules.plan_dates(parse_day(case["start_date"]), case["days"]))
+    if [row["Datum"] for row in rows] != [day.strftime(DATE_FORMAT) for day in dates]:
+        return [("datum", None, "Planungstage stimmen nicht mit den Regeln überein")]
+
+    yesterday = {}
+    for tag_nr, (day, row) in enumerate(zip(dates, rows)):
+        active = rules.shifts_on(day)
+        today = {column: row[column] for column in SHIFT_COLUMNS if row[column]}
+        seeded = tag_nr == 0 and active
+        if not seeded:
+            blocked = absent.get(day, set()) | excluded[day.weekday()]
+            for column in SHIFT_COLUMNS:
+                value = row[column]
+                if not active & SHIFT_BITS[column]:
+                    if value != "":
+                        violations.append(("dienste", tag_nr, f"{column} ist heute kein Dienst, aber {value!r}"))
+                elif value == ("" if column != "Support" else None):
+                    # Vormittag/Nachmittag: offen ist None; Support: nicht nötig ist ""
+                    violations.append(("dienste", tag_nr, f"{column} weder besetzt noch offen: {value!r}"))
+            for column, name in today.items():
+                if name not in pools[column]:
+                    violations.append(("pool", tag_nr, f"{name} ({column}) nicht im Pool"))
+                if name in absent.get(day, ()):
+                    violations.append(("abwesend", tag_nr, f"{name} ({column}) ist abwesend"))
+                elif name in excluded[day.weekday()]:
+                    weekday = WEEKDAY_NAMES[day.weekday()]
+                    violations.append(("wochentag", tag_nr, f"{name} ({column}) ist {weekday}s gesperrt"))
+                for before in rules.rest[SHIFT_COLUMNS.index(column)]:
+                    if yesterday.get(SHIFT_COLUMNS[before]) == name:
+                        message = f"{name}: {column} nach {SHIFT_COLUMNS[before]} am Vortag"
+                        violations.append(("ruhezeit", tag_nr, message))
+            if "Support" in today and today.get("Vormittag") not in pool_b:
+                message = f"Support {today['Support']} für {row['Vormittag']!r} (nicht Pool B)"
+                violations.append(("support", tag_nr, message))
+            if len(set(today.values())) < len(today):
+                violations.append(("doppelt", tag_nr, f"Mehrere Dienste für eine Person: {today}"))
+            if complete:
+                violations.extend(_avoidable_gaps(tag_nr, row, active, blocked, yesterday, rules, config, pool_b))
+        yesterday = today
+    return violations
+
+
+def _avoidable_gaps(tag_nr, row, active, blocked, yesterday, rules, config, pool_b):
+    """Offene Dienste, für die jemand aus dem Pool frei gewesen wäre"""
+    def free(column, key, taken):
+        resting = {yesterday.get(SHIFT_COLUMNS[before]) for before in rules.rest[SHIFT_COLUMNS.index(column)]}
+        return [name for name in config[key] if name not in blocked and name not in resting and name not in taken]
+
+    gaps = []
+    vm = row["Vormittag"]
+    if vm is None and free("Vormittag", "pool_vm_alle", ()):
+        gaps.append(("luecke", tag_nr, "Vormittag offen, obwohl Pool A jemanden frei hat"))
+    if vm in pool_b and active & SHIFT_BITS["Support"] and not row["Support"] \
+            and free("Support", "pool_vm_support", (vm,)):
+        gaps.append(("luecke", tag_nr, f"{vm} ohne Support, obwohl Pool C jemanden frei hat"))
+    if row["Nachmittag"] is None and free("Nachmittag", "pool_nm_alle", (vm, row["Support"])):
+        gaps.append(("luecke", tag_nr, "Nachmittag offen, obwohl Pool D jemanden frei hat"))
+    return gaps
+
+
+# -------------------- Eigenschaften --------------------
+
+def _args(case, absences=None):
+    return (case["config"], case["start_date"], case["first_vm"], case["first_nm"], case.get("first_support", ""),
+            case.get("absences") if absences is None else absences)
+
+
+def check_property(name, case, iterations=2000):
+    """Prüft eine Eigenschaft aus ``PROPERTIES``; gibt die Liste der Meldungen zurück (leer: erfüllt)"""
+    days = case["days"]
+    try:
+        if name == "rotation":
+            return check_plan(case, create_plan(*_args(case), days=days), complete=True)
+        if name == "inkrementell":
+            expected = create_plan(*_args(case), days=days)
+            plan = IncrementalPlan(*_args(case, {}), days=days)
+            for day, names in sorted((case.get("absences") or {}).items(), key=lambda item: parse_day(item[0])):
+                plan.add_absence(day, names)
+            return _compare(expected, plan.rows)
+        if name == "fortsetzung":
+            expected = create_plan(*_args(case), days=days)
+            mondays = [nr for nr, row in enumerate(expected) if nr and row["Wochentag"] == "Montag"]
+            if not mondays:
+                return []
+            split = mondays[len(mondays) // 2]
+            first = IncrementalPlan(*_args(case), days=split)
+            rest = create_plan(case["config"], expected[split]["Datum"], "", "", "", case.get("absences"),
+                               days=days - split, checkpoint=first.checkpoint)
+            return _compare(expected, first.rows + rest)
+        if name == "optimierung":
+            solver = LocalSearchSolver(*_args(case), days=days, seed=0)
+            rows = solver.run(time_limit=None, max_iterations=iterations).best_rows()
+            return check_plan(case, rows)
+    except Exception as e:  # jede Ausnahme ist ein Fehlschlag der Eigenschaft
+        return [("ausnahme", None, f"{type(e).__name__}: {e}")]
+    raise ValueError(f"Unbekannte Eigenschaft: {name}")
+
+
+def _compare(expected, rows):
+    if len(expected) != len(rows):
+        return [("zeilen", None, f"{len(rows)} statt {len(expected)} Zeilen")]
+    for tag_nr, (a, b) in enumerate(zip(expected, rows)):
+        if a != b:
+            return [("abweichung", tag_nr, f"erwartet {a}, erhalten {b}")]
+    return []
+
+
+def failing_properties(case, properties=PROPERTIES, iterations=2000):
+    """``{eigenschaft: meldungen}`` aller fehlschlagenden Eigenschaften"""
+    failures = {}
+    for name in properties:
+        found = check_property(name, case, iterations)
+        if found:
+            failures[name] = found
+    return failures
+
+
+# -------------------- Verkleinern --------------------
+
+def _smaller_cases(case):
+    """Kandidaten für einen kleineren Fall, grob vor fein"""
+    days = case["days"]
+    for smaller in (days // 2, days - 1):
+        if 1 <= smaller < days:
+            yield dict(case, days=smaller)
+
+    absences = case.get("absences") or {}
+    if absences:
+        yield dict(case, absences={})
+        keys = list(absences)
+        half = len(keys) // 2
+        if half:
+            yield dict(case, absences={day: absences[day] for day in keys[:half]})
+            yield dict(case, absences={day: absences[day] for day in keys[half:]})
+        for day in keys:
+            yield dict(case, absences={d: names for d, names in absences.items() if d != day})
+        for day in keys:
+            for name in absences[day]:
+                names = [other for other in absences[day] if other != name]
+                yield dict(case, absences=dict(absences, **{day: names}) if names else
+                           {d: n for d, n in absences.items() if d != day})
+
+    config = case["config"]
+    rules = config.get("rules")
+    if rules:
+        yield dict(case, config={key: value for key, value in config.items() if key != "rules"})
+        for key, value in rules.items():
+            if key == "weekdays":
+                for day in value[1:]:
+                    yield _with_rules(case, key, [other for other in value if other != day])
+            elif isinstance(value, dict):
+                for entry in value:
+                    yield _with_rules(case, key, {k: v for k, v in value.items() if k != entry})
+            elif value:
+                yield _with_rules(case, key, [])
+
+    # Startbesetzung bleibt in ihrem Pool
+    seeds = {"pool_vm_alle": case["first_vm"], "pool_nm_alle": case["first_nm"],
+             "pool_vm_support": case.get("first_support")}
+    for key in POOL_KEYS:
+        for name in config.get(key) or ():
+            if name == seeds.get(key):
+                continue
+            yield dict(case, config=dict(config, **{key: [other for other in config[key] if other != name]}))
+    if case.get("first_support"):
+        yield dict(case, first_support="")
+
+
+def _with_rules(case, key, value):
+    config = dict(case["config"])
+    config["rules"] = dict(config["rules"], **{key: value})
+    return dict(case, config=config)
+
+
+def shrink(case, prop, iterations=2000, attempts=SHRINK_ATTEMPTS):
+    """Verkleinert ``case``, solange ``prop`` weiter fehlschlägt; gibt ``(fall, meldungen)`` zurück"""
+    failures = check_property(prop, case, iterations)
+    tried = 0
+    progress = True
+    while progress and tried < attempts:
+        progress = False
+        for candidate in _smaller_cases(case):
+            tried += 1
+            found = check_property(prop, candidate, iterations)
+            if found:
+                case, failures = candidate, found
+                progress = True
+                break
+            if tried >= attempts:
+                break
+    return case, failures
+
+
+# -------------------- Durchlauf --------------------
+
+def run_seed(seed, max_employees=30, max_days=120, properties=PROPERTIES, iterations=2000):
+    """Prüft den Fall zu ``seed``; bei Fehlschlag ``{"seed", "eigenschaft", "meldungen", "fall"}`` (verkleinert)"""
+    case = random_case(seed, max_employees, max_days)
+    failures = failing_properties(case, properties, iterations)
+    if not failures:
+        return None
+    prop = next(iter(failures))
+    case, messages = shrink(case, prop, iterations)
+    return {"seed": seed, "eigenschaft": prop, "meldungen": [list(m) for m in messages[:10]], "fall": case}
+
+
+def run_stress(cases=500, seed=0, workers=None, max_employees=30, max_days=120, properties=PROPERTIES,
+               iterations=2000):
+    """Prüft ``cases`` Zufallsfälle parallel (``workers=1``: im aktuellen Prozess); gibt die Fehlschläge zurück"""
+    run = partial(run_seed, max_employees=max_employees, max_days=max_days, properties=properties,
+                  iterations=iterations)
+    seeds = range(seed, seed + cases)
+    if workers == 1 or cases < 2:
+        results = [run(s) for s in seeds]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, cases // ((workers or os.cpu_count() or 1) * 4))
+            results = list(pool.map(run, seeds, chunksize=chunksize))
+    return [result for result in results if result is not None]
+
+
+def replay(failures, iterations=2000):
+    """Prüft gespeicherte Fälle erneut; gibt die weiterhin fehlschlagenden zurück"""
+    still = []
+    for failure in failures:
+        messages = check_property(failure["eigenschaft"], failure["fall"], iterations)
+        if messages:
+            still.append(dict(failure, meldungen=[list(m) for m in messages[:10]]))
+    return still
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zufallstests der Planungsregeln")
+    parser.add_argument("-n", "--cases", type=int, default=500, help="Anzahl Zufallsfälle (Standard: 500)")
+    parser.add_argument("--seed", type=int, default=0, help="erster Seed (Fall i nutzt seed + i)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--max-employees", type=int, default=30, help="höchstens so viele Mitarbeiter je Fall")
+    parser.add_argument("--max-days", type=int, default=120, help="höchstens so viele Planungstage je Fall")
+    parser.add_argument("-p", "--property", action="append", choices=PROPERTIES,
+                        help="nur diese Eigenschaft prüfen (mehrfach möglich)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterationen der lokalen Suche je Fall")
+    parser.add_argument("--replay", help="gespeicherte Fehlschläge (JSON) erneut prüfen")
+    parser.add_argument("-o", "--output", help="Fehlschläge als JSON speichern (Standard: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, 'r', encoding='utf-8') as f:
+            failures = replay(json.load(f), args.iterations)
+    else:
+        failures = run_stress(args.cases, args.seed, args.workers, args.max_employees, args.max_days,
+                              tuple(args.property or PROPERTIES), args.iterations)
+    for failure in failures:
+        rule, tag_nr, message = failure["meldungen"][0]
+        print(f"Seed {failure['seed']}: {failure['eigenschaft']}/{rule} (Tag {tag_nr}, "
+              f"{failure['fall']['days']} Tage): {message}", file=sys.stderr)
+    print(f"{len(failures)} Fehlschläge", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(failures, f, indent=2, ensure_ascii=False)
+    elif failures:
+        json.dump(failures, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
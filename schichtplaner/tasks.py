@@ -0,0 +1,79 @@
+"""Hintergrundaufgaben (Planung, Export) mit Fortschritt und Abbruch.
+
+Die Arbeit läuft in einem Daemon-Thread; der Aufrufer (z.B. die Tk-GUI über
+``root.after``) fragt ``progress``, ``done``, ``result`` und ``error`` ab. Der
+Thread selbst fasst keine GUI-Objekte an. Abbrechen setzt nur ein Flag: die
+Arbeitsfunktion prüft es über ``should_stop`` und bricht mit ``Cancelled`` ab.
+"""
+
+import threading
+
+
+class Cancelled(Exception):
+    """Die Aufgabe wurde über ``BackgroundTask.cancel`` abgebrochen"""
+
+
+class BackgroundTask:
+    """Führt ``func(progress, should_stop)`` in einem eigenen Thread aus.
+
+    ``progress(anteil)`` meldet den Fortschritt (0.0 bis 1.0), ``should_stop()``
+    ist True, sobald ``cancel`` aufgerufen wurde. ``token`` ist frei wählbar
+    (z.B. ein Schnappschuss der Eingaben) und dient dem Aufrufer dazu,
+    veraltete Ergebnisse zu erkennen.
+    """
+
+    def __init__(self, func, token=None):
+        self.func = func
+        self.token = token
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.func(self._report, self._cancel.is_set)
+            if self._cancel.is_set():
+                raise Cancelled()
+        except BaseException as e:  # wird im Aufrufer-Thread ausgewertet
+            self.error = e
+        else:
+            self.progress = 1.0
+        finally:
+            self._done.set()
+
+    def _report(self, fraction):
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+
+    def cancel(self):
+        """Fordert den Abbruch an (wirkt beim nächsten ``should_stop``)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wartet auf das Ende der Aufgabe; True, falls sie beendet ist"""
+        return self._done.wait(timeout)
+
+
+def track(items, total, progress, should_stop, every=64):
+    """Reicht ``items`` durch, meldet dabei Fortschritt und bricht bei Abbruch ab"""
+    total = max(total, 1)
+    for nr, item in enumerate(items):
+        if nr % every == 0:
+            if should_stop():
+                raise Cancelled()
+            progress(nr / total)
+        yield item
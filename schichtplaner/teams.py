@@ -0,0 +1,233 @@
+"""Planung mehrerer Teams/Standorte mit gemeinsam genutztem Personal.
+
+Teams, die keine Mitarbeiter teilen, sind unabhängig und werden parallel in
+eigenen Prozessen geplant (wie im Stapelbetrieb). Teams mit gemeinsamen
+Mitarbeitern (auch über Ketten: A teilt mit B, B mit C) bilden eine
+gekoppelte Gruppe und werden gemeinsam geplant: Tag für Tag rotiert jedes
+Team der Gruppe, wobei bereits in einem anderen Team eingeteilte Mitarbeiter
+für denselben Dienst gesperrt sind:
+
+* Vormittag/Support: gesperrt, wer heute in einem anderen Team Vormittag oder
+  Support hat
+* Nachmittag: gesperrt, wer heute in einem anderen Team Nachmittag hat
+* Ruhezeiten: die Ruhezeiten aus den Regeln des jeweiligen Teams gelten auch
+  für Dienste, die am Vortag (dem Kalendertag davor) in einem anderen Team
+  lagen; mit den Standardregeln also kein Vormittag/Support nach einem
+  Nachmittag im anderen Team
+
+Die Laufzeit wächst damit nur mit der größten gekoppelten Gruppe. Gekoppelte
+Teams werden immer per Rotation geplant (auch wenn für unabhängige Teams die
+lokale Suche gewählt ist). Die vorgegebene Besetzung des 1. Tages wird nicht
+verändert; ist dort jemand schon in einem anderen Team eingeteilt (oder durch
+dessen Ruhezeit gesperrt), bricht die Planung mit ``PlanningError`` ab. Ohne
+Vorgabe wählt ``assign_seeds`` je Team die ersten noch freien Einträge. Haben die Teams
+unterschiedliche Planungstage (Regeln), läuft die Gruppe Kalendertag für
+Kalendertag; es rotieren jeweils die Teams, die an dem Tag planen.
+"""
+
+import os
+
+from .engine import PlanningError, Rotation, normalize_config, parse_date
+from .rules import SHIFT_NAMES, RuleSet
+
+
+SHIFT_POOLS = ("pool_vm_alle", "pool_vm_support", "pool_nm_alle")
+AM_COLUMNS = ("Vormittag", "Support")
+
+
+def team_staff(config):
+    """Alle Mitarbeiter, die in einem Team Dienste übernehmen können"""
+    config = normalize_config(config)
+    return {name for key in SHIFT_POOLS for name in config[key]}
+
+
+def coupled_groups(teams):
+    """Teilt ``{team: config}`` in Gruppen von Teams mit gemeinsamen Mitarbeitern (Union-Find).
+
+    Reihenfolge der Gruppen und der Teams darin folgt der Reihenfolge in ``teams``.
+    """
+    names = list(teams)
+    parent = list(range(len(names)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}
+    for nr, name in enumerate(names):
+        for employee in team_staff(teams[name]):
+            other = owner.setdefault(employee, nr)
+            if other != nr:
+                a, b = find(nr), find(other)
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+    groups = {}
+    for nr, name in enumerate(names):
+        groups.setdefault(find(nr), []).append(name)
+    return list(groups.values())
+
+
+def default_seeds(config, taken_am=(), taken_pm=()):
+    """Startbesetzung des 1. Tages: jeweils erster Eintrag aus Pool A und Pool D.
+
+    ``taken_am``/``taken_pm``: am 1. Tag schon in anderen Teams vormittags bzw.
+    nachmittags eingeteilt und daher übersprungen (sofern jemand anderes frei ist).
+    """
+    config = normalize_config(config)
+    pool_a = [name for name in config["pool_vm_alle"] if name not in taken_am] or config["pool_vm_alle"]
+    pool_d = [name for name in config["pool_nm_alle"] if name not in taken_pm] or config["pool_nm_alle"]
+    return (pool_a[0] if pool_a else ""), (pool_d[0] if pool_d else ""), ""
+
+
+def assign_seeds(teams, first_vm="", first_nm="", first_support=""):
+    """Startbesetzung je Team ``{team: (vm, nm, support)}``.
+
+    Vorgaben gelten für alle Teams; sonst erhält jedes Team (in der Reihenfolge
+    von ``teams``) die ersten Einträge aus Pool A bzw. Pool D, die am 1. Tag
+    noch in keinem anderen Team eingeteilt sind.
+    """
+    seeds = {}
+    taken_am, taken_pm = set(), set()
+    for name, config in teams.items():
+        default_vm, default_nm, _ = default_seeds(config, taken_am, taken_pm)
+        vm, nm = first_vm or default_vm, first_nm or default_nm
+        seeds[name] = (vm, nm, first_support)
+        taken_am.update(person for person in (vm, first_support) if person)
+        taken_pm.add(nm)
+    return seeds
+
+
+def plan_group(group, start_date, absences=None, days=12, weeks=None):
+    """Plant eine gekoppelte Gruppe gemeinsam.
+
+    ``group`` ist eine Liste ``(team, config, (first_vm, first_nm, first_support))``.
+    Mit ``weeks`` erhält jedes Team ``weeks`` Wochen nach seinen Planungstagen
+    (statt ``days`` Planungstage). Gibt ``{team: zeilen}`` zurück.
+    """
+    rotations = []
+    for name, config, (first_vm, first_nm, first_support) in group:
+        team_days = days if weeks is None else weeks * RuleSet(config).days_per_week
+        rotation = Rotation(config, start_date, first_vm, first_nm, first_support, absences, days=team_days)
+        rotations.append((name, rotation, rotation.run()))
+    results = {name: [] for name, _, _ in rotations}
+    dates = sorted({day for _, rotation, _ in rotations for day in rotation.day_keys})
+    yesterday, yesterday_rows = None, []
+    for tag_nr, day in enumerate(dates):
+        # Ruhezeiten gelten nur zum direkt vorhergehenden Kalendertag
+        previous = yesterday_rows if yesterday is not None and (day - yesterday).days == 1 else []
+        today_rows = []
+        busy_am = set()
+        busy_pm = set()
+        # Wechselnde Reihenfolge, damit nicht immer dasselbe Team zuerst wählt
+        offset = tag_nr % len(rotations)
+        for name, rotation, steps in rotations[offset:] + rotations[:offset]:
+            if day not in rotation.day_index:
+                continue  # Team plant an diesem Tag nicht
+            mask_am = rotation.index.mask(busy_am)
+            mask_pm = rotation.index.mask(busy_pm)
+            if mask_am:
+                rotation.busy_am[day] = mask_am
+            if mask_pm:
+                rotation.busy_pm[day] = mask_pm
+            if previous:
+                rest = rest_masks(rotation, name, previous)
+                if any(rest):
+                    rotation.busy_rest[day] = rest
+            row, _ = next(steps)
+            if rotation.seeded and not results[name]:
+                _check_seed(name, rotation, row, busy_am, busy_pm)
+            results[name].append(row)
+            today_rows.append((name, row))
+            busy_am.update(row[c] for c in AM_COLUMNS if row[c])
+            if row["Nachmittag"]:
+                busy_pm.add(row["Nachmittag"])
+        yesterday, yesterday_rows = day, today_rows
+    return results
+
+
+def _check_seed(team, rotation, row, busy_am, busy_pm):
+    """Die vorgegebene Besetzung des 1. Tages darf niemanden enthalten, der in einem anderen Team eingeteilt ist"""
+    clashes = [f"{row[column]} ({column})" for column in AM_COLUMNS if row[column] in busy_am]
+    if row["Nachmittag"] in busy_pm:
+        clashes.append(f"{row['Nachmittag']} (Nachmittag)")
+    rest = rotation.busy_rest.get(rotation.day_keys[0])
+    if rest:
+        for column, blocked in zip(SHIFT_NAMES, rest):
+            if row[column] and rotation.index.mask((row[column],)) & blocked:
+                clashes.append(f"{row[column]} ({column}, Ruhezeit nach Dienst im anderen Team)")
+    if clashes:
+        raise PlanningError(f"Startbesetzung von {team} am {row['Datum']} ist schon in einem anderen Team "
+                            f"eingeteilt: {', '.join(clashes)}")
+
+
+def rest_masks(rotation, team, rows):
+    """Sperren je Dienst (VM, NM, Support) nach den Ruhezeiten von ``rotation`` für die Vortagszeilen anderer Teams.
+
+    ``rows`` ist eine Liste ``(team, zeile)``; die eigenen Zeilen prüft die Rotation selbst.
+    """
+    masks = []
+    for sources in rotation.rules.rest:
+        names = [row[SHIFT_NAMES[i]] for other, row in rows if other != team for i in sources]
+        masks.append(rotation.index.mask(name for name in names if name))
+    return tuple(masks)
+
+
+def _plan_job(job):
+    """Arbeitspaket für den Prozess-Pool: eine Gruppe bzw. ein einzelnes Team"""
+    group, start_date, absences, days, weeks, solver, time_limit = job
+    if len(group) == 1 and solver == "optimierung":
+        from .solver import optimize_plan
+
+        name, config, seeds = group[0]
+        if weeks is not None:
+            days = weeks * RuleSet(config).days_per_week
+        return {name: optimize_plan(config, start_date, *seeds, absences, days=days, time_limit=time_limit)}
+    return plan_group(group, start_date, absences, days, weeks)
+
+
+def plan_teams(teams, start_date, absences=None, days=12, seeds=None, solver="rotation", time_limit=2.0,
+               workers=None, weeks=None):
+    """Plant alle Teams ``{team: config}`` ohne Doppelbelegung gemeinsam genutzter Mitarbeiter.
+
+    ``seeds`` ist optional ``{team: (first_vm, first_nm, first_support)}``, sonst
+    ``assign_seeds``. Unabhängige Gruppen laufen parallel (``workers=1``: im
+    aktuellen Prozess). ``weeks`` ersetzt ``days`` durch Wochen nach den
+    Planungstagen des jeweiligen Teams. Gibt ``{team: zeilen}`` in der
+    Reihenfolge von ``teams`` zurück.
+    """
+    start_date = parse_date(start_date)
+    seeds = dict(assign_seeds(teams), **(seeds or {}))
+    jobs = [
+        ([(name, teams[name], seeds[name]) for name in group],
+         start_date, absences, days, weeks, solver, time_limit)
+        for group in coupled_groups(teams)
+    ]
+    if workers == 1 or len(jobs) < 2:
+        planned = [_plan_job(job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(len(jobs), workers or os.cpu_count() or 1)) as pool:
+            planned = list(pool.map(_plan_job, jobs))
+    results = {}
+    for part in planned:
+        results.update(part)
+    return {name: results[name] for name in teams}
+
+
+def double_bookings(results):
+    """Doppelbelegungen über Teams hinweg: Liste ``(datum, dienst, mitarbeiter, [teams])``.
+
+    Vormittag und Support gelten als derselbe Dienst (beide vormittags).
+    """
+    booked = {}
+    for team, rows in results.items():
+        for row in rows:
+            for column in ("Vormittag", "Support", "Nachmittag"):
+                employee = row[column]
+                if employee:
+                    shift = "Nachmittag" if column == "Nachmittag" else "Vormittag"
+                    booked.setdefault((row["Datum"], shift, employee), []).append(team)
+    return [(day, shift, employee, teams) for (day, shift, employee), teams in booked.items() if len(teams) > 1]
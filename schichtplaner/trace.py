@@ -0,0 +1,154 @@
+"""Optionale Instrumentierung der Planung (Kandidatensuche, Ablehnungsgründe, Phasenzeiten).
+
+Ein ``PlanTrace`` wird an ``Rotation``/``create_plan``/``IncrementalPlan``
+übergeben (``trace=...``) und zeichnet je Planungstag und Dienst auf:
+
+* ``geprueft``: untersuchte Kandidaten ab der Pool-Position (inklusive des
+  gewählten Mitarbeiters)
+* ``abgelehnt``: übersprungene Kandidaten je Grund (erster zutreffender Grund
+  in der Reihenfolge von ``REASONS``)
+* ``start``/``gewaehlt``/``schritte``: Pool-Position vor der Suche, gewählte
+  Position (``None`` = Dienst offen) und Vorrücken des Zeigers
+
+Dazu kommen Phasenzeiten (``with trace.phase("planung"): ...``). Ohne
+``trace`` prüft die Planungsschleife nur ``trace is not None`` je Dienst; die
+Gründe werden erst beim Aufzeichnen aus den Sperr-Bitsets bestimmt, die die
+Rotation ohnehin berechnet.
+
+``write_json`` schreibt Zusammenfassung, Phasen und Tage als JSON;
+``write_trace`` schreibt das Trace-Event-Format von Chrome (``chrome://tracing``,
+Perfetto), mit Phasen als Zeitspannen und je Tag einem Ereignis.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+REASONS = ("abwesend", "wochentag_regel", "ruhezeit", "heute_eingeteilt", "anderes_team")
+
+
+def timed(trace, name):
+    """``trace.phase(name)`` bzw. ohne ``trace`` ein leerer Kontext"""
+    return trace.phase(name) if trace is not None else nullcontext()
+
+
+class PlanTrace:
+    """Sammelt Messwerte einer Planung (Tage aus einem Thread, Phasen aus beliebigen Threads)"""
+
+    def __init__(self):
+        self.days = []          # [{"datum": ..., "dienste": {spalte: {...}}}]
+        self.phases = []        # [(name, start, dauer, thread)]
+        self._day_times = []    # Beginn je Tag (Sekunden ab Erzeugung)
+        self._origin = time.perf_counter()
+        self._day = None
+        self._lock = threading.Lock()
+
+    # -------------------- Aufzeichnen --------------------
+
+    @contextmanager
+    def phase(self, name):
+        """Misst die Dauer eines Abschnitts (z.B. "planung", "anzeige", "export")"""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self.phases.append((name, started - self._origin, ended - started, threading.get_ident()))
+
+    def begin_day(self, day):
+        """Beginnt die Aufzeichnung eines Planungstags (``day`` als date)"""
+        self._day = {"datum": day.isoformat(), "dienste": {}}
+        self.days.append(self._day)
+        self._day_times.append(time.perf_counter() - self._origin)
+
+    def scan(self, shift, pool, start, pos, reasons):
+        """Zeichnet eine Kandidatensuche auf.
+
+        ``pool`` ist der ``IndexedPool``, ``start`` die Position vor der Suche,
+        ``pos`` die gefundene Position (-1: keiner frei). ``reasons`` ist eine
+        Folge ``(grund, bitset)``; ein übersprungener Kandidat zählt für den
+        ersten Grund, dessen Bitset ihn enthält.
+        """
+        size = pool.size
+        rejected = dict.fromkeys(REASONS, 0)
+        skipped = size if pos < 0 else (pos - start) % size
+        bits = pool.bits
+        for i in range(skipped):
+            bit = bits[(start + i) % size]
+            for reason, mask in reasons:
+                if mask & bit:
+                    rejected[reason] += 1
+                    break
+        self._day["dienste"][shift] = {
+            "geprueft": skipped + (pos >= 0),
+            "abgelehnt": {reason: n for reason, n in rejected.items() if n},
+            "start": start,
+            "gewaehlt": pos if pos >= 0 else None,
+            "schritte": skipped + 1 if pos >= 0 else 0,
+        }
+
+    # -------------------- Auswertung --------------------
+
+    def summary(self):
+        """Summen über alle Tage: geprüfte Kandidaten, Ablehnungen je Grund, offene Dienste"""
+        scanned = 0
+        rejected = dict.fromkeys(REASONS, 0)
+        open_shifts = {}
+        for day in self.days:
+            for shift, record in day["dienste"].items():
+                scanned += record["geprueft"]
+                for reason, n in record["abgelehnt"].items():
+                    rejected[reason] += n
+                if record["gewaehlt"] is None:
+                    open_shifts[shift] = open_shifts.get(shift, 0) + 1
+        phases = {}
+        for name, _, duration, _ in self.phases:
+            phases[name] = phases.get(name, 0.0) + duration
+        return {
+            "tage": len(self.days),
+            "geprueft": scanned,
+            "abgelehnt": rejected,
+            "offen": open_shifts,
+            "phasen_s": {name: round(seconds, 6) for name, seconds in phases.items()},
+        }
+
+    def to_dict(self):
+        return {
+            "zusammenfassung": self.summary(),
+            "phasen": [{"name": name, "start_s": round(start, 6), "dauer_s": round(duration, 6)}
+                       for name, start, duration, _ in self.phases],
+            "tage": self.days,
+        }
+
+    def write_json(self, target):
+        """Schreibt alle Messwerte als JSON (Pfad oder Dateiobjekt)"""
+        if hasattr(target, "write"):
+            json.dump(self.to_dict(), target, ensure_ascii=False, indent=1)
+            return
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+    def trace_events(self):
+        """Ereignisse im Chrome-Trace-Format (Zeiten in Mikrosekunden)"""
+        events = [{"name": name, "ph": "X", "ts": round(start * 1e6), "dur": round(duration * 1e6),
+                   "pid": 1, "tid": tid} for name, start, duration, tid in self.phases]
+        for day, started in zip(self.days, self._day_times):
+            args = {shift: record["geprueft"] for shift, record in day["dienste"].items()}
+            events.append({"name": day["datum"], "ph": "i", "s": "t", "ts": round(started * 1e6), "pid": 1,
+                           "tid": 0, "args": args})
+        return events
+
+    def write_trace(self, target):
+        """Schreibt eine Trace-Datei (``.trace``/``.json``) für chrome://tracing bzw. Perfetto"""
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+    def write(self, target):
+        """Schreibt nach Dateiendung: ``.trace`` als Trace-Datei, sonst JSON"""
+        if str(target).lower().endswith(".trace"):
+            self.write_trace(target)
+        else:
+            self.write_json(target)
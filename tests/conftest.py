@@ -0,0 +1,16 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def shift_config():
+    """Die mitgelieferte Pool-Konfiguration (``shift_config.json``)"""
+    with open(ROOT / "shift_config.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
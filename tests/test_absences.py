@@ -0,0 +1,94 @@
+"""Import von Abwesenheiten aus CSV, iCalendar und JSON (``absences.py``)."""
+
+import json
+from datetime import date
+
+import pytest
+
+from schichtplaner.absences import load_absence_file, parse_import_date, read_csv, read_ics, read_json
+from schichtplaner.engine import PlanningError
+
+
+def test_parse_import_date():
+    assert parse_import_date("07.01.2026") == date(2026, 1, 7)
+    assert parse_import_date("2026-01-07") == date(2026, 1, 7)
+    assert parse_import_date("20260107T120000Z") == date(2026, 1, 7)
+    with pytest.raises(PlanningError):
+        parse_import_date("31.02.2026")
+
+
+def test_read_csv_with_header_and_range():
+    lines = ["Kürzel;Von;Bis", "MH;07.01.2026;09.01.2026", "IL;2026-01-08;", ";08.01.2026;", "MH;08.01.2026;"]
+    assert read_csv(lines) == {date(2026, 1, 7): {"MH"}, date(2026, 1, 8): {"MH", "IL"}, date(2026, 1, 9): {"MH"}}
+
+
+def test_read_csv_without_header():
+    assert read_csv(["RR,05.01.2026,06.01.2026"]) == {date(2026, 1, 5): {"RR"}, date(2026, 1, 6): {"RR"}}
+
+
+def test_read_csv_unknown_employee():
+    with pytest.raises(PlanningError, match="Unbekannte Kürzel in den Abwesenheiten: XX"):
+        read_csv(["Mitarbeiter,Datum", "XX,05.01.2026", "MH,05.01.2026"], employees={"MH"})
+
+
+def test_read_csv_span_too_long():
+    with pytest.raises(PlanningError, match="zu lang"):
+        read_csv(["MH;01.01.2026;01.01.2062"])
+
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Urlaub MH
+DTSTART;VALUE=DATE:20260107
+DTEND;VALUE=DATE:20260109
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Fortbildung
+ATTENDEE;CN="IL":mailto:il@example.org
+DTSTART:20260112T080000
+DTEND:20260112T160000
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Arzttermin
+DESCRIPTION:ohne bekanntes Kürzel
+DTSTART;VALUE=DATE:20260113
+END:VEVENT
+END:VCALENDAR
+""".splitlines(keepends=True)
+
+
+def test_read_ics_all_day_end_is_exclusive():
+    absences = read_ics(ICS, employees={"MH", "IL"})
+    assert absences == {date(2026, 1, 7): {"MH"}, date(2026, 1, 8): {"MH"}, date(2026, 1, 12): {"IL"}}
+
+
+def test_read_ics_folded_summary_without_employees():
+    lines = ["BEGIN:VEVENT\r\n", "SUMMARY:R\r\n", " R krank\r\n", "DTSTART:20260105\r\n", "END:VEVENT\r\n"]
+    assert read_ics(lines) == {date(2026, 1, 5): {"RR"}}
+
+
+def test_read_json():
+    data = {"07.01.2026": "MH", "2026-01-08": [" IL ", "MH"]}
+    assert read_json(data) == {date(2026, 1, 7): {"MH"}, date(2026, 1, 8): {"IL", "MH"}}
+    with pytest.raises(PlanningError, match="Liste von Kürzeln"):
+        read_json({"07.01.2026": [1]})
+    with pytest.raises(PlanningError, match="Unbekannte Kürzel"):
+        read_json({"07.01.2026": ["XX"]}, employees={"MH"})
+
+
+def test_load_absence_file_by_extension(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps({"07.01.2026": ["MH"]}), encoding="utf-8")
+    (tmp_path / "b.csv").write_text("\ufeffMitarbeiter;Datum\nIL;07.01.2026\n", encoding="utf-8")
+    (tmp_path / "c.ics").write_text("".join(ICS), encoding="utf-8")
+    absences = {}
+    for name in ("a.json", "b.csv", "c.ics"):
+        load_absence_file(str(tmp_path / name), absences, employees={"MH", "IL"})
+    assert absences[date(2026, 1, 7)] == {"MH", "IL"}
+    assert absences[date(2026, 1, 12)] == {"IL"} and date(2026, 1, 13) not in absences
+
+    (tmp_path / "d.xml").write_text("", encoding="utf-8")
+    with pytest.raises(PlanningError, match="Unbekanntes Dateiformat"):
+        load_absence_file(str(tmp_path / "d.xml"))
+    (tmp_path / "e.json").write_text("[]", encoding="utf-8")
+    with pytest.raises(PlanningError, match="erwartet wird ein Objekt"):
+        load_absence_file(str(tmp_path / "e.json"))
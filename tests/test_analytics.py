@@ -0,0 +1,61 @@
+"""Auswertung (``analytics.analyze``) und Kennzahlen (``metrics.plan_stats``)."""
+
+from schichtplaner.analytics import analyze, report_table
+from schichtplaner.metrics import plan_stats
+
+
+CONFIG = {"pool_vm_alle": ["A", "B"], "pool_vm_teilweise": ["B"], "pool_vm_support": ["C"],
+          "pool_nm_alle": ["D", "A"], "pool_freitag_abwesend": []}
+
+
+def row(day, weekday, vm, nm, support):
+    return {"Datum": day, "Wochentag": weekday, "Vormittag": vm, "Nachmittag": nm, "Support": support}
+
+
+# Donnerstag fehlt (Lücke in der Historie), Samstag ohne Dienste
+ROWS = [
+    row("05.01.2026", "Montag", "A", "D", ""),
+    row("06.01.2026", "Dienstag", "D", None, ""),   # D: Nachmittag am Vortag, dann Vormittag
+    row("07.01.2026", "Mittwoch", "B", "A", None),  # Pool B ohne Support
+    row("09.01.2026", "Freitag", "D", "A", ""),
+    row("10.01.2026", "Samstag", "", "", ""),
+]
+
+
+def by_name(report):
+    return {employee["Mitarbeiter"]: employee for employee in report["mitarbeiter"]}
+
+
+def test_analyze():
+    report = analyze(ROWS, CONFIG)
+    assert (report["von"], report["bis"], report["tage"], report["arbeitstage"]) == ("2026-01-05", "2026-01-10", 5, 4)
+    assert report["offen"] == {"Vormittag": 0, "Nachmittag": 1, "Support": 1}
+    assert report["ruhezeit_verstoesse"] == 1
+    employees = by_name(report)
+    assert list(employees) == ["A", "B", "C", "D"]
+    assert employees["D"] == {"Mitarbeiter": "D", "Vormittag": 2, "Nachmittag": 1, "Support": 0, "Gesamt": 3,
+                              "Serie max": 2, "Ruhezeit-Verstöße": 1, "Ohne Support": 0}
+    # Mittwoch und Freitag sind durch den fehlenden Donnerstag getrennt
+    assert employees["A"]["Serie max"] == 1 and employees["A"]["Ruhezeit-Verstöße"] == 0
+    assert employees["B"]["Ohne Support"] == 1
+
+
+def test_analyze_empty():
+    report = analyze([], CONFIG)
+    assert report["von"] is None and report["tage"] == 0
+    assert next(report_table(report))[0] == "Mitarbeiter"
+
+
+def test_plan_stats_matches_analyze():
+    stats = plan_stats(ROWS, CONFIG)
+    assert stats["dienste"] == {"A": 3, "B": 1, "C": 0, "D": 3}
+    assert (stats["vm_offen"], stats["nm_offen"], stats["support_offen"], stats["luecken"]) == (0, 1, 1, 2)
+    assert (stats["tage"], stats["arbeitstage"]) == (5, 4)
+    assert (stats["dienste_min"], stats["dienste_max"], stats["dienste_spannweite"]) == (0, 3, 3)
+    assert stats["dienste_stdabw"] == 1.299
+
+
+def test_plan_stats_counts_unknown_employees(shift_config):
+    rows = [row("05.01.2026", "Montag", "ZZ", None, "")]
+    stats = plan_stats(rows, shift_config)
+    assert stats["dienste"]["ZZ"] == 1 and stats["nm_offen"] == 1
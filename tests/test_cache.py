@@ -0,0 +1,80 @@
+"""Zwischenspeicher für Planungen und Exporte (``cache.py``)."""
+
+import os
+
+from schichtplaner import cache as cache_module
+from schichtplaner.cache import PlanCache, plan_key, rows_key
+
+
+def test_plan_key_normalizes_inputs(shift_config):
+    a = plan_key(shift_config, "05.01.2026", "MH", "IL", "", {"07.01.2026": ["RI", "RR"]})
+    absences = {"07.01.2026": ["RR", "RI", "RI"], "08.01.2026": []}
+    b = plan_key(dict(shift_config), "5.1.2026", " MH", "IL ", None, absences)
+    assert a == b
+    assert a != plan_key(shift_config, "05.01.2026", "MH", "IL", "", {"07.01.2026": ["RI"]})
+
+
+def test_rows_key_depends_on_content_and_format():
+    rows = [{"Datum": "05.01.2026", "Vormittag": "MH", "Nachmittag": "IL", "Support": ""}]
+    assert rows_key(rows, "csv") == rows_key([dict(rows[0])], "csv")
+    assert rows_key(rows, "csv") != rows_key(rows, "xlsx")
+
+
+def test_lru_in_memory():
+    cache = PlanCache(maxsize=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_entries_survive_in_directory(tmp_path):
+    PlanCache(directory=tmp_path).put("key", {"rows": []})
+    assert PlanCache(directory=tmp_path).plan("key", lambda: {"rows": ["neu"]}) == {"rows": []}
+    data = PlanCache(directory=tmp_path).export_bytes([], "csv", lambda rows: b"Datum\r\n")
+    assert PlanCache(directory=tmp_path).export_bytes([], "csv", lambda rows: b"anders") == data
+
+
+def test_prune_keeps_max_files(tmp_path):
+    cache = PlanCache(maxsize=1, directory=tmp_path, max_files=5)
+    for i in range(40):
+        cache.put(f"k{i:02d}", {"i": i})
+    assert sorted(os.listdir(tmp_path)) == [f"k{i}.json" for i in range(35, 40)]
+
+
+def test_prune_skips_files_deleted_by_another_process(tmp_path, monkeypatch):
+    cache = PlanCache(maxsize=1, directory=tmp_path, max_files=2)
+    for i in range(4):
+        (tmp_path / f"k{i}.json").write_text("{}")
+    real_scandir = os.scandir
+
+    def scandir_then_vanish(path):
+        # Ein anderer Prozess löscht k0 nach dem Auflisten, aber vor stat()
+        entries = list(real_scandir(path))
+        os.remove(tmp_path / "k0.json")
+        return _Entries(entries)
+
+    monkeypatch.setattr(cache_module.os, "scandir", scandir_then_vanish)
+    cache._prune()
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_directory_is_not_scanned_on_every_write(tmp_path, monkeypatch):
+    cache = PlanCache(maxsize=1, directory=tmp_path, max_files=1000)
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(cache_module.os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+    for i in range(cache_module.PRUNE_EVERY):
+        cache.put(f"k{i}", {})
+    assert len(scans) == 2    # erste Zählung und die periodische Prüfung
+
+
+class _Entries(list):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,37 @@
+"""Kommandozeile (``cli.py``) ohne Unterprozess."""
+
+import json
+
+from schichtplaner.cli import main
+
+
+def write_team(path, vm, nm):
+    config = {"pool_vm_alle": vm, "pool_vm_teilweise": [], "pool_vm_support": [], "pool_nm_alle": nm,
+              "pool_freitag_abwesend": []}
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return str(path)
+
+
+def test_plan_single_team_json(tmp_path, shift_config, capsys):
+    path = tmp_path / "team.json"
+    path.write_text(json.dumps(shift_config), encoding="utf-8")
+    assert main(["plan", "-c", str(path), "-s", "05.01.2026", "-w", "1", "-f", "json", "-o", "-"]) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert rows[0]["Datum"] == "05.01.2026"
+
+
+def test_plan_teams_checks_seeds_per_team(tmp_path, capsys):
+    a = write_team(tmp_path / "a.json", ["MH", "RI"], ["IL", "RR"])
+    b = write_team(tmp_path / "b.json", ["JB", "ES"], ["AN", "FA"])
+    assert main(["plan", "-c", a, "-c", b, "-s", "05.01.2026", "--vm", "MH", "-f", "json", "-o", "-"]) == 1
+    err = capsys.readouterr().err
+    assert "b:" in err and "MH steht nicht in" in err and "a:" not in err
+
+
+def test_plan_teams_json(tmp_path, capsys):
+    a = write_team(tmp_path / "a.json", ["MH", "RI"], ["IL", "RR"])
+    b = write_team(tmp_path / "b.json", ["MH", "ES"], ["IL", "FA"])
+    assert main(["plan", "-c", a, "-c", b, "-s", "05.01.2026", "-w", "2", "-f", "json", "-o", "-"]) == 0
+    planned = json.loads(capsys.readouterr().out)
+    assert sorted(planned) == ["a", "b"]
+    assert planned["a"][0]["Vormittag"] == "MH" and planned["b"][0]["Vormittag"] == "ES"
@@ -0,0 +1,95 @@
+"""Regressionstests der Rotation (``engine.Rotation``) mit den Standardregeln."""
+
+from datetime import timedelta
+
+import pytest
+
+from schichtplaner.engine import DATE_FORMAT, PlanningError, Rotation, create_plan, parse_day
+
+
+# Zwei Wochen mit shift_config.json, Startbesetzung MH/IL/FA, RI und RR am 07.01. abwesend
+EXPECTED = [
+    ("05.01.2026", "Montag", "MH", "IL", "FA"),
+    ("06.01.2026", "Dienstag", "RI", "RR", "JB"),
+    ("07.01.2026", "Mittwoch", "TR", "FA", ""),
+    ("08.01.2026", "Donnerstag", "JB", "ES", ""),
+    ("09.01.2026", "Freitag", "FA", "JB", ""),
+    ("10.01.2026", "Samstag", "", "", ""),
+    ("12.01.2026", "Montag", "RR", "AN", ""),
+    ("13.01.2026", "Dienstag", "IL", "TR", ""),
+    ("14.01.2026", "Mittwoch", "MH", "RI", "AN"),
+    ("15.01.2026", "Donnerstag", "TR", "MH", ""),
+    ("16.01.2026", "Freitag", "JB", "IL", ""),
+    ("17.01.2026", "Samstag", "", "", ""),
+]
+
+
+def as_tuples(rows):
+    return [(row["Datum"], row["Wochentag"], row["Vormittag"], row["Nachmittag"], row["Support"]) for row in rows]
+
+
+def test_two_weeks_unchanged(shift_config):
+    rows = create_plan(shift_config, "05.01.2026", "MH", "IL", "FA", {"07.01.2026": ["RI", "RR"]}, days=12)
+    assert as_tuples(rows) == EXPECTED
+
+
+def test_rotation_run_matches_create_plan(shift_config):
+    absences = {"07.01.2026": ["RI", "RR"]}
+    rotation = Rotation(shift_config, "05.01.2026", "MH", "IL", "FA", absences, days=12)
+    assert as_tuples(row for row, _ in rotation.run()) == EXPECTED
+
+
+def test_baseline_rules_hold_for_a_year(shift_config):
+    absences = {"03.02.2026": ["MH", "IL"], "18.03.2026": ["TR"], "05.06.2026": ["FA", "RR", "JB"]}
+    rows = create_plan(shift_config, "05.01.2026", "MH", "IL", "", absences, days=6 * 52)
+    pool_b = set(shift_config["pool_vm_teilweise"])
+    yesterday_nm = None
+    for row in rows[1:]:
+        vm, nm, support = row["Vormittag"], row["Nachmittag"], row["Support"]
+        if row["Wochentag"] == "Samstag":
+            assert (vm, nm, support) == ("", "", "")
+            yesterday_nm = None
+            continue
+        assert vm in shift_config["pool_vm_alle"]
+        assert nm in shift_config["pool_nm_alle"]
+        assigned = [name for name in (vm, nm, support) if name]
+        assert len(set(assigned)) == len(assigned)
+        assert yesterday_nm not in (vm, support)
+        assert not {vm, nm, support} & set(absences.get(row["Datum"], ()))
+        if row["Wochentag"] == "Freitag":
+            assert not {vm, nm, support} & set(shift_config["pool_freitag_abwesend"])
+        if vm in pool_b:
+            assert support in shift_config["pool_vm_support"]
+        else:
+            assert support == ""
+        yesterday_nm = nm
+
+
+def test_resume_from_state(shift_config):
+    rotation = Rotation(shift_config, "05.01.2026", "MH", "IL", "", days=60)
+    steps = list(rotation.run())
+    rows = [row for row, _ in steps]
+    resumed = [row for row, _ in rotation.run(start=25, state=steps[24][1])]
+    assert rows[25:] == resumed
+
+
+def test_continue_from_checkpoint(shift_config):
+    rotation = Rotation(shift_config, "05.01.2026", "MH", "IL", "", days=24)
+    rows, state = [], None
+    for row, state in rotation.run():
+        rows.append(row)
+    start = parse_day(rows[-1]["Datum"]) + timedelta(days=2)
+    continued = create_plan(shift_config, start.strftime(DATE_FORMAT), "", "", "", days=24,
+                            checkpoint=rotation.checkpoint(state))
+    whole = create_plan(shift_config, "05.01.2026", "MH", "IL", "", days=48)
+    assert rows + continued == whole
+
+
+@pytest.mark.parametrize("start, first_vm, first_nm", [
+    ("06.01.2026", "MH", "IL"),     # kein Montag
+    ("05.01.2026", "", "IL"),       # Vormittag fehlt
+    ("2026-01-05", "MH", "IL"),     # falsches Datumsformat
+])
+def test_invalid_inputs(shift_config, start, first_vm, first_nm):
+    with pytest.raises(PlanningError):
+        create_plan(shift_config, start, first_vm, first_nm)
@@ -0,0 +1,80 @@
+"""Export nach CSV, JSON und Excel (``export.py``)."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from schichtplaner.engine import COLUMNS, create_plan
+from schichtplaner.export import XlsxStyles, render_bytes, sheet_title, split_rows, write_workbook
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def plan(config, days):
+    return create_plan(config, "05.01.2026", config["pool_vm_alle"][0], config["pool_nm_alle"][0], days=days)
+
+
+def with_weekdays(config, weekdays):
+    return dict(config, rules={"weekdays": weekdays})
+
+
+def sheet_rows(data, title=None):
+    wb = openpyxl.load_workbook(io.BytesIO(data))
+    ws = wb[title] if title else wb.worksheets[0]
+    return list(ws.iter_rows())
+
+
+def weekday_before_separators(rows):
+    """Wochentag der Zeile vor jeder Trennzeile"""
+    return [previous[1].value for previous, current in zip(rows, rows[1:]) if current[0].value is None]
+
+
+def test_csv_and_json(shift_config):
+    rows = plan(shift_config, 6)
+    lines = list(csv.reader(io.StringIO(render_bytes(rows, "csv").decode("utf-8-sig"))))
+    assert tuple(lines[0]) == COLUMNS and len(lines) == 7
+    assert json.loads(render_bytes(rows, "json")) == [{c: row[c] for c in COLUMNS} for row in rows]
+
+
+@pytest.mark.parametrize("weekdays, week_end", [
+    (["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag"], "Samstag"),
+    (["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag", "Samstag", "Sonntag"], "Sonntag"),
+    (["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"], "Freitag"),
+])
+def test_xlsx_separator_after_last_planned_weekday(shift_config, weekdays, week_end):
+    config = with_weekdays(shift_config, weekdays)
+    rows = plan(config, 3 * len(weekdays))
+    written = sheet_rows(render_bytes(rows, "xlsx", config))
+    assert len(written) == 1 + len(rows) + 3
+    assert weekday_before_separators(written) == [week_end] * 3
+
+
+def test_xlsx_uses_named_styles(shift_config):
+    rows = plan(shift_config, 6)
+    written = sheet_rows(render_bytes(rows, "xlsx", shift_config))
+    assert [cell.style for cell in written[0]] == [XlsxStyles.HEADER] * 5
+    assert [cell.style for cell in written[1]] == [XlsxStyles.DATE, XlsxStyles.TEXT, XlsxStyles.SHIFT,
+                                                   XlsxStyles.SHIFT, XlsxStyles.SUPPORT]
+    assert [cell.style for cell in written[-1]] == [XlsxStyles.SEPARATOR] * 5
+    assert [cell.value for cell in written[2][1:4]] == [rows[1][c] for c in COLUMNS[1:4]]
+
+
+def test_write_workbook_summary(shift_config):
+    rows = plan(shift_config, 30)
+    sheets = [(label, part, shift_config) for label, part in split_rows(rows, "monat")]
+    assert [label for label, _, _ in sheets] == ["Januar 2026", "Februar 2026"]
+    target = io.BytesIO()
+    write_workbook(sheets, target)
+    wb = openpyxl.load_workbook(io.BytesIO(target.getvalue()))
+    assert wb.sheetnames == ["Übersicht", "Januar 2026", "Februar 2026"]
+    summary = list(wb["Übersicht"].iter_rows(values_only=True))
+    assert [line[3] for line in summary[1:3]] == [len(part) for _, part, _ in sheets]
+
+
+def test_sheet_title():
+    used = set()
+    assert sheet_title("a/b", used) == "a_b"
+    assert sheet_title("A/B", used) == "A_B (2)"
+    assert len(sheet_title("x" * 40, used)) == 31
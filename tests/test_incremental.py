@@ -0,0 +1,40 @@
+"""Inkrementelle Neuplanung (``incremental.IncrementalPlan``)."""
+
+from schichtplaner.engine import create_plan
+from schichtplaner.incremental import IncrementalPlan
+
+
+SEEDS = ("05.01.2026", "MH", "IL", "FA")
+
+
+def test_add_and_remove_absence_match_full_plan(shift_config):
+    plan = IncrementalPlan(shift_config, *SEEDS, days=24)
+    original = list(plan.rows)
+
+    changes = plan.add_absence("14.01.2026", ["RI", "TR"])
+    assert changes and all(nr >= 8 for nr, _, _, _ in changes)
+    assert plan.rows == create_plan(shift_config, *SEEDS, {"14.01.2026": ["RI", "TR"]}, days=24)
+
+    plan.remove_absence("14.01.2026", ["RI", "TR"])
+    assert plan.rows == original
+
+
+def test_set_absences_replans_once(shift_config):
+    absences = {"07.01.2026": ["RR"], "20.01.2026": ["MH", "JB"]}
+    plan = IncrementalPlan(shift_config, *SEEDS, days=24)
+    plan.set_absences(absences)
+    assert plan.rows == create_plan(shift_config, *SEEDS, absences, days=24)
+    assert plan.set_absences(absences) == []
+
+
+def test_absence_outside_period_changes_nothing(shift_config):
+    plan = IncrementalPlan(shift_config, *SEEDS, days=12)
+    assert plan.add_absence("10.01.2026", ["MH"]) == []  # Samstag ist Planungstag ohne Dienste
+    assert plan.add_absence("02.03.2026", ["MH"]) == []
+
+
+def test_checkpoint_continues_plan(shift_config):
+    whole = create_plan(shift_config, *SEEDS, days=24)
+    first = IncrementalPlan(shift_config, *SEEDS, days=12)
+    second = IncrementalPlan(shift_config, "19.01.2026", "", "", days=12, checkpoint=first.checkpoint)
+    assert first.rows + second.rows == whole
@@ -0,0 +1,74 @@
+"""Geprüftes Laden von Konfigurationen (``roster.py``)."""
+
+import json
+import os
+import pickle
+
+import pytest
+
+from schichtplaner.engine import PlanningError
+from schichtplaner.roster import CACHE_SUFFIX, Roster, check_seeds, load_roster, parse_names
+
+
+def test_parse_names():
+    assert parse_names(" MH, ,IL ,") == ["MH", "IL"]
+
+
+def test_roster_strips_names_and_warns(shift_config):
+    config = dict(shift_config, pool_vm_alle=[" MH"] + shift_config["pool_vm_alle"][1:],
+                  pool_vm_teilweise=shift_config["pool_vm_teilweise"] + ["XY"])
+    roster = Roster(config)
+    assert roster.config["pool_vm_alle"][0] == "MH"
+    assert any("XY steht in Pool B" in warning for warning in roster.warnings)
+    assert "XY" in roster.employees
+
+
+@pytest.mark.parametrize("config, message", [
+    ([], "JSON-Objekt"),
+    ({"pool_vm_alle": "MH"}, "muss eine Liste"),
+    ({"pool_vm_alle": ["MH", "MH"]}, "doppelte Kürzel: MH"),
+    ({"pool_vm_alle": ["MH", ""]}, "leeres oder ungültiges"),
+    ({"pool_vm_alle": ["MH"], "pool_vm_teilweise": ["MH"], "pool_vm_support": ["MH"]}, "braucht Support"),
+    ({"rules": {"weekdays": []}}, "keine Planungstage"),
+])
+def test_roster_errors(config, message):
+    with pytest.raises(PlanningError, match=message):
+        Roster(config)
+
+
+def test_check_seeds(shift_config):
+    check_seeds(shift_config, "MH", "IL", "FA")
+    with pytest.raises(PlanningError) as info:
+        check_seeds(shift_config, "ZZ", "IL", "YY")
+    assert "Vormittag: ZZ" in str(info.value) and "Support: YY" in str(info.value)
+
+
+def test_load_roster_uses_cache(tmp_path, shift_config):
+    path = tmp_path / "team.json"
+    path.write_text(json.dumps(shift_config), encoding="utf-8")
+    first = load_roster(str(path))
+    cache = str(path) + CACHE_SUFFIX
+    assert os.path.exists(cache)
+    assert load_roster(str(path)).config == first.config
+
+    # Geänderte JSON-Datei: Cache passt nicht mehr und wird erneuert
+    path.write_text(json.dumps(dict(shift_config, pool_vm_alle=["MH", "MH"])), encoding="utf-8")
+    with pytest.raises(PlanningError, match="doppelte"):
+        load_roster(str(path))
+
+
+def test_load_roster_rejects_objects_in_cache(tmp_path, shift_config):
+    path = tmp_path / "team.json"
+    path.write_text(json.dumps(shift_config), encoding="utf-8")
+    load_roster(str(path))
+    cache = str(path) + CACHE_SUFFIX
+    with open(cache, 'wb') as f:
+        pickle.dump(os.getcwd, f)  # eine Funktion: darf nicht geladen werden
+    assert load_roster(str(path)).config["pool_vm_alle"] == shift_config["pool_vm_alle"]
+
+
+def test_load_roster_invalid_json(tmp_path):
+    path = tmp_path / "kaputt.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(PlanningError, match="kein gültiges JSON"):
+        load_roster(str(path))
@@ -0,0 +1,44 @@
+"""Konfigurierbare Regeln (``rules.py``)."""
+
+from datetime import date
+
+import pytest
+
+from schichtplaner.engine import PlanningError
+from schichtplaner.rules import ALL_SHIFTS, SHIFT_BITS, RuleSet
+
+
+def test_defaults():
+    rules = RuleSet({})
+    assert rules.weekdays == [0, 1, 2, 3, 4, 5]
+    assert rules.shifts_on(date(2026, 1, 10)) == 0            # Samstag
+    assert rules.shifts_on(date(2026, 1, 9)) == ALL_SHIFTS    # Freitag
+    assert rules.exclusions[4] == ["pool_freitag_abwesend"]
+
+
+def test_day_shifts_are_merged_per_day():
+    rules = RuleSet({"rules": {"weekdays": ["Montag", "Samstag", "Sonntag"], "day_shifts": {"Sonntag": []}}})
+    assert rules.weekday_shifts[5] == 0                       # Samstag bleibt ohne Dienste
+    assert rules.weekday_shifts[6] == 0
+    rules = RuleSet({"rules": {"day_shifts": {"samstag": ["Vormittag"]}}})
+    assert rules.weekday_shifts[5] == SHIFT_BITS["Vormittag"]
+
+
+def test_holidays_and_next_plan_day():
+    rules = RuleSet({"rules": {"holidays": {"06.01.2026": ["Vormittag"]}}})
+    assert rules.shifts_on(date(2026, 1, 6)) == SHIFT_BITS["Vormittag"]
+    assert rules.next_plan_day(date(2026, 1, 9)) == date(2026, 1, 10)
+    five = RuleSet({"rules": {"weekdays": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]}})
+    assert five.next_plan_day(date(2026, 1, 9)) == date(2026, 1, 12)
+
+
+@pytest.mark.parametrize("rules", [
+    {"weekdays": []},
+    {"weekdays": ["Feiertag"]},
+    {"day_shifts": {"Montag": ["Nachtdienst"]}},
+    {"holidays": ["2026-01-06"]},
+    {"weekday_exclusions": {"Freitag": ["pool_gibt_es_nicht"]}},
+])
+def test_invalid_rules(rules):
+    with pytest.raises(PlanningError):
+        RuleSet({"rules": rules})
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from schichtplaner.server import PlanningService, RequestError
+
+
+@pytest.fixture
+def service():
+    service = PlanningService(workers=1)
+    yield service
+    service.close()
+
+
+def body(shift_config, **extra):
+    return dict({"config": shift_config, "start_date": "05.01.2026", "weeks": 1}, **extra)
+
+
+@pytest.mark.parametrize("extra", [
+    {"checkpoint": "abc"},
+    {"checkpoint": {"pool_positions": []}},
+    {"checkpoint": {"pool_positions": {"vm_alle": "2"}}},
+    {"checkpoint": {"yesterday_nm": 3}},
+    {"absences": ["RR"]},
+    {"absences": {"07.01.2026": 5}},
+    {"absences": {"32.01.2026": ["RR"]}},
+    {"solver": "zufall"},
+])
+def test_plan_arguments_rejects_malformed_input(service, shift_config, extra):
+    with pytest.raises(RequestError) as info:
+        service.plan_arguments(body(shift_config, **extra))
+    assert info.value.status == 400
+
+
+def test_plan_arguments_reads_absences(service, shift_config):
+    args = service.plan_arguments(body(shift_config, absences={"07.01.2026": "RR", "2026-01-08": ["RR", "IL"]}))
+    assert args[5] == {date(2026, 1, 7): {"RR"}, date(2026, 1, 8): {"RR", "IL"}}
+
+
+def test_cancelled_client_does_not_cancel_shared_plan(service, shift_config):
+    async def scenario():
+        first = asyncio.ensure_future(service.plan(body(shift_config)))
+        second = asyncio.ensure_future(service.plan(body(shift_config)))
+        await asyncio.sleep(0)
+        first.cancel()
+        config, entry = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return entry
+
+    entry = asyncio.run(scenario())
+    assert len(entry["rows"]) == 6
+    assert not service._running
+    assert asyncio.run(service.plan(body(shift_config)))[1] is entry
@@ -0,0 +1,42 @@
+"""Lokale Suche (``solver.py``) mit denselben Regeln wie die Rotation."""
+
+from schichtplaner.engine import create_plan
+from schichtplaner.metrics import plan_stats
+from schichtplaner.solver import LocalSearchSolver, optimize_plan
+from schichtplaner.stress import check_plan
+
+
+ABSENCES = {"07.01.2026": ["RI", "RR", "TR"], "13.01.2026": ["MH", "IL", "FA"], "21.01.2026": ["JB", "ES"]}
+
+
+def case(config, days):
+    return {"config": config, "start_date": "05.01.2026", "days": days, "first_vm": "MH", "first_nm": "IL",
+            "first_support": "FA", "absences": ABSENCES}
+
+
+def solve(config, days, iterations=3000):
+    solver = LocalSearchSolver(config, "05.01.2026", "MH", "IL", "FA", ABSENCES, days=days, seed=1)
+    return solver.run(time_limit=60, max_iterations=iterations).best_rows()
+
+
+def test_solver_keeps_rules_and_first_day(shift_config):
+    rows = solve(shift_config, 24)
+    assert check_plan(case(shift_config, 24), rows) == []
+    assert (rows[0]["Vormittag"], rows[0]["Nachmittag"], rows[0]["Support"]) == ("MH", "IL", "FA")
+
+
+def test_solver_is_not_worse_than_rotation(shift_config):
+    rotation = plan_stats(create_plan(shift_config, "05.01.2026", "MH", "IL", "FA", ABSENCES, days=24), shift_config)
+    optimized = plan_stats(solve(shift_config, 24), shift_config)
+    assert optimized["luecken"] <= rotation["luecken"]
+    assert optimized["dienste_stdabw"] <= rotation["dienste_stdabw"]
+
+
+def test_solver_is_reproducible(shift_config):
+    assert solve(shift_config, 12, 500) == solve(shift_config, 12, 500)
+
+
+def test_optimize_plan_stops_on_request(shift_config):
+    rows = optimize_plan(shift_config, "05.01.2026", "MH", "IL", "FA", days=12, should_stop=lambda: True)
+    assert len(rows) == 12
+    assert check_plan(dict(case(shift_config, 12), absences={}), rows) == []
@@ -0,0 +1,51 @@
+"""SQLite-Ablage von Planungen (``store.PlanStore``)."""
+
+from datetime import date
+
+import pytest
+
+from schichtplaner.engine import create_plan
+from schichtplaner.incremental import IncrementalPlan
+from schichtplaner.store import PlanStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    with PlanStore(str(tmp_path / "plans.db")) as store:
+        yield store
+
+
+def test_save_and_query_period(store, shift_config):
+    absences = {"07.01.2026": ["RR"], "02.03.2026": ["MH"]}
+    plan = IncrementalPlan(shift_config, "05.01.2026", "MH", "IL", "FA", absences, days=12)
+    store.save_period(plan.rows, shift_config, absences, checkpoint=plan.checkpoint)
+
+    [period] = store.periods()
+    assert (period["start"], period["end"], period["days"]) == (date(2026, 1, 5), date(2026, 1, 17), 12)
+    assert store.rows_between() == plan.rows
+    assert store.rows_between("12.01.2026", "13.01.2026") == plan.rows[6:8]
+    assert store.absences_between() == {date(2026, 1, 7): ["RR"]}  # außerhalb des Zeitraums nicht gespeichert
+    assert store.assignments("MH", end="06.01.2026") == [(date(2026, 1, 5), "Vormittag")]
+    assert store.latest_config()["pool_vm_alle"] == shift_config["pool_vm_alle"]
+    assert store.latest_checkpoint() == (date(2026, 1, 19), plan.checkpoint)
+    assert store.checkpoint_for("19.01.2026") == plan.checkpoint
+    assert store.checkpoint_for("26.01.2026") is None
+
+
+def test_later_period_replaces_overlapping_rows(store, shift_config):
+    first = create_plan(shift_config, "05.01.2026", "MH", "IL", "FA", days=12)
+    store.save_period(first, shift_config)
+    second = create_plan(shift_config, "12.01.2026", "RI", "RR", days=6)
+    store.save_period(second, shift_config)
+    assert store.rows_between() == first[:6] + second
+    assert store.latest_checkpoint(before="12.01.2026") is None  # beide Zeiträume enden erst am 17.01.
+    assert store.latest_checkpoint()[0] == date(2026, 1, 19)
+
+    # Gleiches Startdatum: der Zeitraum wird ersetzt
+    store.save_period(second, shift_config, solver="optimierung")
+    assert [period["solver"] for period in store.periods()] == ["rotation", "optimierung"]
+
+
+def test_empty_plan_is_rejected(store, shift_config):
+    with pytest.raises(ValueError):
+        store.save_period([], shift_config)
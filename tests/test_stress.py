@@ -0,0 +1,37 @@
+"""Kurzer, reproduzierbarer Durchlauf des Zufallstests (``schichtplaner.stress``) je Eigenschaft."""
+
+import pytest
+
+from schichtplaner.engine import create_plan
+from schichtplaner.stress import PROPERTIES, check_plan, random_case, replay, run_stress
+
+
+CASES = 100
+SEED = 1000
+
+
+@pytest.mark.parametrize("prop", PROPERTIES)
+def test_no_failures(prop):
+    failures = run_stress(CASES, seed=SEED, workers=1, max_employees=12, max_days=60, properties=(prop,),
+                          iterations=200)
+    assert failures == []
+
+
+def test_random_case_is_reproducible():
+    assert random_case(7) == random_case(7)
+
+
+def test_check_plan_reports_rest_violation(shift_config):
+    case = {"config": shift_config, "start_date": "05.01.2026", "days": 12,
+            "first_vm": "MH", "first_nm": "IL", "first_support": "FA", "absences": {}}
+    rows = create_plan(shift_config, "05.01.2026", "MH", "IL", "FA", days=12)
+    assert check_plan(case, rows, complete=True) == []
+
+    # Dienstag: Vormittag für den Nachmittag vom Montag (IL steht auch in Pool A)
+    rows[1] = dict(rows[1], Vormittag="IL", Support="")
+    assert [rule for rule, _, _ in check_plan(case, rows)] == ["ruhezeit"]
+
+
+def test_replay_returns_only_failing_cases():
+    case = random_case(5, max_employees=8, max_days=15)
+    assert replay([{"seed": 5, "eigenschaft": "rotation", "meldungen": [], "fall": case}], iterations=50) == []
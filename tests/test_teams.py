@@ -0,0 +1,56 @@
+"""Gemeinsame Planung mehrerer Teams (``teams.py``)."""
+
+import pytest
+
+from schichtplaner.engine import PlanningError
+from schichtplaner.teams import assign_seeds, coupled_groups, double_bookings, plan_teams
+
+
+def team(vm, nm, rules=None):
+    config = {"pool_vm_alle": vm, "pool_vm_teilweise": [], "pool_vm_support": [], "pool_nm_alle": nm,
+              "pool_freitag_abwesend": []}
+    if rules is not None:
+        config["rules"] = rules
+    return config
+
+
+def test_coupled_groups():
+    teams = {"a": team(["MH"], ["IL"]), "b": team(["XX"], ["YY"]), "c": team(["IL"], ["ZZ"])}
+    assert coupled_groups(teams) == [["a", "c"], ["b"]]
+
+
+def test_default_seeds_do_not_overlap():
+    teams = {"a": team(["MH", "RI", "TR"], ["IL", "RR", "FA"]), "b": team(["MH", "JB", "ES"], ["IL", "AN", "FA"])}
+    assert assign_seeds(teams) == {"a": ("MH", "IL", ""), "b": ("JB", "AN", "")}
+    planned = plan_teams(teams, "05.01.2026", weeks=4, workers=1)
+    assert double_bookings(planned) == []
+
+
+def test_overlapping_seeds_are_rejected():
+    teams = {"a": team(["MH", "RI"], ["IL", "RR"]), "b": team(["MH", "JB"], ["IL", "AN"])}
+    with pytest.raises(PlanningError, match="MH"):
+        plan_teams(teams, "05.01.2026", days=6, workers=1, seeds={"a": ("MH", "IL", ""), "b": ("MH", "AN", "")})
+
+
+def test_rest_rule_across_teams():
+    # IL hat am Montag Nachmittag in a; b darf IL am Dienstag nicht vormittags einteilen
+    a = team(["MH"], ["IL", "RR"])
+    teams = {"a": a, "b": team(["IL", "JB"], ["AN"])}
+    seeds = {"a": ("MH", "IL", ""), "b": ("JB", "AN", "")}
+    planned = plan_teams(teams, "05.01.2026", days=2, workers=1, seeds=seeds)
+    assert planned["b"][1]["Vormittag"] == "JB"
+
+    # ohne Ruhezeiten in b ist IL frei
+    teams["b"] = team(["IL", "JB"], ["AN"], rules={"rest": {}})
+    planned = plan_teams(teams, "05.01.2026", days=2, workers=1, seeds=seeds)
+    assert planned["b"][1]["Vormittag"] == "IL"
+
+
+def test_rest_rule_only_to_the_previous_calendar_day():
+    # Mo-Fr ohne Samstag: der Nachmittag am Freitag sperrt den Montag im anderen Team nicht
+    five = {"weekdays": ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"], "rest": {}}
+    teams = {"a": team(["MH"], ["IL"], rules=five),
+             "b": team(["IL", "JB"], ["AN"], rules={"weekdays": five["weekdays"]})}
+    planned = plan_teams(teams, "05.01.2026", days=6, workers=1, seeds={"a": ("MH", "IL", ""), "b": ("JB", "AN", "")})
+    assert [row["Vormittag"] for row in planned["b"][1:5]] == ["JB"] * 4   # IL hat jeden Tag Nachmittag in a
+    assert (planned["b"][5]["Datum"], planned["b"][5]["Vormittag"]) == ("12.01.2026", "IL")